@@ -1,9 +1,19 @@
+from typing import Any, Mapping, Optional
+
+import click
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 
 from config import Config
-from utils.db import db
+from utils.db import db, init_db
+from utils.metrics import init_metrics
+from utils.profiler import init_profiler
+from utils.sse import sse_broker
+from utils.response_cache import response_cache
+from utils.idempotency import idempotency_store
+from utils.matcher import template_matcher
+from utils.scheduler import DeviceBusy
 
 # Blueprints
 from routes.students import students_bp
@@ -11,16 +21,34 @@ from routes.professors import professors_bp
 from routes.auth import auth_bp
 from routes.arduino import arduino_bp
 from routes.access import access_bp
+from routes.metrics import metrics_bp
+from routes.enrollment import enrollment_bp
+from routes.operations import operations_bp
+from routes.matching import matching_bp
+from routes.sensors import sensors_bp
+from services.template_service import MatcherUnavailable
 
 
-def create_app() -> Flask:
+def create_app(overrides: Optional[Mapping[str, Any]] = None) -> Flask:
+    """Build the application. Has no side effects beyond the returned object:
+    the schema is created explicitly with `flask --app app init-db`.
+    """
     app = Flask(__name__)
     app.config.from_object(Config)
+    if overrides:
+        app.config.update(overrides)
 
     # Extensions
     CORS(app, resources={r"/*": {"origins": "*"}})
     db.init_app(app)
     JWTManager(app)
+    init_metrics(app)
+    init_profiler(app)
+    # Backend threads start lazily on first publish/subscribe
+    sse_broker.configure(app.config.get("EVENT_BUS_URL"))
+    response_cache.configure(app.config["RESPONSE_CACHE_MAX_ENTRIES"], app.config["RESPONSE_CACHE_MAX_BYTES"])
+    idempotency_store.configure(app.config["IDEMPOTENCY_MAX_KEYS"], app.config["IDEMPOTENCY_TTL"])
+    template_matcher.configure(app.config["MATCHER_TEMPLATE_BYTES"])
 
     # Register Blueprints
     app.register_blueprint(students_bp, url_prefix="/students")
@@ -28,22 +56,37 @@ def create_app() -> Flask:
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(arduino_bp, url_prefix="/arduino")
     app.register_blueprint(access_bp, url_prefix="/access")
+    app.register_blueprint(metrics_bp, url_prefix="/metrics")
+    app.register_blueprint(enrollment_bp, url_prefix="/enrollment")
+    app.register_blueprint(operations_bp, url_prefix="/operations")
+    app.register_blueprint(matching_bp, url_prefix="/matching")
+    app.register_blueprint(sensors_bp, url_prefix="/sensors")
+
+    @app.errorhandler(DeviceBusy)
+    def device_busy(e: DeviceBusy):
+        retry_after = str(int(e.retry_after))
+        return jsonify({"success": False, "error": str(e), "retryAfter": int(e.retry_after)}), 503, {"Retry-After": retry_after}
+
+    @app.errorhandler(MatcherUnavailable)
+    def matcher_unavailable(e: MatcherUnavailable):
+        return jsonify({"success": False, "error": str(e)}), 501
 
     # Health check
     @app.get("/health")
     def health():
         return jsonify({"status": "ok"})
 
-    # Create tables if they don't exist
-    with app.app_context():
-        from models import Student, Professor, User  # noqa: F401 - ensure models are registered
-        db.create_all()
+    @app.cli.command("init-db")
+    def init_db_command():
+        """Create tables that don't exist yet."""
+        init_db()
+        click.echo("Database schema is up to date.")
 
     return app
 
 
-app = create_app()
-
-
 if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        init_db()
     app.run(host="0.0.0.0", port=5000, debug=True)
@@ -16,3 +16,70 @@ class Config:
 
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
+
+    # SSE event bus: 'local' (single process), 'unix:///run/fac/events.sock' (all
+    # workers on one host) or 'redis://host:6379/0' (across hosts; needs `redis`)
+    EVENT_BUS_URL = os.getenv("EVENT_BUS_URL", "local")
+
+    # Seconds between `live_stats` SSE pushes of the sliding-window access counters (0 disables)
+    LIVE_STATS_PUSH_INTERVAL = float(os.getenv("LIVE_STATS_PUSH_INTERVAL", "10"))
+
+    # In-process LRU of encoded GET responses (/students, /professors, /access/logs),
+    # invalidated by write generations. Writes in other processes are not seen,
+    # so it is off by default; enable it only for a single worker without door mode.
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "0") == "1"
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "256"))
+    RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+
+    # Device calls made inside a request stop (and cancel an enrollment with 'C')
+    # once the client's X-Request-Timeout (seconds) has passed. DEVICE_REQUEST_TIMEOUT
+    # applies when the header is absent (0 = only the operation's own budget), and
+    # should sit below the WSGI server's worker timeout.
+    REQUEST_TIMEOUT_HEADER = os.getenv("REQUEST_TIMEOUT_HEADER", "X-Request-Timeout")
+    DEVICE_REQUEST_TIMEOUT = float(os.getenv("DEVICE_REQUEST_TIMEOUT", "0"))
+
+    # Idempotency-Key on enroll/verify/test-capture: duplicates replay the first
+    # response for IDEMPOTENCY_TTL seconds, or wait up to IDEMPOTENCY_WAIT for it.
+    # Keys are held per process, like the response cache.
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "10000"))
+    IDEMPOTENCY_TTL = float(os.getenv("IDEMPOTENCY_TTL", "3600"))
+    IDEMPOTENCY_WAIT = float(os.getenv("IDEMPOTENCY_WAIT", "180"))
+
+    # Optional software matcher (needs numpy): templates are MATCHER_TEMPLATE_BYTES
+    # long (the sensor's 512-byte character file); a normalised correlation of at
+    # least MATCHER_THRESHOLD (0-1) counts as a match.
+    MATCHER_TEMPLATE_BYTES = int(os.getenv("MATCHER_TEMPLATE_BYTES", "512"))
+    MATCHER_THRESHOLD = float(os.getenv("MATCHER_THRESHOLD", "0.6"))
+
+    # Several readers: each person gets a slot on SENSOR_COPIES registered sensors
+    # (least-full first); new sensors hold SENSOR_CAPACITY templates by default.
+    SENSOR_CAPACITY = int(os.getenv("SENSOR_CAPACITY", "128"))
+    SENSOR_COPIES = int(os.getenv("SENSOR_COPIES", "1"))
+
+    # Serial port inventory: cached list, rescanned after the TTL or when /dev changes
+    PORTS_CACHE_TTL = float(os.getenv("PORTS_CACHE_TTL", "30"))
+    PORTS_WATCH_INTERVAL = float(os.getenv("PORTS_WATCH_INTERVAL", "1"))
+
+    # Arduino connect: wait up to ARDUINO_READY_TIMEOUT for the boot banner or a
+    # reply to ARDUINO_PROBE_COMMAND; after an I/O error, reconnect with backoff.
+    ARDUINO_READY_TIMEOUT = float(os.getenv("ARDUINO_READY_TIMEOUT", "5"))
+    ARDUINO_PROBE_COMMAND = os.getenv("ARDUINO_PROBE_COMMAND", "C")
+    ARDUINO_RECONNECT_MIN_DELAY = float(os.getenv("ARDUINO_RECONNECT_MIN_DELAY", "0.1"))
+    ARDUINO_RECONNECT_MAX_DELAY = float(os.getenv("ARDUINO_RECONNECT_MAX_DELAY", "5"))
+
+    # 'local': this process owns the serial ports. 'client': web workers talk to
+    # device_daemon.py over ARDUINO_DAEMON_SOCKET instead of opening ports.
+    ARDUINO_MODE = os.getenv("ARDUINO_MODE", "local")
+    ARDUINO_DAEMON_SOCKET = os.getenv("ARDUINO_DAEMON_SOCKET", "/tmp/fac_device.sock")
+    # Allow connecting to simulated sim://<name> ports (load tests, demos). Never
+    # enable on a real door: a simulated sensor grants whatever it is told to.
+    ARDUINO_SIMULATOR = os.getenv("ARDUINO_SIMULATOR", "0") == "1"
+
+    # Profiling: admins send "X-Profile: 1" to profile one request; a sample rate
+    # profiles a fraction of all requests; anything slower than PROFILE_SLOW_MS
+    # (0 disables) gets a report with its SQL statements.
+    PROFILE_HEADER = os.getenv("PROFILE_HEADER", "X-Profile")
+    PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+    PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "2000"))
+    PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_MAX_REPORTS = int(os.getenv("PROFILE_MAX_REPORTS", "50"))
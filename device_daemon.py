@@ -0,0 +1,40 @@
+"""Serial-owner daemon.
+
+Owns every serial port in one process and serves verify/enroll/status/events to
+web workers over a Unix socket, so the HTTP tier can run many workers:
+
+    ARDUINO_DAEMON_SOCKET=/run/fac/device.sock python device_daemon.py
+    ARDUINO_MODE=client ARDUINO_DAEMON_SOCKET=/run/fac/device.sock gunicorn -w 4 wsgi:app
+
+Set EVENT_BUS_URL in both so device events reach every worker's /access/stream.
+"""
+from __future__ import annotations
+
+from app import create_app
+from config import Config
+from utils.arduino import ArduinoManager, arduino_manager, sensor_pool
+from utils.device_rpc import DeviceServer
+from utils.sse import sse_broker
+from services.door_service import start_door_mode, stop_door_mode
+
+
+def main() -> None:
+    if not isinstance(arduino_manager, ArduinoManager):
+        raise SystemExit("device_daemon must own the ports: unset ARDUINO_MODE=client for this process")
+    app = create_app()
+    server = DeviceServer(
+        Config.ARDUINO_DAEMON_SOCKET,
+        arduino_manager,
+        sse_broker,
+        extra={
+            "start_door_mode": lambda: start_door_mode(app),
+            "stop_door_mode": stop_door_mode,
+        },
+        route=sensor_pool.manager,
+    )
+    print(f"Device daemon listening on {Config.ARDUINO_DAEMON_SOCKET}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
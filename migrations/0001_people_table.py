@@ -0,0 +1,101 @@
+"""Move students and professors onto the shared `people` table (joined-table inheritance).
+
+Usage (stop the server first; uses DATABASE_URL like the app):
+
+    python migrations/0001_people_table.py
+
+Identity and fingerprint columns move to `people`; `students` and `professors`
+keep only their role columns, keyed by people.id. Students keep their ids.
+Professors keep theirs unless a student already has the same id: then every
+professor id is shifted past the largest student id. Access logs, change
+records and enrollment items pointing at professors are rewritten to match.
+Runs in one transaction and does nothing on an already-migrated database.
+Written for SQLite, the database this project ships with.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+PERSON_COLUMNS = "name, first_name, last_name, email, fingerprint_id, fingerprint_verified, created_at, updated_at"
+# Tables that point at a person through (entity_type, entity_id)
+REFERENCING_TABLES = ("access_logs", "change_log", "enrollment_campaign_items")
+
+
+def upgrade(engine) -> dict:
+    from models import Person, Professor, Student
+
+    with engine.begin() as conn:
+        tables = set(inspect(conn).get_table_names())
+        if "people" in tables:
+            return {"migrated": False, "reason": "people table already exists"}
+        if not {"students", "professors"} <= tables:
+            Person.metadata.create_all(conn, tables=[Person.__table__, Student.__table__, Professor.__table__])
+            return {"migrated": False, "reason": "no legacy tables; created the new schema"}
+
+        shared = conn.execute(
+            text("SELECT s.email FROM students s JOIN professors p ON p.email = s.email ORDER BY s.email")
+        ).scalars().all()
+        if shared:
+            raise RuntimeError(
+                "Emails must be unique across roles; fix these first: " + ", ".join(shared[:20])
+            )
+        collisions = conn.execute(text("SELECT COUNT(*) FROM professors WHERE id IN (SELECT id FROM students)")).scalar()
+        offset = conn.execute(text("SELECT COALESCE(MAX(id), 0) FROM students")).scalar() if collisions else 0
+
+        conn.execute(text("ALTER TABLE students RENAME TO students_legacy"))
+        conn.execute(text("ALTER TABLE professors RENAME TO professors_legacy"))
+        Person.metadata.create_all(conn, tables=[Person.__table__, Student.__table__, Professor.__table__])
+
+        conn.execute(text(
+            f"INSERT INTO people (id, type, {PERSON_COLUMNS}) "
+            f"SELECT id, 'student', {PERSON_COLUMNS} FROM students_legacy"
+        ))
+        conn.execute(text(
+            "INSERT INTO students (id, major, student_number, year) "
+            "SELECT id, major, student_number, year FROM students_legacy"
+        ))
+        conn.execute(text(
+            f"INSERT INTO people (id, type, {PERSON_COLUMNS}) "
+            f"SELECT id + :offset, 'professor', {PERSON_COLUMNS} FROM professors_legacy"
+        ), {"offset": offset})
+        conn.execute(text(
+            "INSERT INTO professors (id, department, employee_number, title) "
+            "SELECT id + :offset, department, employee_number, title FROM professors_legacy"
+        ), {"offset": offset})
+
+        rewritten = {}
+        if offset:
+            for table in REFERENCING_TABLES:
+                if table in tables:
+                    rewritten[table] = conn.execute(text(
+                        f"UPDATE {table} SET entity_id = entity_id + :offset WHERE entity_type = 'professor'"
+                    ), {"offset": offset}).rowcount
+
+        counts = {
+            role: conn.execute(text(f"SELECT COUNT(*) FROM {role}_legacy")).scalar()
+            for role in ("students", "professors")
+        }
+        conn.execute(text("DROP TABLE students_legacy"))
+        conn.execute(text("DROP TABLE professors_legacy"))
+    return {"migrated": True, **counts, "professor_id_offset": offset, "rewritten": rewritten}
+
+
+def main() -> None:
+    from app import create_app
+    from utils.db import db
+
+    app = create_app()
+    with app.app_context():
+        result = upgrade(db.engine)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
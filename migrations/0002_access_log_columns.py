@@ -0,0 +1,62 @@
+"""Add the columns and index access logs gained after the first release.
+
+Usage (stop the server first; uses DATABASE_URL like the app; run after 0001):
+
+    python migrations/0002_access_log_columns.py
+
+`db.create_all()` never alters an existing table, so a database created before
+these columns existed fails every access log query until this has run. Only
+missing columns are added; existing rows keep NULL, which the unique
+(device, sequence) index allows any number of times. Runs in one transaction and
+does nothing on an up-to-date database. Written for SQLite, the database this
+project ships with.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+# column -> DDL type, in the order they were added to models.AccessLog
+COLUMNS = {
+    "device": "VARCHAR(128)",
+    "sequence": "INTEGER",
+}
+# Replayed door events are unique per device (see models.AccessLog)
+INDEX = "uq_access_logs_device_sequence"
+
+
+def upgrade(engine) -> dict:
+    from models import AccessLog
+
+    with engine.begin() as conn:
+        if "access_logs" not in inspect(conn).get_table_names():
+            AccessLog.metadata.create_all(conn, tables=[AccessLog.__table__])
+            return {"migrated": False, "reason": "no access_logs table; created the new schema"}
+        existing = {column["name"] for column in inspect(conn).get_columns("access_logs")}
+        added = [name for name in COLUMNS if name not in existing]
+        for name in added:
+            conn.execute(text(f"ALTER TABLE access_logs ADD COLUMN {name} {COLUMNS[name]}"))
+        indexed = INDEX in {index["name"] for index in inspect(conn).get_indexes("access_logs")}
+        if not indexed:
+            conn.execute(text(f"CREATE UNIQUE INDEX {INDEX} ON access_logs (device, sequence)"))
+    return {"migrated": bool(added) or not indexed, "columns": added, "index": not indexed}
+
+
+def main() -> None:
+    from app import create_app
+    from utils.db import db
+
+    app = create_app()
+    with app.app_context():
+        result = upgrade(db.engine)
+    print(result)
+
+
+if __name__ == "__main__":
+    main()
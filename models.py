@@ -1,9 +1,20 @@
 from datetime import datetime
+
+from sqlalchemy import event
 from werkzeug.security import generate_password_hash, check_password_hash
 
 from utils.db import db
 
 
+def name_parts(first_name, last_name, name):
+    """(firstName, lastName) as shown to the frontend: explicit parts, else split from the legacy name."""
+    words = name.split() if name else []
+    return (
+        first_name if first_name else (words[0] if words else None),
+        last_name if last_name else (" ".join(words[1:]) if len(words) > 1 else None),
+    )
+
+
 class TimestampMixin:
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(
@@ -11,27 +22,57 @@ class TimestampMixin:
     )
 
 
-class Student(db.Model, TimestampMixin):
-    __tablename__ = "students"
+class Person(db.Model, TimestampMixin):
+    """Identity and fingerprint columns shared by every role (joined-table inheritance).
+
+    `type` is the role ('student' or 'professor'), the same string access logs and
+    change records use as entity_type. Ids come from one sequence, so an id
+    names one person whatever the role, and emails are unique across roles.
+    """
+
+    __tablename__ = "people"
+    __table_args__ = (db.Index("ix_people_fingerprint", "fingerprint_id", "fingerprint_verified"),)
     id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(20), nullable=False, index=True)
     # Keep legacy full-name field but prefer first/last
     name = db.Column(db.String(120), nullable=True)
     first_name = db.Column(db.String(80), nullable=True)
     last_name = db.Column(db.String(80), nullable=True)
     email = db.Column(db.String(120), unique=True, nullable=False)
+    fingerprint_id = db.Column(db.String(128), nullable=True)
+    fingerprint_verified = db.Column(db.Boolean, default=False, nullable=False)
+    # Deleting a person deletes their stored templates too (SQLite does not enforce the FK)
+    templates = db.relationship("FingerprintTemplate", cascade="all, delete-orphan")
+    sensor_slots = db.relationship("SensorSlot", cascade="all, delete-orphan")
+
+    __mapper_args__ = {"polymorphic_on": type, "polymorphic_identity": "person"}
+
+
+@event.listens_for(Person, "before_update", propagate=True)
+def _touch_person(mapper, connection, target) -> None:
+    # onupdate only fires for tables in the UPDATE; a change to role columns alone
+    # (e.g. students.major) must still move people.updated_at, which caches key on
+    if db.session.is_modified(target, include_collections=False):
+        target.updated_at = datetime.utcnow()
+
+
+class Student(Person):
+    __tablename__ = "students"
+    id = db.Column(db.Integer, db.ForeignKey("people.id", ondelete="CASCADE"), primary_key=True)
     major = db.Column(db.String(120), nullable=True)
     # New fields requested by the frontend interface
     student_number = db.Column(db.String(64), unique=True, nullable=True)
     year = db.Column(db.Integer, nullable=True)
-    fingerprint_id = db.Column(db.String(128), nullable=True)
-    fingerprint_verified = db.Column(db.Boolean, default=False, nullable=False)
+
+    __mapper_args__ = {"polymorphic_identity": "student"}
 
     def to_dict(self):
+        first_name, last_name = name_parts(self.first_name, self.last_name, self.name)
         return {
             "id": self.id,
             # Prefer firstName/lastName for the frontend; fall back to legacy name
-            "firstName": self.first_name if self.first_name else (self.name.split()[0] if self.name else None),
-            "lastName": self.last_name if self.last_name else (" ".join(self.name.split()[1:]) if self.name and len(self.name.split()) > 1 else None),
+            "firstName": first_name,
+            "lastName": last_name,
             "email": self.email,
             "major": self.major,
             "studentNumber": self.student_number,
@@ -43,27 +84,23 @@ class Student(db.Model, TimestampMixin):
         }
 
 
-class Professor(db.Model, TimestampMixin):
+class Professor(Person):
     __tablename__ = "professors"
-    id = db.Column(db.Integer, primary_key=True)
-    # Keep legacy single-name field for backwards compatibility but prefer first/last
-    name = db.Column(db.String(120), nullable=True)
-    first_name = db.Column(db.String(80), nullable=True)
-    last_name = db.Column(db.String(80), nullable=True)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    id = db.Column(db.Integer, db.ForeignKey("people.id", ondelete="CASCADE"), primary_key=True)
     department = db.Column(db.String(120), nullable=True)
     # New fields requested by the frontend interface
     employee_number = db.Column(db.String(64), unique=True, nullable=True)
     title = db.Column(db.String(120), nullable=True)
-    fingerprint_id = db.Column(db.String(128), nullable=True)
-    fingerprint_verified = db.Column(db.Boolean, default=False, nullable=False)
+
+    __mapper_args__ = {"polymorphic_identity": "professor"}
 
     def to_dict(self):
+        first_name, last_name = name_parts(self.first_name, self.last_name, self.name)
         return {
             "id": self.id,
             # Provide firstName/lastName for the frontend; fall back to legacy name when missing
-            "firstName": self.first_name if self.first_name else (self.name.split()[0] if self.name else None),
-            "lastName": self.last_name if self.last_name else (" ".join(self.name.split()[1:]) if self.name and len(self.name.split()) > 1 else None),
+            "firstName": first_name,
+            "lastName": last_name,
             "email": self.email,
             "department": self.department,
             "employeeNumber": self.employee_number,
@@ -75,6 +112,61 @@ class Professor(db.Model, TimestampMixin):
         }
 
 
+class FingerprintTemplate(db.Model, TimestampMixin):
+    """A feature template read off the sensor, for the optional software matcher (utils/matcher.py)."""
+
+    __tablename__ = "fingerprint_templates"
+    id = db.Column(db.Integer, primary_key=True)
+    person_id = db.Column(db.Integer, db.ForeignKey("people.id", ondelete="CASCADE"), nullable=False, index=True)
+    data = db.Column(db.LargeBinary, nullable=False)
+
+
+class Sensor(db.Model, TimestampMixin):
+    """A fingerprint reader; `capacity` template slots (0..capacity-1) on the sensor itself."""
+
+    __tablename__ = "sensors"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(80), unique=True, nullable=False)
+    port = db.Column(db.String(255), unique=True, nullable=False)  # same string access logs store as device
+    capacity = db.Column(db.Integer, nullable=False, default=128)
+    active = db.Column(db.Boolean, nullable=False, default=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "name": self.name,
+            "port": self.port,
+            "capacity": self.capacity,
+            "active": self.active,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
+
+
+class SensorSlot(db.Model, TimestampMixin):
+    """One person's template slot on one sensor; `enrolled` once the finger was captured into it."""
+
+    __tablename__ = "sensor_slots"
+    __table_args__ = (
+        db.Index("uq_sensor_slots_slot", "sensor_id", "slot", unique=True),
+        db.Index("uq_sensor_slots_person", "sensor_id", "person_id", unique=True),
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    sensor_id = db.Column(db.Integer, db.ForeignKey("sensors.id"), nullable=False)
+    person_id = db.Column(db.Integer, db.ForeignKey("people.id", ondelete="CASCADE"), nullable=False, index=True)
+    slot = db.Column(db.Integer, nullable=False)
+    enrolled = db.Column(db.Boolean, nullable=False, default=False)
+    sensor = db.relationship("Sensor")
+
+    def to_dict(self):
+        return {
+            "sensor": self.sensor.name if self.sensor else None,
+            "port": self.sensor.port if self.sensor else None,
+            "personId": self.person_id,
+            "slot": self.slot,
+            "enrolled": self.enrolled,
+        }
+
+
 class User(db.Model, TimestampMixin):
     __tablename__ = "users"
     id = db.Column(db.Integer, primary_key=True)
@@ -102,10 +194,14 @@ class User(db.Model, TimestampMixin):
 
 class AccessLog(db.Model):
     __tablename__ = "access_logs"
+    # Replayed door events are unique per device; live logs have no sequence (NULLs never collide)
+    __table_args__ = (db.Index("uq_access_logs_device_sequence", "device", "sequence", unique=True),)
     id = db.Column(db.Integer, primary_key=True)
     entity_type = db.Column(db.String(20), nullable=False)  # 'student' or 'professor'
     entity_id = db.Column(db.Integer, nullable=False)
     status = db.Column(db.String(20), nullable=False)  # 'granted' or 'denied'
+    device = db.Column(db.String(128), nullable=True)  # serial port that read the finger, if any
+    sequence = db.Column(db.Integer, nullable=True)  # device event number, for events sent via /access/ingest
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
     def to_dict(self):
@@ -114,5 +210,80 @@ class AccessLog(db.Model):
             "entity_type": self.entity_type,
             "entity_id": self.entity_id,
             "status": self.status,
+            "device": self.device,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
+
+
+class ChangeLog(db.Model):
+    """One row per roster write; the id is the monotonic cursor of /students|/professors/changes."""
+
+    __tablename__ = "change_log"
+    __table_args__ = (
+        db.Index("ix_change_log_entity_seq", "entity_type", "id"),
+        {"sqlite_autoincrement": True},  # never reuse a sequence number
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'student' or 'professor'
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)  # 'upsert' or 'delete'
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+
+class EnrollmentCampaign(db.Model, TimestampMixin):
+    __tablename__ = "enrollment_campaigns"
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(120), nullable=True)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, completed, cancelled
+    max_retries = db.Column(db.Integer, nullable=False, default=3)
+    per_try_timeout = db.Column(db.Float, nullable=False, default=40.0)
+    items = db.relationship(
+        "EnrollmentCampaignItem",
+        backref="campaign",
+        order_by="EnrollmentCampaignItem.position",
+        cascade="all, delete-orphan",
+    )
+
+    def to_dict(self, include_items: bool = True):
+        counts = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        data = {
+            "id": self.id,
+            "name": self.name,
+            "status": self.status,
+            "total": len(self.items),
+            "counts": counts,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+        if include_items:
+            data["items"] = [i.to_dict() for i in self.items]
+        return data
+
+
+class EnrollmentCampaignItem(db.Model, TimestampMixin):
+    __tablename__ = "enrollment_campaign_items"
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer, db.ForeignKey("enrollment_campaigns.id"), nullable=False, index=True)
+    position = db.Column(db.Integer, nullable=False)
+    entity_type = db.Column(db.String(20), nullable=False)  # 'student' or 'professor'
+    entity_id = db.Column(db.Integer, nullable=False)
+    slot = db.Column(db.Integer, nullable=False)  # sensor template slot used for E / I:<slot>
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, running, success, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    message = db.Column(db.String(255), nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "campaign_id": self.campaign_id,
+            "position": self.position,
+            "entity_type": self.entity_type,
+            "entity_id": self.entity_id,
+            "slot": self.slot,
+            "status": self.status,
+            "attempts": self.attempts,
+            "message": self.message,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
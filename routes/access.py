@@ -1,34 +1,90 @@
 from __future__ import annotations
 
-from flask import Blueprint, jsonify, request, Response
+from flask import Blueprint, current_app, jsonify, request, Response
 from flask_jwt_extended import jwt_required
 
 from utils.auth_utils import roles_required
 from utils.sse import sse_broker
-from services.access_service import verify_access, list_logs
+from utils.live_stats import live_stats
+from utils.idempotency import idempotent
+from utils.response_cache import cached_response
+from utils.operations import operations, wants_async, accepted, request_deadline
+from utils.serialization import JSON, columnar_response, negotiate, rows_to_columns
+from services.access_service import LOG_FIELDS, MAX_INGEST_EVENTS, ingest_events, verify_access, list_logs
 
 access_bp = Blueprint("access", __name__)
 
 
+@access_bp.post("/verify")
+@idempotent
+def access_verify():
+    data = request.get_json(force=True, silent=True) or {}
+    entity_type = (data.get("entity_type") or "").strip().lower()
+    if entity_type not in {"student", "professor"}:
+        return jsonify({"error": "'entity_type' must be 'student' or 'professor'"}), 400
+    try:
+        entity_id = int(data.get("entity_id"))
+    except Exception:
+        return jsonify({"error": "'entity_id' must be an integer"}), 400
+    if wants_async(data):
+        op = operations.submit(
+            "access_verify", verify_access, entity_type, entity_id,
+            deadline=request_deadline(), app=current_app._get_current_object(),
+        )
+        return accepted(op)
+    return jsonify(verify_access(entity_type, entity_id, deadline=request_deadline()))
+
+
+@access_bp.post("/ingest")
+@jwt_required()
+@roles_required("admin")
+def access_ingest():
+    """Bulk replay of events buffered offline: {"device": "door-1", "events": [{"seq", "ts", ...}]}."""
+    data = request.get_json(force=True, silent=True) or {}
+    events = data.get("events")
+    if not isinstance(events, list):
+        return jsonify({"error": "'events' must be a list"}), 400
+    if len(events) > MAX_INGEST_EVENTS:
+        return jsonify({"error": f"at most {MAX_INGEST_EVENTS} events per batch"}), 413
+    return jsonify(ingest_events(events, device=data.get("device")))
+
 
 @access_bp.get("/logs")
 @jwt_required()
 @roles_required("admin")
+# Rows carry names and roles, so roster writes invalidate too; the TTL covers ?period windows sliding
+@cached_response("access_logs", "students", "professors", ttl=30)
 def access_logs():
     period = (request.args.get("period") or "day").lower()  # day|week|month|all
     entity_type = request.args.get("entity_type")
     role = request.args.get("role")
+    title = request.args.get("title")
     limit = int(request.args.get("limit") or 100)
     offset = int(request.args.get("offset") or 0)
 
-    logs = list_logs(period=period, entity_type=entity_type, role=role, limit=limit, offset=offset)
-    return jsonify({"items": logs, "count": len(logs)})
+    logs = list_logs(period=period, entity_type=entity_type, role=role, title=title, limit=limit, offset=offset)
+    fmt = negotiate()
+    if fmt != JSON:
+        return columnar_response(LOG_FIELDS, rows_to_columns(logs, LOG_FIELDS), fmt)
+    response = jsonify({"items": logs, "count": len(logs)})
+    response.vary.add("Accept")
+    return response
+
+
+@access_bp.get("/live-stats")
+@jwt_required()
+@roles_required("admin")
+def access_live_stats():
+    live_stats.sync()
+    return jsonify(live_stats.snapshot())
 
 
 @access_bp.get("/stream")
 @jwt_required()
 @roles_required("admin")
 def access_stream():
+    live_stats.start_push(current_app._get_current_object(), current_app.config["LIVE_STATS_PUSH_INTERVAL"])
+
     def event_stream():
         for msg in sse_broker.stream():
             yield msg
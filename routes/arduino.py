@@ -1,22 +1,26 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, current_app, jsonify, request
 from flask_jwt_extended import jwt_required
 
-from utils.arduino import arduino_manager
+from utils.arduino import RECENT_OPERATIONS, arduino_manager
 from utils.auth_utils import roles_required
+from utils.idempotency import idempotent
+from utils.operations import request_deadline
+from services.door_service import start_door_mode, stop_door_mode, door_mode_status
 
 arduino_bp = Blueprint("arduino", __name__)
 
 
+def _port_summary(ports):
+    return [
+        {"port": p["device"], "name": p.get("name"), "description": p.get("description"), "manufacturer": p.get("manufacturer")}
+        for p in ports
+    ]
+
+
 @arduino_bp.get("/ports")
 #@jwt_required()
 def list_ports():
-    print([ {"port": port["device"],"name":port["name"] ,"description": port["description"], "manufacturer": port["manufacturer"]}
-        for port in arduino_manager.list_ports()
-    ])
-    return jsonify([ {"port": port["device"],"name":port["name"] ,"description": port["description"], "manufacturer": port["manufacturer"]}
-        for port in arduino_manager.list_ports()
-    ])
-    #return jsonify( arduino_manager.list_ports())
+    return jsonify(_port_summary(arduino_manager.list_ports()))
 
 
 @arduino_bp.get("/status")
@@ -25,6 +29,16 @@ def status():
     return jsonify(arduino_manager.status())
 
 
+@arduino_bp.get("/metrics")
+#@jwt_required()
+def device_metrics():
+    try:
+        limit = min(max(int(request.args.get("limit") or 50), 0), RECENT_OPERATIONS)
+    except ValueError:
+        return jsonify({"error": "'limit' must be an integer"}), 400
+    return jsonify(arduino_manager.metrics_snapshot(limit=limit))
+
+
 @arduino_bp.post("/connect")
 #@jwt_required()
 #@roles_required("admin")
@@ -46,21 +60,37 @@ def disconnect():
     return jsonify({"success": ok, "message": msg, "status": arduino_manager.status()})
 
 
+@arduino_bp.get("/door-mode")
+#@jwt_required()
+def get_door_mode():
+    return jsonify(door_mode_status())
+
+
+@arduino_bp.post("/door-mode")
+#@jwt_required()
+#@roles_required("admin")
+def set_door_mode():
+    data = request.get_json(force=True, silent=True) or {}
+    if "enabled" not in data:
+        return jsonify({"error": "'enabled' is required"}), 400
+    if data.get("enabled"):
+        changed = start_door_mode(current_app._get_current_object())
+    else:
+        changed = stop_door_mode()
+    return jsonify({"success": True, "changed": changed, **door_mode_status()})
+
+
 @arduino_bp.get("/refresh-ports")
 #@jwt_required()
 def refresh():
-    # Alias to list ports (forces re-enumeration)
-    print([ {"port": port["device"],"name":port["name"] ,"description": port["description"], "manufacturer": port["manufacturer"]}
-        for port in arduino_manager.list_ports()
-    ])
-    return jsonify([ {"port": port["device"],"name":port["name"] ,"description": port["description"], "manufacturer": port["manufacturer"]}
-        for port in arduino_manager.list_ports()
-    ])
+    # Forces a rescan; device changes are also pushed as 'ports' SSE events
+    return jsonify(_port_summary(arduino_manager.refresh_ports()))
 
 
 @arduino_bp.post("/test-capture")
 #@jwt_required()
 #@roles_required("admin")
+@idempotent
 def test_capture():
     data = request.get_json(force=True, silent=True) or {}
     entity = (data.get("entity") or "").strip().lower()
@@ -73,5 +103,7 @@ def test_capture():
     except Exception:
         return jsonify({"error": "'entity_id' must be an integer"}), 400
 
-    success, message = arduino_manager.capture_fingerprint(entity=entity, entity_id=entity_id, max_retries=max_retries)
+    success, message = arduino_manager.capture_fingerprint(
+        entity=entity, entity_id=entity_id, max_retries=max_retries, deadline=request_deadline()
+    )
     return jsonify({"success": success, "response": message}) , (200 if success else 400)
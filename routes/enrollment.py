@@ -0,0 +1,64 @@
+from flask import Blueprint, current_app, jsonify, request
+
+from services.enrollment_service import (
+    create_campaign,
+    get_campaign,
+    start_campaign,
+    retry_campaign,
+    cancel_campaign,
+)
+
+enrollment_bp = Blueprint("enrollment", __name__)
+
+
+@enrollment_bp.post("/campaigns")
+#@jwt_required()
+#@roles_required("admin")
+def add_campaign():
+    data = request.get_json(force=True, silent=True) or {}
+    try:
+        campaign = create_campaign(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if data.get("start", True):
+        start_campaign(current_app._get_current_object(), campaign["id"])
+        campaign = get_campaign(campaign["id"])
+    return jsonify(campaign), 201
+
+
+@enrollment_bp.get("/campaigns/<int:campaign_id>")
+def show_campaign(campaign_id: int):
+    campaign = get_campaign(campaign_id)
+    if not campaign:
+        return jsonify({"error": "Campaign not found"}), 404
+    return jsonify(campaign)
+
+
+@enrollment_bp.post("/campaigns/<int:campaign_id>/start")
+def resume_campaign(campaign_id: int):
+    if not get_campaign(campaign_id):
+        return jsonify({"error": "Campaign not found"}), 404
+    started = start_campaign(current_app._get_current_object(), campaign_id)
+    return jsonify({"success": started, "campaign": get_campaign(campaign_id)})
+
+
+@enrollment_bp.post("/campaigns/<int:campaign_id>/retry")
+def retry_failed(campaign_id: int):
+    data = request.get_json(force=True, silent=True) or {}
+    item_ids = data.get("itemIds")
+    try:
+        item_ids = [int(i) for i in item_ids] if item_ids is not None else None
+    except (TypeError, ValueError):
+        return jsonify({"error": "'itemIds' must be a list of integers"}), 400
+    campaign = retry_campaign(current_app._get_current_object(), campaign_id, item_ids)
+    if not campaign:
+        return jsonify({"error": "Campaign not found"}), 404
+    return jsonify(campaign)
+
+
+@enrollment_bp.post("/campaigns/<int:campaign_id>/cancel")
+def stop_campaign(campaign_id: int):
+    campaign = cancel_campaign(campaign_id)
+    if not campaign:
+        return jsonify({"error": "Campaign not found"}), 404
+    return jsonify(campaign)
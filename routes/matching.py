@@ -0,0 +1,53 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import get_jwt, jwt_required
+
+from utils.auth_utils import roles_required
+from services.template_service import decode_template, delete_templates, identify, store_template
+
+matching_bp = Blueprint("matching", __name__)
+
+
+@matching_bp.post("/templates")
+@jwt_required()
+@roles_required("admin")
+def add_template():
+    data = request.get_json(force=True, silent=True) or {}
+    try:
+        person_id = int(data.get("personId"))
+    except (TypeError, ValueError):
+        return jsonify({"error": "'personId' must be an integer"}), 400
+    try:
+        stored = store_template(person_id, decode_template(data.get("template")))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if stored is None:
+        return jsonify({"error": "Person not found"}), 404
+    return jsonify(stored), 201
+
+
+@matching_bp.delete("/templates/<int:person_id>")
+@jwt_required()
+@roles_required("admin")
+def remove_templates(person_id: int):
+    return jsonify({"deleted": delete_templates(person_id)})
+
+
+@matching_bp.post("/identify")
+@jwt_required()
+@roles_required("admin", "kiosk")
+def identify_template():
+    """1:N: who does this probe template belong to?
+
+    Admins get the ranked candidates with confidences; a kiosk only learns the
+    match itself, so the endpoint cannot be used to enumerate people or tune a probe.
+    """
+    data = request.get_json(force=True, silent=True) or {}
+    try:
+        probe = decode_template(data.get("template"))
+        top_k = int(data.get("topK") or 5)
+        result = identify(probe, top_k=top_k)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if get_jwt().get("role") != "admin":
+        result = {key: result[key] for key in ("matched", "personId", "entityType")}
+    return jsonify(result)
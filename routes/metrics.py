@@ -0,0 +1,13 @@
+from flask import Blueprint, Response
+
+from utils.metrics import metrics
+from utils.sse import sse_broker
+
+metrics_bp = Blueprint("metrics", __name__)
+
+metrics.gauge("sse_subscribers", "Open SSE subscriber queues.", callback=sse_broker.subscriber_count)
+
+
+@metrics_bp.get("")
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
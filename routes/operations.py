@@ -0,0 +1,20 @@
+from flask import Blueprint, jsonify, request
+
+from utils.operations import operations
+
+operations_bp = Blueprint("operations", __name__)
+
+# Upper bound for ?wait= long-polls
+MAX_WAIT_SECONDS = 30.0
+
+
+@operations_bp.get("/<op_id>")
+def get_operation(op_id: str):
+    try:
+        wait = min(max(float(request.args.get("wait") or 0), 0.0), MAX_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({"error": "'wait' must be a number of seconds"}), 400
+    op = operations.get(op_id, wait=wait)
+    if not op:
+        return jsonify({"error": "Operation not found"}), 404
+    return jsonify(op)
@@ -0,0 +1,36 @@
+from flask import Blueprint, jsonify, request
+from flask_jwt_extended import jwt_required
+
+from utils.auth_utils import roles_required
+from services.sensor_service import list_sensors, person_slots, rebalance, register_sensor
+
+sensors_bp = Blueprint("sensors", __name__)
+
+
+@sensors_bp.get("")
+def get_sensors():
+    """Registered readers with slot occupancy (used, enrolled, free)."""
+    return jsonify(list_sensors())
+
+
+@sensors_bp.post("")
+@jwt_required()
+@roles_required("admin")
+def add_sensor():
+    data = request.get_json(force=True, silent=True) or {}
+    try:
+        return jsonify(register_sensor(data)), 201
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+
+@sensors_bp.post("/rebalance")
+@jwt_required()
+@roles_required("admin")
+def rebalance_sensors():
+    return jsonify(rebalance())
+
+
+@sensors_bp.get("/people/<int:person_id>")
+def get_person_slots(person_id: int):
+    return jsonify(person_slots(person_id))
@@ -1,9 +1,21 @@
-from flask import Blueprint, jsonify, request
-from utils.arduino import arduino_manager
+from typing import Optional
+
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt
+from utils.operations import operations, wants_async, accepted, request_deadline
 import uuid
 
+from services.change_service import changes_since, current_cursor
+from utils.auth_utils import check_roles
+from utils.idempotency import idempotent
+from services.sensor_service import enroll_person, verify_person
+from services.template_service import decode_template, verify_template
+from utils.response_cache import cached_response
+from utils.serialization import JSON, columnar_response, negotiate
+
 from services.student_service import (
-    get_all_students,
+    get_all_students_json,
+    get_all_students_columns,
     create_student,
     update_student,
     delete_student,
@@ -14,6 +26,7 @@ students_bp = Blueprint("students", __name__)
 # In-memory session store for biometric enrollment (for demo; replace with DB/cache in prod)
 biometric_sessions = {}
 @students_bp.post("/biometric/enroll")
+@idempotent
 def start_biometric_enrollment():
     data = request.get_json(force=True, silent=True) or {}
     student_id = data.get("studentId")
@@ -32,7 +45,9 @@ def start_biometric_enrollment():
     # Start enrollment (simulate async, but run inline for now)
     max_retries: int = 3
     per_try_timeout: float = 40.0
-    success, message = arduino_manager.enroll_fingerprint(entity_id=student_id, max_retries=max_retries, per_try_timeout=per_try_timeout)
+    success, message = enroll_person(
+        student_id, max_retries=max_retries, per_try_timeout=per_try_timeout, deadline=request_deadline()
+    )
     biometric_sessions[session_id]["status"] = "success" if success else "failed"
     biometric_sessions[session_id]["result"] = message
     return jsonify({"success": success, "sessionId": session_id, "message": message})
@@ -56,7 +71,14 @@ def cancel_biometric_session(session_id):
     return jsonify({"success": True})
 
 
+def _verify_student(student_id: int, deadline: Optional[float] = None) -> dict:
+    success, message, matched_id, _ = verify_person(student_id, deadline=deadline)
+    confidence = 100 if success else 0  # The firmware reports no score; send 'template' for a scored match
+    return {"success": success, "confidence": confidence, "message": message, "matchedId": matched_id}
+
+
 @students_bp.post("/biometric/verify")
+@idempotent
 def verify_student_fingerprint():
     data = request.get_json(force=True, silent=True) or {}
     student_id = data.get("studentId")
@@ -64,16 +86,48 @@ def verify_student_fingerprint():
         student_id = int(student_id)
     except Exception:
         return jsonify({"success": False, "error": "Invalid studentId"}), 400
-    success, message, matched_id = arduino_manager.verify_fingerprint(expected_id=student_id)
-    confidence = 100 if success else 0  # Simulate confidence
-    return jsonify({"success": success, "confidence": confidence, "message": message, "matchedId": matched_id})
+    if data.get("template") is not None:
+        # Probe read by the kiosk: match in software against stored templates. Only admins
+        # see the confidence, so the score cannot be used to tune a probe for a named person
+        denied = check_roles("admin", "kiosk")
+        if denied:
+            return denied
+        try:
+            result = verify_template("student", student_id, decode_template(data.get("template")))
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if get_jwt().get("role") != "admin":
+            result = {key: result[key] for key in ("success", "matchedId")}
+        return jsonify(result)
+    if wants_async(data):
+        return accepted(operations.submit(
+            "student_verify", _verify_student, student_id,
+            deadline=request_deadline(), app=current_app._get_current_object(),
+        ))
+    return jsonify(_verify_student(student_id, deadline=request_deadline()))
 
 
 @students_bp.get("")
+@cached_response("students")
 def list_students():
-    students = get_all_students()
-    print(students)
-    return jsonify(students)
+    # Read the cursor first: changes racing with the listing are replayed, not lost
+    cursor = current_cursor("student")
+    headers = {"X-Change-Cursor": str(cursor), "Vary": "Accept"}
+    fmt = negotiate()
+    if fmt != JSON:
+        return columnar_response(*get_all_students_columns(), fmt, headers=headers)
+    return Response(get_all_students_json(), mimetype=JSON, headers=headers)
+
+
+@students_bp.get("/changes")
+def student_changes():
+    """Delta sync: students created/updated/deleted after ?since=<cursor> (see X-Change-Cursor on GET /students)."""
+    try:
+        since = int(request.args.get("since") or 0)
+        limit = int(request.args.get("limit") or 1000)
+    except ValueError:
+        return jsonify({"error": "'since' and 'limit' must be integers"}), 400
+    return jsonify(changes_since("student", since, limit))
 
 
 @students_bp.post("")
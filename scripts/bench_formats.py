@@ -0,0 +1,74 @@
+"""Compare list-response formats: payload size and server-side build+encode time.
+
+Usage: python scripts/bench_formats.py [students] [runs]
+
+Seeds a temporary SQLite database and times GET /students in each format,
+with the response cache disabled. Row JSON is timed twice: with the row
+fragment cache emptied before every request (to_dict + encode for every row)
+and with it warm.
+"""
+from __future__ import annotations
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+ACCEPTS = {
+    "json (rows, cold)": "application/json",
+    "json (rows, warm)": "application/json",
+    "columnar json": "application/vnd.fac.columnar+json",
+    "msgpack (columnar)": "application/x-msgpack",
+}
+
+
+def main() -> None:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+
+    from app import create_app
+    from models import Student
+    from utils.db import db
+    from utils.fragment_cache import fragment_cache
+
+    fd, db_path = tempfile.mkstemp(prefix="bench_formats_", suffix=".db")
+    os.close(fd)
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "RESPONSE_CACHE_ENABLED": False})
+    with app.app_context():
+        db.create_all()
+        db.session.add_all([
+            Student(first_name=f"First{i}", last_name=f"Last{i}", email=f"student{i}@example.com",
+                    major="Computer Science", student_number=f"S{i:06d}", year=1 + i % 5, fingerprint_id=str(i + 1))
+            for i in range(count)
+        ])
+        db.session.commit()
+
+    client = app.test_client()
+    print(f"{count} students, median of {runs} runs")
+    print(f"{'format':<20}{'bytes':>12}{'gzip bytes':>12}{'ms':>9}  (whole request: query + build + encode)")
+    for label, accept in ACCEPTS.items():
+        timings, body = [], b""
+        for _ in range(runs + 1):
+            if "cold" in label:
+                fragment_cache.clear()
+            started = time.perf_counter()
+            response = client.get("/students", headers={"Accept": accept})
+            timings.append((time.perf_counter() - started) * 1000)
+            body = response.get_data()
+        if response.mimetype != accept:
+            print(f"{label:<20}  skipped (got {response.mimetype}; pip install msgpack)")
+            continue
+        # The first run warms the fragment cache and SQLite's page cache
+        print(f"{label:<20}{len(body):>12}{len(zlib.compress(body, 6)):>12}{statistics.median(timings[1:]):>9.1f}")
+    os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    main()
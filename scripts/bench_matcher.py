@@ -0,0 +1,55 @@
+"""Software matcher throughput: 1:N identify latency as the enrolled set grows.
+
+Usage: python scripts/bench_matcher.py [people ...]   (needs numpy)
+
+Synthetic templates: one random 512-byte template per person, probes are a
+noisy re-read of a random enrolled template. A per-template Python loop over
+the same normalised vectors is timed on the smallest set for comparison.
+"""
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+def main() -> None:
+    import numpy as np
+
+    from utils.matcher import TemplateMatcher
+
+    sizes = [int(a) for a in sys.argv[1:]] or [1000, 10000, 50000]
+    rng = np.random.default_rng(1)
+    print(f"{'people':>8}{'load ms':>10}{'identify ms':>13}{'hits':>7}")
+    for n in sizes:
+        templates = rng.integers(0, 256, size=(n, 512), dtype=np.uint8)
+        matcher = TemplateMatcher()
+        started = time.perf_counter()
+        matcher.load((i + 1, templates[i].tobytes()) for i in range(n))
+        load_ms = (time.perf_counter() - started) * 1000
+        timings, hits = [], 0
+        for _ in range(50):
+            target = int(rng.integers(n))
+            probe = np.clip(templates[target] + rng.normal(0, 40, 512), 0, 255).astype(np.uint8).tobytes()
+            started = time.perf_counter()
+            best = matcher.identify(probe, top_k=1)
+            timings.append((time.perf_counter() - started) * 1000)
+            hits += best[0][0] == target + 1
+        print(f"{n:>8}{load_ms:>10.1f}{statistics.median(timings):>13.3f}{hits:>5}/50")
+
+    n = sizes[0]
+    rows = [list(map(float, row)) for row in matcher._matrix[:n]] if len(matcher) >= n else []
+    if rows:
+        probe = list(map(float, matcher._matrix[0]))
+        started = time.perf_counter()
+        max(sum(a * b for a, b in zip(row, probe)) for row in rows)
+        print(f"python loop over {n} templates: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
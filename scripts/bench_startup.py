@@ -0,0 +1,43 @@
+"""Measure cold import and app-factory time in fresh interpreters.
+
+Usage: python scripts/bench_startup.py [runs]
+"""
+from __future__ import annotations
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+app.create_app()
+t2 = time.perf_counter()
+print((t1 - t0) * 1000, (t2 - t1) * 1000, int("serial" in sys.modules))
+"""
+
+
+def main() -> None:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    imports, factories, serial_loaded = [], [], 0
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.split()
+        imports.append(float(out[0]))
+        factories.append(float(out[1]))
+        serial_loaded += int(out[2])
+
+    print(f"runs: {runs}")
+    print(f"import app      median {statistics.median(imports):7.1f} ms  min {min(imports):7.1f} ms")
+    print(f"create_app()    median {statistics.median(factories):7.1f} ms  min {min(factories):7.1f} ms")
+    print(f"pyserial loaded in {serial_loaded}/{runs} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,330 @@
+"""End-to-end load generator: kiosks, admin dashboards, SSE listeners and CRUD
+against the real HTTP API.
+
+By default it starts the app in-process (threaded Werkzeug server, throw-away
+SQLite database) and connects it to a simulated sensor, so nothing but this
+repository is needed:
+
+    python scripts/loadgen.py --kiosks 8 --admins 4 --streams 20 --duration 30
+
+Point it at a running backend instead with --url. That server needs
+ARDUINO_SIMULATOR=1 for --port sim://..., or a real --port, or --no-connect:
+
+    python scripts/loadgen.py --url http://127.0.0.1:5000 --username admin --password ...
+
+Reports throughput, latency percentiles and errors per scenario, plus SSE
+delivery lag: the time from an access log's created_at to its arrival on each
+/access/stream client.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+class Stats:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+        self.statuses: Dict[str, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+        self.sse_lag: List[float] = []
+        self.sse_events = 0
+
+    def record(self, name: str, seconds: float, status: int) -> None:
+        with self._lock:
+            self.latencies[name].append(seconds)
+            self.statuses[name][status] += 1
+            if status >= 500 or status == 0:
+                self.errors[name] += 1
+
+    def record_event(self, lag: Optional[float]) -> None:
+        with self._lock:
+            self.sse_events += 1
+            if lag is not None:
+                self.sse_lag.append(lag)
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))]
+
+
+class Api:
+    """One keep-alive HTTP connection per worker thread."""
+
+    def __init__(self, base_url: str, stats: Stats, token: Optional[str] = None) -> None:
+        url = urlsplit(base_url)
+        self.host, self.port = url.hostname, url.port or 80
+        self.stats = stats
+        self.token = token
+        self._conn: Optional[http.client.HTTPConnection] = None
+
+    def request(self, name: str, method: str, path: str, body: Optional[dict] = None) -> Tuple[int, object]:
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        started = time.perf_counter()
+        status, data = 0, None
+        try:
+            if self._conn is None:
+                self._conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            self._conn.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+            response = self._conn.getresponse()
+            raw = response.read()
+            status = response.status
+            data = json.loads(raw) if raw else None
+        except (OSError, http.client.HTTPException, ValueError):
+            if self._conn is not None:
+                self._conn.close()
+            self._conn = None
+        self.stats.record(name, time.perf_counter() - started, status)
+        return status, data
+
+
+def login(base_url: str, username: str, password: str, stats: Stats) -> str:
+    api = Api(base_url, stats)
+    status, data = api.request("login", "POST", "/auth/login", {"identifier": username, "password": password})
+    if status != 200:
+        api.request("register", "POST", "/auth/register", {
+            "username": username, "email": f"{username}@loadgen.local", "password": password, "role": "admin",
+        })
+        status, data = api.request("login", "POST", "/auth/login", {"identifier": username, "password": password})
+    if status != 200:
+        raise SystemExit(f"login as {username} failed ({status}): {data}")
+    return data["access_token"]
+
+
+def existing_people(api: Api) -> List[int]:
+    """Kiosk targets on a remote backend: enrolled students, or every student if none is."""
+    status, data = api.request("seed", "GET", "/students")
+    if status != 200:
+        return []
+    enrolled = [s["id"] for s in data if s.get("fingerprintVerified")]
+    return enrolled or [s["id"] for s in data]
+
+
+def kiosk(api: Api, ids: List[int], stop: threading.Event, sim_name: Optional[str]) -> None:
+    from utils.serial_sim import SimulatedSerial
+
+    while not stop.is_set():
+        student_id = random.choice(ids)
+        if sim_name:
+            SimulatedSerial.present(sim_name, student_id)
+        api.request("kiosk verify", "POST", "/access/verify", {"entity_type": "student", "entity_id": student_id})
+
+
+def admin(api: Api, stop: threading.Event, interval: float) -> None:
+    while not stop.is_set():
+        api.request("admin /students", "GET", "/students")
+        api.request("admin /access/logs", "GET", "/access/logs?period=day&limit=100")
+        stop.wait(interval)
+
+
+def crud(api: Api, stop: threading.Event, interval: float, worker: int) -> None:
+    n = 0
+    while not stop.is_set():
+        n += 1
+        status, data = api.request("crud create", "POST", "/students", {
+            "firstName": f"Crud{worker}", "lastName": str(n), "email": f"crud{worker}.{n}.{time.time_ns()}@loadgen.local",
+        })
+        if status == 201:
+            api.request("crud update", "PUT", f"/students/{data['id']}", {"major": "Load"})
+            api.request("crud delete", "DELETE", f"/students/{data['id']}")
+        stop.wait(interval)
+
+
+def sse_listener(base_url: str, token: str, stats: Stats, stop: threading.Event, ready: threading.Barrier) -> None:
+    url = urlsplit(base_url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80, timeout=1.0)
+    try:
+        conn.request("GET", "/access/stream", headers={"Authorization": f"Bearer {token}"})
+        response = conn.getresponse()
+        response.readline()  # first line of the initial ping
+        ready.wait()
+        event = None
+        while not stop.is_set():
+            try:
+                line = response.readline()
+            except OSError:
+                continue
+            if not line:
+                break
+            text = line.decode("utf-8").strip()
+            if text.startswith("event:"):
+                event = text[6:].strip()
+            elif text.startswith("data:") and event == "access":
+                received = datetime.utcnow()
+                lag = None
+                try:
+                    created = datetime.fromisoformat(json.loads(text[5:])["created_at"])
+                    lag = (received - created).total_seconds()
+                except (ValueError, KeyError, TypeError):
+                    pass
+                stats.record_event(lag)
+    finally:
+        conn.close()
+
+
+def start_local_server() -> Tuple[str, object, str]:
+    """Run the app on a free port with a temporary database; returns (base_url, app, db_path)."""
+    os.environ.setdefault("ARDUINO_SIMULATOR", "1")
+    from werkzeug.serving import make_server
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+
+    from app import create_app
+    from utils.db import init_db
+
+    fd, db_path = tempfile.mkstemp(prefix="loadgen_", suffix=".db")
+    os.close(fd)
+    app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{db_path}", "PROFILE_SLOW_MS": 0})
+    with app.app_context():
+        init_db()
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, name="loadgen-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", app, db_path
+
+
+def seed_people(app, count: int) -> List[int]:
+    """Insert enrolled students directly, so /access/verify reaches the sensor for each of them."""
+    from models import Student
+    from utils.db import db
+
+    with app.app_context():
+        students = [
+            Student(name=f"Load {i}", email=f"load{i}@loadgen.local", fingerprint_id=str(i + 1), fingerprint_verified=True)
+            for i in range(count)
+        ]
+        db.session.add_all(students)
+        db.session.commit()
+        return [s.id for s in students]
+
+
+def report(stats: Stats, elapsed: float, as_json: bool) -> None:
+    rows = []
+    for name in sorted(stats.latencies):
+        values = stats.latencies[name]
+        rows.append({
+            "scenario": name,
+            "requests": len(values),
+            "rps": len(values) / elapsed,
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": max(values) * 1000,
+            "errors": stats.errors.get(name, 0),
+            "statuses": dict(stats.statuses[name]),
+        })
+    lag = stats.sse_lag
+    sse = {
+        "events": stats.sse_events,
+        "lag_p50_ms": percentile(lag, 0.50) * 1000 if lag else None,
+        "lag_p95_ms": percentile(lag, 0.95) * 1000 if lag else None,
+        "lag_max_ms": max(lag) * 1000 if lag else None,
+    }
+    if as_json:
+        print(json.dumps({"elapsed_s": elapsed, "scenarios": rows, "sse": sse}, indent=2))
+        return
+    print(f"duration {elapsed:.1f} s")
+    print(f"{'scenario':<22}{'reqs':>7}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}{'errors':>8}")
+    for r in rows:
+        print(f"{r['scenario']:<22}{r['requests']:>7}{r['rps']:>8.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+              f"{r['p99_ms']:>9.1f}{r['max_ms']:>9.1f}{r['errors']:>8}")
+    if sse["lag_p50_ms"] is not None:
+        print(f"SSE: {sse['events']} access events received, lag p50 {sse['lag_p50_ms']:.1f} ms  "
+              f"p95 {sse['lag_p95_ms']:.1f} ms  max {sse['lag_max_ms']:.1f} ms")
+    else:
+        print(f"SSE: {sse['events']} access events received")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="backend base URL (default: start the app in-process)")
+    parser.add_argument("--username", default="loadgen-admin")
+    parser.add_argument("--password", default="Loadgen123!")
+    parser.add_argument("--port", default="sim://loadgen?latency=0.2", help="serial port to connect before the run")
+    parser.add_argument("--no-connect", action="store_true", help="leave the device connection as it is")
+    parser.add_argument("--kiosks", type=int, default=4, help="threads calling /access/verify back to back")
+    parser.add_argument("--admins", type=int, default=2, help="threads polling /students and /access/logs")
+    parser.add_argument("--admin-interval", type=float, default=1.0)
+    parser.add_argument("--streams", type=int, default=10, help="open /access/stream SSE clients")
+    parser.add_argument("--crud", type=int, default=1, help="threads creating/updating/deleting students")
+    parser.add_argument("--crud-interval", type=float, default=0.5)
+    parser.add_argument("--people", type=int, default=50, help="students seeded for the kiosks (in-process only)")
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    app = db_path = None
+    base_url = args.url
+    if base_url is None:
+        base_url, app, db_path = start_local_server()
+    stats = Stats()
+    token = login(base_url, args.username, args.password, stats)
+    setup = Api(base_url, stats, token)
+
+    sim_name = None
+    if not args.no_connect:
+        status, data = setup.request("connect", "POST", "/arduino/connect", {"port": args.port})
+        if status != 200:
+            raise SystemExit(f"connect {args.port} failed ({status}): {data}")
+        if app is not None and args.port.startswith("sim://"):
+            # present() only reaches a simulator in this process
+            sim_name = urlsplit(args.port).netloc
+    ids = seed_people(app, args.people) if app is not None else existing_people(setup)
+    if not ids:
+        raise SystemExit("no students to verify")
+    stats.__init__()  # report the steady state only
+
+    stop = threading.Event()
+    ready = threading.Barrier(args.streams + 1)
+    threads = [
+        threading.Thread(target=sse_listener, args=(base_url, token, stats, stop, ready), daemon=True)
+        for _ in range(args.streams)
+    ]
+    for t in threads:
+        t.start()
+    if args.streams:
+        ready.wait(timeout=10)
+    workers = (
+        [threading.Thread(target=kiosk, args=(Api(base_url, stats), ids, stop, sim_name)) for _ in range(args.kiosks)]
+        + [threading.Thread(target=admin, args=(Api(base_url, stats, token), stop, args.admin_interval))
+           for _ in range(args.admins)]
+        + [threading.Thread(target=crud, args=(Api(base_url, stats), stop, args.crud_interval, i))
+           for i in range(args.crud)]
+    )
+    started = time.perf_counter()
+    for t in workers:
+        t.start()
+    time.sleep(args.duration)
+    stop.set()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - started
+    report(stats, elapsed, args.json)
+    if db_path is not None:
+        os.unlink(db_path)
+
+
+if __name__ == "__main__":
+    main()
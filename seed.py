@@ -3,8 +3,8 @@ from __future__ import annotations
 import os
 from faker import Faker
 
-from app import app
-from utils.db import db
+from app import create_app
+from utils.db import db, init_db
 from models import Student, Professor, User
 
 
@@ -78,9 +78,10 @@ def main():
     fake = Faker()
     fake.seed_instance(12345)
 
+    app = create_app()
     with app.app_context():
         # Create tables if not exist
-        db.create_all()
+        init_db()
 
         ensure_admin(fake)
         seed_students(fake, n=count)
@@ -1,12 +1,17 @@
 from __future__ import annotations
 
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
 
+from sqlalchemy import and_, func, insert, tuple_
+from sqlalchemy.exc import IntegrityError
 from utils.db import db
 from utils.arduino import arduino_manager
 from utils.sse import sse_broker
-from models import AccessLog, Student, Professor
+from utils.live_stats import live_stats
+from utils.response_cache import generations
+from services.sensor_service import is_sensor_port, people_in_slots, person_for_slot, sensor_ports, verify_person
+from models import AccessLog, Person, Student, Professor
 
 
 def _find_entity(entity_type: str, entity_id: int):
@@ -17,10 +22,11 @@ def _find_entity(entity_type: str, entity_id: int):
     return None
 
 
-def verify_access(entity_type: str, entity_id: int, max_retries: int = 3) -> Dict:
+def verify_access(entity_type: str, entity_id: int, max_retries: int = 3, deadline: Optional[float] = None) -> Dict:
     """
     Triggers the Arduino capture and records an access log with status granted/denied.
     Publishes the event via SSE on success or failure.
+    `deadline` (time.monotonic()) bounds the device wait; see utils.operations.request_deadline.
     """
     if entity_type not in {"student", "professor"}:
         raise ValueError("entity_type must be 'student' or 'professor'")
@@ -35,42 +41,256 @@ def verify_access(entity_type: str, entity_id: int, max_retries: int = 3) -> Dic
         log = _create_log(entity_type, entity_id, status="denied")
         return {"success": False, "message": "Fingerprint not registered", "log": log}
 
-    # Perform capture
-    ok, message, matched_id = arduino_manager.verify_fingerprint(expected_id=entity_id)
+    # Perform capture on the reader holding this person's template
+    ok, message, matched_id, device = verify_person(entity_id, deadline=deadline)
     if ok:
-        log = _create_log(entity_type, entity_id, status="granted")
+        log = _create_log(entity_type, entity_id, status="granted", device=device)
         return {"success": True, "message": message, "matched_id": matched_id, "log": log}
     else:
-        log = _create_log(entity_type, entity_id, status="denied")
+        log = _create_log(entity_type, entity_id, status="denied", device=device)
         return {"success": False, "message": message, "matched_id": matched_id, "log": log}
 
 
-def _create_log(entity_type: str, entity_id: int, status: str) -> Dict:
+def _find_entity_by_fingerprint(slot: int, device: Optional[str] = None) -> Tuple[Optional[str], Optional[object]]:
+    """Resolve a sensor slot to the enrolled student/professor holding it.
+
+    On a registered sensor only its slot assignments count: the sensor keeps
+    templates it cannot delete (a deleted person, a failed enrollment), and those
+    must not resolve to someone else. On the single reader the slot is the person
+    id, the slot enroll_person writes there.
+    """
+    if is_sensor_port(device):
+        person = person_for_slot(device, slot)
+    else:
+        person = Person.query.filter_by(id=slot, fingerprint_verified=True).first()
+    if person is None:
+        return None, None
+    return person.type, person
+
+
+def record_door_result(success: bool, matched_id: Optional[int]) -> Dict:
+    """
+    Turns one unsolicited verification line from the door sensor into an access log.
+    Matches that don't resolve to an enrolled person, and sensor rejections, are
+    logged as denied with entity_type 'unknown' (entity_id is the slot, or 0).
+    """
+    device = arduino_manager.status().get("port")
+    if success and matched_id is not None:
+        entity_type, entity = _find_entity_by_fingerprint(matched_id, device)
+        if entity is not None:
+            return _create_log(entity_type, entity.id, status="granted", device=device)
+    return _create_log("unknown", matched_id if matched_id is not None else 0, status="denied", device=device)
+
+
+def _create_log(entity_type: str, entity_id: int, status: str, device: Optional[str] = None) -> Dict:
+    # Seed the live counters from history before this log exists, so it is counted once
+    live_stats.seed()
     log = AccessLog(
         entity_type=entity_type,
         entity_id=entity_id,
         status=status,
+        device=device,
     )
     db.session.add(log)
     db.session.commit()
+    generations.bump("access_logs")
+    live_stats.record(entity_type, status, device)
 
     payload = log.to_dict()
     sse_broker.publish("access", payload)
     return payload
 
 
+# Largest batch accepted by /access/ingest, and SQLite's bound-parameter headroom per lookup
+MAX_INGEST_EVENTS = 5000
+_LOOKUP_CHUNK = 400
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """ISO 8601 string (offset or 'Z'; naive means UTC) or epoch seconds -> naive UTC."""
+    if isinstance(value, bool):
+        raise ValueError("'ts' must be an ISO 8601 string or epoch seconds")
+    if isinstance(value, (int, float)):
+        try:
+            return datetime(1970, 1, 1) + timedelta(seconds=value)
+        except OverflowError:
+            raise ValueError("'ts' is out of range")
+    if not isinstance(value, str):
+        raise ValueError("'ts' must be an ISO 8601 string or epoch seconds")
+    ts = datetime.fromisoformat(value.strip())
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def _parse_event(raw: Any, default_device: Optional[str]) -> Dict:
+    if not isinstance(raw, dict):
+        raise ValueError("event must be an object")
+    device = raw.get("device") or default_device
+    if not device:
+        raise ValueError("'device' is required (per event or for the batch)")
+    try:
+        sequence = int(raw["seq"])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError("'seq' must be an integer")
+    event = {"device": str(device)[:128], "sequence": sequence, "created_at": _parse_timestamp(raw.get("ts"))}
+    if "slot" in raw:
+        # Door-controller form: what the sensor printed, resolved like record_door_result
+        try:
+            event["slot"] = None if raw["slot"] is None else int(raw["slot"])
+        except (TypeError, ValueError):
+            raise ValueError("'slot' must be an integer")
+        event["success"] = bool(raw.get("success"))
+        return event
+    entity_type = (raw.get("entity_type") or "").strip().lower()
+    if entity_type not in {"student", "professor", "unknown"}:
+        raise ValueError("'entity_type' must be 'student', 'professor' or 'unknown' (or send 'slot')")
+    status = (raw.get("status") or "").strip().lower()
+    if status not in {"granted", "denied"}:
+        raise ValueError("'status' must be 'granted' or 'denied'")
+    try:
+        event.update(entity_type=entity_type, entity_id=int(raw.get("entity_id")), status=status)
+    except (TypeError, ValueError):
+        raise ValueError("'entity_id' must be an integer")
+    return event
+
+
+def _resolve_slots(events: List[Dict]) -> None:
+    """Fill entity_type/entity_id/status for slot events, batched like _find_entity_by_fingerprint:
+    events from a registered sensor resolve through its slot assignments, others to the person id."""
+    matches = [e for e in events if "slot" in e and e["success"] and e["slot"] is not None]
+    sharded = sensor_ports(e["device"] for e in matches)
+    by_sensor = people_in_slots((e["device"], e["slot"]) for e in matches if e["device"] in sharded)
+    slots = sorted({e["slot"] for e in matches if e["device"] not in sharded})
+    owners: Dict[int, Tuple[str, int]] = {}
+    for start in range(0, len(slots), _LOOKUP_CHUNK):
+        rows = db.session.query(Person.id, Person.type).filter(
+            Person.id.in_(slots[start:start + _LOOKUP_CHUNK]), Person.fingerprint_verified.is_(True)
+        )
+        for entity_id, entity_type in rows:
+            owners[entity_id] = (entity_type, entity_id)
+    for event in events:
+        if "slot" not in event:
+            continue
+        slot = event.pop("slot")
+        owner = None
+        if event.pop("success") and slot is not None:
+            if event["device"] in sharded:
+                owner = by_sensor.get((event["device"], slot))
+            else:
+                owner = owners.get(slot)
+        if owner is not None:
+            event.update(entity_type=owner[0], entity_id=owner[1], status="granted")
+        else:
+            event.update(entity_type="unknown", entity_id=slot if slot is not None else 0, status="denied")
+
+
+def _existing_keys(keys: List[Tuple[str, int]]) -> set:
+    found = set()
+    for start in range(0, len(keys), _LOOKUP_CHUNK):
+        chunk = keys[start:start + _LOOKUP_CHUNK]
+        found.update(
+            db.session.query(AccessLog.device, AccessLog.sequence)
+            .filter(tuple_(AccessLog.device, AccessLog.sequence).in_(chunk))
+            .all()
+        )
+    return found
+
+
+def ingest_events(events: List[Any], device: Optional[str] = None) -> Dict:
+    """
+    Stores access events buffered by door controllers while offline.
+
+    Each event carries `seq` (per-device event number), `ts` and either
+    `entity_type`/`entity_id`/`status` or the sensor's `slot`/`success`.
+    Events already stored under the same (device, seq) are skipped, so a batch
+    can be replayed safely. New rows go in with one executemany INSERT; the live
+    counters and response-cache generation are updated once for the batch.
+    Invalid events are reported in `rejected` and do not stop the others.
+    """
+    if len(events) > MAX_INGEST_EVENTS:
+        raise ValueError(f"at most {MAX_INGEST_EVENTS} events per batch")
+    parsed: Dict[Tuple[str, int], Dict] = {}
+    rejected = []
+    for index, raw in enumerate(events):
+        try:
+            event = _parse_event(raw, device)
+        except ValueError as e:
+            rejected.append({"index": index, "error": str(e)})
+            continue
+        # A batch that repeats an event keeps the first copy
+        parsed.setdefault((event["device"], event["sequence"]), event)
+    _resolve_slots(list(parsed.values()))
+
+    live_stats.seed()
+    for attempt in range(2):
+        existing = _existing_keys(list(parsed))
+        rows = [event for key, event in parsed.items() if key not in existing]
+        if not rows:
+            break
+        try:
+            db.session.execute(insert(AccessLog), rows)
+            db.session.commit()
+            break
+        except IntegrityError:
+            # A concurrent replay of the same events won the race: look again
+            db.session.rollback()
+            if attempt:
+                raise
+
+    if rows:
+        generations.bump("access_logs")
+        for event in rows:
+            ts = (event["created_at"] - datetime(1970, 1, 1)).total_seconds()
+            live_stats.record(event["entity_type"], event["status"], event["device"], ts=ts)
+        sse_broker.publish("access_ingest", {
+            "devices": sorted({event["device"] for event in rows}),
+            "inserted": len(rows),
+            "from": min(event["created_at"] for event in rows).isoformat(),
+            "to": max(event["created_at"] for event in rows).isoformat(),
+        })
+    return {
+        "received": len(events),
+        "inserted": len(rows),
+        "duplicates": len(events) - len(rejected) - len(rows),
+        "rejected": rejected,
+    }
+
+
+# Field order of the columnar /access/logs formats
+LOG_FIELDS = ("id", "entity_type", "entity_id", "status", "device", "created_at", "name", "number", "role", "title")
+
+
 def list_logs(
     period: str = "day",
     entity_type: Optional[str] = None,
     role: Optional[str] = None,
+    title: Optional[str] = None,
     limit: int = 100,
     offset: int = 0,
 ) -> List[Dict]:
     """
-    Returns access logs filtered by period (day, week, month, all) and optionally entity_type.
-    Role is a placeholder (if you later store verifier role in logs or want to filter by entity role).
+    Returns access logs filtered by period (day, week, month, all) and optionally entity_type
+    role and professor title, enriched with the person's name, student/employee number,
+    role (student/professor) and title.
+    Everything comes from one query: logs are outer-joined to people, then to the
+    role tables for the student/employee number and title.
     """
-    q = AccessLog.query
+    # Role tables joined as plain tables: mapped Student/Professor would each bring their own copy of people
+    students, professors = Student.__table__, Professor.__table__
+    q = (
+        db.session.query(
+            AccessLog,
+            Person.first_name,
+            Person.last_name,
+            Person.name,
+            func.coalesce(students.c.student_number, professors.c.employee_number),
+            professors.c.title,
+        )
+        .outerjoin(Person, and_(Person.id == AccessLog.entity_id, Person.type == AccessLog.entity_type))
+        .outerjoin(students, students.c.id == Person.id)
+        .outerjoin(professors, professors.c.id == Person.id)
+    )
 
     # Period filter
     now = datetime.utcnow()
@@ -93,12 +313,25 @@ def list_logs(
     if entity_type in {"student", "professor"}:
         q = q.filter(AccessLog.entity_type == entity_type)
 
-    # 'role' left for future use; not stored in AccessLog yet
+    # Role is the entity role; a professor's job title is its own field
+    if role:
+        q = q.filter(func.lower(AccessLog.entity_type) == role.strip().lower())
+    if title:
+        q = q.filter(func.lower(professors.c.title) == title.strip().lower())
 
-    logs = (
+    rows = (
         q.order_by(AccessLog.id.desc())
         .offset(max(offset, 0))
         .limit(max(min(limit, 500), 1))
         .all()
     )
-    return [l.to_dict() for l in logs]
+    return [_enriched(*row) for row in rows]
+
+
+def _enriched(log: AccessLog, first_name, last_name, name, number, title) -> Dict:
+    item = log.to_dict()
+    item["name"] = " ".join(p for p in (first_name, last_name) if p) or name
+    item["number"] = number
+    item["role"] = log.entity_type
+    item["title"] = title
+    return item
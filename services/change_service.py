@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from utils.db import db
+from utils.sse import sse_broker
+from utils.response_cache import generations
+from models import ChangeLog, Student, Professor
+
+MODELS = {"student": Student, "professor": Professor}
+MAX_CHANGES = 1000
+
+
+def record_change(entity_type: str, entity, op: str = "upsert") -> None:
+    """Append a change for `entity` to the current transaction.
+
+    Call it from the write paths before committing. The ChangeLog row commits or
+    rolls back with the roster row. Once the transaction has committed, the
+    dataset's response-cache generation is bumped and the change is published as
+    a `changes` SSE event.
+    """
+    change = ChangeLog(entity_type=entity_type, entity_id=entity.id, op=op)
+    db.session.add(change)
+    # delete: the row is gone by flush time, so the tombstone is built now
+    db.session.info.setdefault("pending_changes", []).append((change, entity if op == "upsert" else None))
+
+
+def current_cursor(entity_type: Optional[str] = None) -> int:
+    q = db.session.query(func.coalesce(func.max(ChangeLog.id), 0))
+    if entity_type:
+        q = q.filter(ChangeLog.entity_type == entity_type)
+    return int(q.scalar())
+
+
+def changes_since(entity_type: str, since: int, limit: int = MAX_CHANGES) -> Dict:
+    """Rows of `entity_type` changed after cursor `since`, one entry per row with its current state.
+
+    Deleted rows come back as tombstones (`op: "delete"`, `data: null`). When
+    `hasMore` is true, call again with the returned cursor.
+    """
+    model = MODELS[entity_type]
+    limit = max(1, min(limit, MAX_CHANGES))
+    changes: List[ChangeLog] = (
+        ChangeLog.query.filter(ChangeLog.entity_type == entity_type, ChangeLog.id > since)
+        .order_by(ChangeLog.id)
+        .limit(limit + 1)
+        .all()
+    )
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    # Several writes to one row since the cursor collapse into its latest change
+    latest: Dict[int, ChangeLog] = {}
+    for change in changes:
+        latest[change.entity_id] = change
+    ids = [entity_id for entity_id, change in latest.items() if change.op != "delete"]
+    rows = {row.id: row for row in model.query.filter(model.id.in_(ids)).all()} if ids else {}
+    items = []
+    for change in sorted(latest.values(), key=lambda c: c.id):
+        row = rows.get(change.entity_id)
+        if row is None:
+            items.append({"seq": change.id, "op": "delete", "id": change.entity_id, "data": None})
+        else:
+            items.append({"seq": change.id, "op": "upsert", "id": change.entity_id, "data": row.to_dict()})
+    cursor = changes[-1].id if changes else max(since, 0)
+    return {"changes": items, "cursor": cursor, "hasMore": has_more}
+
+
+@event.listens_for(Session, "after_flush")
+def _capture_changes(session: Session, flush_context) -> None:
+    pending = session.info.pop("pending_changes", None)
+    if not pending:
+        return
+    flushed = session.info.setdefault("flushed_changes", [])
+    for change, entity in pending:
+        flushed.append({
+            "entity_type": change.entity_type,
+            "seq": change.id,
+            "op": change.op,
+            "id": change.entity_id,
+            "data": entity.to_dict() if entity is not None else None,
+        })
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_changes(session: Session) -> None:
+    for payload in session.info.pop("flushed_changes", []):
+        # Cached roster (and enriched log) responses are stale from here on
+        generations.bump(payload["entity_type"] + "s")
+        sse_broker.publish("changes", payload)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_changes(session: Session, transaction) -> None:
+    # Rolled back (or never committed): the changes never happened
+    if transaction.parent is None:
+        session.info.pop("pending_changes", None)
+        session.info.pop("flushed_changes", None)
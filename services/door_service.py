@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+from flask import Flask
+
+from utils.arduino import arduino_manager
+from services.access_service import record_door_result
+
+
+def start_door_mode(app: Flask) -> bool:
+    """Put the connected sensor in continuous verification; each result becomes an access log + SSE event."""
+
+    def on_result(success: bool, matched_id: Optional[int], raw: str) -> None:
+        with app.app_context():
+            record_door_result(success, matched_id)
+
+    return arduino_manager.start_door_mode(on_result)
+
+
+def stop_door_mode() -> bool:
+    return arduino_manager.stop_door_mode()
+
+
+def door_mode_status() -> Dict:
+    status = arduino_manager.status()
+    return {"enabled": status.get("door_mode", False), "connected": status.get("connected", False)}
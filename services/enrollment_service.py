@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+
+from utils.db import db
+from utils.arduino import arduino_manager
+from utils.sse import sse_broker
+from utils.scheduler import DeviceBusy
+from services.change_service import record_change
+from services.sensor_service import SensorCapacityError, enroll_person, reserve_slots, sharding_enabled
+from models import EnrollmentCampaign, EnrollmentCampaignItem, Person, Student, Professor
+
+# Pause between two people so the operator can call the next one up
+STEP_DELAY = 1.0
+
+_runners: Dict[int, threading.Thread] = {}
+_runners_lock = threading.Lock()
+
+
+def _parse_people(data: Dict[str, Any]) -> List[Tuple[str, int]]:
+    people: List[Tuple[str, int]] = []
+    for entity_type, key in (("student", "studentIds"), ("professor", "professorIds")):
+        for raw in data.get(key) or []:
+            try:
+                people.append((entity_type, int(raw)))
+            except (TypeError, ValueError):
+                raise ValueError(f"'{key}' must contain integer ids")
+    for entry in data.get("people") or []:
+        entity_type = (entry.get("type") or "").strip().lower()
+        if entity_type not in {"student", "professor"}:
+            raise ValueError("people[].type must be 'student' or 'professor'")
+        try:
+            people.append((entity_type, int(entry.get("id"))))
+        except (TypeError, ValueError):
+            raise ValueError("people[].id must be an integer")
+    if not people:
+        raise ValueError("Provide 'studentIds', 'professorIds' or 'people'")
+    # Keep the first occurrence of each person, in submission order
+    seen = set()
+    unique = []
+    for person in people:
+        if person not in seen:
+            seen.add(person)
+            unique.append(person)
+    return unique
+
+
+def _find_entity(entity_type: str, entity_id: int):
+    model = Student if entity_type == "student" else Professor
+    return model.query.get(entity_id)
+
+
+def _slot_for(entity, sharded: bool) -> Optional[int]:
+    """The sensor slot to enroll into; None if no sensor has room for the person.
+
+    With registered sensors the slot is reserved (and committed) from the sensor
+    assignments. Otherwise it is the person id, as for /biometric/enroll and verify_person.
+    """
+    if sharded:
+        try:
+            return reserve_slots(entity.id)[0].slot
+        except SensorCapacityError:
+            return None
+    return int(entity.id)
+
+
+def _slot_problem(item: EnrollmentCampaignItem) -> Optional[str]:
+    """Why the single reader must not be written at item.slot, or None if it is safe."""
+    capacity = current_app.config["SENSOR_CAPACITY"]
+    if not 0 <= item.slot < capacity:
+        return f"Slot {item.slot} is outside the sensor's 0-{capacity - 1}"
+    # Someone enrolled under the old fingerprint_id slots may still own this template
+    holder = (
+        Person.query.filter(Person.fingerprint_id == str(item.slot), Person.fingerprint_verified.is_(True),
+                            Person.id != item.entity_id)
+        .order_by(Person.id)
+        .first()
+    )
+    if holder is not None:
+        return f"Slot {item.slot} is already held by {holder.type} {holder.id}"
+    return None
+
+
+def create_campaign(data: Dict[str, Any]) -> dict:
+    people = _parse_people(data)
+    campaign = EnrollmentCampaign(
+        name=(data.get("name") or "").strip() or None,
+        max_retries=int(data.get("max_retries") or 3),
+        per_try_timeout=float(data.get("per_try_timeout") or 40.0),
+    )
+    entities = [(entity_type, entity_id, _find_entity(entity_type, entity_id)) for entity_type, entity_id in people]
+    missing = [f"{entity_type}:{entity_id}" for entity_type, entity_id, entity in entities if entity is None]
+    if missing:
+        raise ValueError(f"Unknown people: {', '.join(missing)}")
+    # Slots reserved here stay with the person even if the campaign is rejected for lack of room
+    slotless = []
+    sharded = sharding_enabled()
+    for position, (entity_type, entity_id, entity) in enumerate(entities):
+        slot = _slot_for(entity, sharded)
+        if slot is None:
+            slotless.append(f"{entity_type}:{entity_id}")
+            continue
+        campaign.items.append(
+            EnrollmentCampaignItem(position=position, entity_type=entity_type, entity_id=entity_id, slot=slot)
+        )
+    if slotless:
+        raise ValueError(f"People with no free sensor slot: {', '.join(slotless)}")
+    db.session.add(campaign)
+    db.session.commit()
+    return campaign.to_dict()
+
+
+def get_campaign(campaign_id: int) -> Optional[dict]:
+    campaign = EnrollmentCampaign.query.get(campaign_id)
+    return campaign.to_dict() if campaign else None
+
+
+def start_campaign(app: Flask, campaign_id: int) -> bool:
+    """Run the campaign's pending items on the device in a background thread. False if already running."""
+    with _runners_lock:
+        return _start_locked(app, campaign_id)
+
+
+def _start_locked(app: Flask, campaign_id: int) -> bool:
+    # Caller holds _runners_lock
+    runner = _runners.get(campaign_id)
+    if runner is not None and runner.is_alive():
+        return False
+    campaign = EnrollmentCampaign.query.get(campaign_id)
+    if campaign is None or campaign.status == "cancelled":
+        return False
+    campaign.status = "running"
+    db.session.commit()
+    runner = threading.Thread(
+        target=_run_campaign, args=(app, campaign_id), name=f"enroll-campaign-{campaign_id}", daemon=True
+    )
+    _runners[campaign_id] = runner
+    runner.start()
+    return True
+
+
+def retry_campaign(app: Flask, campaign_id: int, item_ids: Optional[List[int]] = None) -> Optional[dict]:
+    """Requeue failed items (all, or the given ids) and resume the campaign if it had stopped."""
+    with _runners_lock:
+        # Under the runner lock: a runner that is finishing either sees these items
+        # when it re-checks for pending work, or has already unregistered and a new one starts
+        campaign = EnrollmentCampaign.query.get(campaign_id)
+        if campaign is None:
+            return None
+        for item in campaign.items:
+            if item.status == "failed" and (item_ids is None or item.id in item_ids):
+                item.status = "pending"
+                item.message = None
+        if campaign.status != "running":
+            campaign.status = "pending"
+        db.session.commit()
+        _start_locked(app, campaign_id)
+    return EnrollmentCampaign.query.get(campaign_id).to_dict()
+
+
+def cancel_campaign(campaign_id: int) -> Optional[dict]:
+    """Stops after the person currently enrolling; their result is still recorded."""
+    campaign = EnrollmentCampaign.query.get(campaign_id)
+    if campaign is None:
+        return None
+    campaign.status = "cancelled"
+    db.session.commit()
+    return campaign.to_dict()
+
+
+def _publish(campaign: EnrollmentCampaign, item: EnrollmentCampaignItem, next_item=None) -> None:
+    sse_broker.publish(
+        "enrollment",
+        {
+            "campaign_id": campaign.id,
+            "campaign_status": campaign.status,
+            "item": item.to_dict(),
+            "next": next_item.to_dict() if next_item is not None else None,
+        },
+    )
+
+
+def _next_pending(campaign_id: int) -> Optional[EnrollmentCampaignItem]:
+    return (
+        EnrollmentCampaignItem.query.filter_by(campaign_id=campaign_id, status="pending")
+        .order_by(EnrollmentCampaignItem.position)
+        .first()
+    )
+
+
+def _run_campaign(app: Flask, campaign_id: int) -> None:
+    with app.app_context():
+        # Items left 'running' by a crashed worker start over
+        EnrollmentCampaignItem.query.filter_by(campaign_id=campaign_id, status="running").update({"status": "pending"})
+        db.session.commit()
+        first = True
+        while True:
+            db.session.expire_all()
+            campaign = EnrollmentCampaign.query.get(campaign_id)
+            if campaign is None or campaign.status == "cancelled":
+                break
+            item = _next_pending(campaign_id)
+            if item is None:
+                with _runners_lock:
+                    # A retry may have requeued items since the check above; it cannot
+                    # start another runner while this one is registered, so look again
+                    db.session.expire_all()
+                    campaign = EnrollmentCampaign.query.get(campaign_id)
+                    if campaign is None or campaign.status == "cancelled":
+                        break
+                    item = _next_pending(campaign_id)
+                    if item is None:
+                        campaign.status = "completed"
+                        db.session.commit()
+                        if _runners.get(campaign_id) is threading.current_thread():
+                            _runners.pop(campaign_id, None)
+            if item is None:
+                sse_broker.publish("enrollment", {"campaign_id": campaign_id, "campaign_status": "completed",
+                                                  "counts": campaign.to_dict(include_items=False)["counts"]})
+                break
+            if not first and STEP_DELAY > 0:
+                time.sleep(STEP_DELAY)
+            first = False
+
+            item.status = "running"
+            item.attempts += 1
+            db.session.commit()
+            _publish(campaign, item)
+
+            sharded = sharding_enabled()
+            try:
+                if sharded:
+                    # Slots come from the sensor assignments; enroll_person records the result itself
+                    success, message = enroll_person(
+                        item.entity_id, max_retries=campaign.max_retries, per_try_timeout=campaign.per_try_timeout
+                    )
+                else:
+                    message = _slot_problem(item)
+                    success = False
+                    if message is None:
+                        success, message = arduino_manager.enroll_fingerprint(
+                            entity_id=item.slot, max_retries=campaign.max_retries,
+                            per_try_timeout=campaign.per_try_timeout,
+                        )
+            except DeviceBusy as e:
+                success, message = False, str(e)
+            item.status = "success" if success else "failed"
+            item.message = (message or "")[:255]
+            if success and not sharded:
+                entity = _find_entity(item.entity_type, item.entity_id)
+                if entity is not None:
+                    entity.fingerprint_verified = True
+                    record_change(item.entity_type, entity)
+            db.session.commit()
+            _publish(campaign, item, next_item=_next_pending(campaign_id))
+        db.session.remove()
+    with _runners_lock:
+        if _runners.get(campaign_id) is threading.current_thread():
+            _runners.pop(campaign_id, None)
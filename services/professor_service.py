@@ -1,10 +1,13 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
 
 from utils.db import db
+from utils.fragment_cache import encode_rows
+from utils.serialization import iso_column, raw_datetime
 from utils.validators import is_valid_email, require_non_empty
-from models import Professor
+from models import Person, Professor, name_parts
+from services.change_service import record_change
 from utils.arduino import arduino_manager
 
 
@@ -13,6 +16,40 @@ def get_all_professors() -> List[dict]:
     return [p.to_dict() for p in professors]
 
 
+def get_all_professors_json() -> bytes:
+    """Same list as get_all_professors(), JSON-encoded from per-row cached fragments."""
+    return encode_rows(Professor, Professor.id.desc())
+
+
+PROFESSORS_FIELDS = (
+    "id", "firstName", "lastName", "email", "department", "employeeNumber", "title",
+    "fingerprintId", "fingerprint_verified", "created_at", "updated_at",
+)
+
+
+def get_all_professors_columns() -> Tuple[Tuple[str, ...], List[list]]:
+    """Same data as get_all_professors(), one list per field, built straight from SQL rows."""
+    rows = (
+        db.session.query(
+            Professor.id, Professor.first_name, Professor.last_name, Professor.name,
+            Professor.email, Professor.department, Professor.employee_number, Professor.title,
+            Professor.fingerprint_id, Professor.fingerprint_verified,
+            raw_datetime(Professor.created_at), raw_datetime(Professor.updated_at),
+        )
+        .order_by(Professor.id.desc())
+        .all()
+    )
+    if not rows:
+        return PROFESSORS_FIELDS, [[] for _ in PROFESSORS_FIELDS]
+    (ids, first_names, last_names, names, email, department, employee_number, title,
+     fingerprint_ids, verified, created_at, updated_at) = (list(c) for c in zip(*rows))
+    parts = [name_parts(f, l, n) for f, l, n in zip(first_names, last_names, names)]
+    return PROFESSORS_FIELDS, [
+        ids, [p[0] for p in parts], [p[1] for p in parts], email, department, employee_number, title,
+        fingerprint_ids, verified, iso_column(created_at), iso_column(updated_at),
+    ]
+
+
 def create_professor(data: Dict[str, Any]) -> dict:
     # Accept either full name or firstName/lastName
     first_name = (data.get("firstName") or data.get("first_name") or "").strip() or None
@@ -50,14 +87,14 @@ def create_professor(data: Dict[str, Any]) -> dict:
         # Flush to assign ID without committing
         db.session.flush()
         # Compute fingerprint numeric id as the sum of IDs created before this record.
-        # Sum professor IDs < this id and all student IDs.
-        sum_professors_before = db.session.query(func.coalesce(func.sum(Professor.id), 0)).filter(Professor.id < professor.id).scalar() or 0
-        from models import Student
-        sum_students = db.session.query(func.coalesce(func.sum(Student.id), 0)).scalar() or 0
-        fingerprint_num = int(sum_professors_before + sum_students)
+        # Students and professors share the people id sequence, so one query covers both roles.
+        fingerprint_num = int(
+            db.session.query(func.coalesce(func.sum(Person.id), 0)).filter(Person.id < professor.id).scalar() or 0
+        )
         if fingerprint_num < 1:
             fingerprint_num = 1
         professor.fingerprint_id = str(fingerprint_num)
+        record_change("professor", professor)
     except IntegrityError:
         db.session.rollback()
         raise ValueError("A unique constraint was violated (email/employee number?)")
@@ -115,6 +152,7 @@ def update_professor(professor_id: int, data: Dict[str, Any]) -> Optional[dict]:
     if "fingerprint_verified" in data:
         professor.fingerprint_verified = bool(data.get("fingerprint_verified"))
 
+    record_change("professor", professor)
     try:
         db.session.commit()
     except IntegrityError:
@@ -128,6 +166,7 @@ def delete_professor(professor_id: int) -> bool:
     professor = Professor.query.get(professor_id)
     if not professor:
         return False
+    record_change("professor", professor, op="delete")
     db.session.delete(professor)
     db.session.commit()
     return True
@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import math
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import case, func, tuple_
+from sqlalchemy.exc import IntegrityError
+
+from utils.db import db
+from utils.arduino import arduino_manager, sensor_pool
+from utils.scheduler import DeviceBusy
+from services.change_service import record_change
+from models import Person, Sensor, SensorSlot
+
+
+# (port, slot) pairs per IN query, well inside SQLite's bound-parameter limit
+_LOOKUP_CHUNK = 400
+
+# Serializes slot allocation (and rebalancing) in this process; another worker
+# taking the same free slot first is caught by the unique index and retried
+_slot_lock = threading.Lock()
+_ALLOCATION_ATTEMPTS = 3
+
+
+class SensorCapacityError(ValueError):
+    """Every registered sensor is full."""
+
+
+def _active_sensors() -> List[Sensor]:
+    return Sensor.query.filter_by(active=True).order_by(Sensor.id).all()
+
+
+def sharding_enabled() -> bool:
+    """True once a sensor is registered; until then everything runs on the single connected reader."""
+    return db.session.query(Sensor.query.filter_by(active=True).exists()).scalar()
+
+
+def _loads() -> Dict[int, Tuple[int, int]]:
+    """sensor id -> (slots assigned, slots enrolled)."""
+    rows = (
+        db.session.query(
+            SensorSlot.sensor_id,
+            func.count(SensorSlot.id),
+            func.coalesce(func.sum(case((SensorSlot.enrolled.is_(True), 1), else_=0)), 0),
+        )
+        .group_by(SensorSlot.sensor_id)
+        .all()
+    )
+    return {sensor_id: (int(used), int(enrolled)) for sensor_id, used, enrolled in rows}
+
+
+def list_sensors() -> List[dict]:
+    loads = _loads()
+    items = []
+    for sensor in Sensor.query.order_by(Sensor.id).all():
+        used, enrolled = loads.get(sensor.id, (0, 0))
+        items.append({**sensor.to_dict(), "used": used, "enrolled": enrolled, "free": max(sensor.capacity - used, 0)})
+    return items
+
+
+def _free_slot(sensor: Sensor) -> Optional[int]:
+    taken = {slot for (slot,) in db.session.query(SensorSlot.slot).filter_by(sensor_id=sensor.id)}
+    return next((slot for slot in range(sensor.capacity) if slot not in taken), None)
+
+
+def _least_full(sensors: List[Sensor], loads: Dict[int, int], exclude=()) -> Optional[Sensor]:
+    open_sensors = [s for s in sensors if s.id not in exclude and loads.get(s.id, 0) < s.capacity]
+    if not open_sensors:
+        return None
+    return min(open_sensors, key=lambda s: (loads.get(s.id, 0) / s.capacity, s.id))
+
+
+def register_sensor(data: Dict) -> dict:
+    name = (data.get("name") or "").strip()
+    port = (data.get("port") or "").strip()
+    if not name or not port:
+        raise ValueError("'name' and 'port' are required")
+    try:
+        capacity = int(data.get("capacity") or current_app.config["SENSOR_CAPACITY"])
+    except (TypeError, ValueError):
+        raise ValueError("'capacity' must be an integer")
+    if capacity < 1:
+        raise ValueError("'capacity' must be at least 1")
+    db.session.add(Sensor(name=name, port=port, capacity=capacity))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise ValueError("A sensor with this name or port already exists")
+    return rebalance()
+
+
+def assign_slots(person_id: int, copies: Optional[int] = None) -> List[SensorSlot]:
+    """The person's slots, adding slots on the least-full sensors until they have `copies`.
+
+    Caller commits. Raises SensorCapacityError when no sensor has room for a first slot.
+    """
+    copies = copies or current_app.config["SENSOR_COPIES"]
+    assigned = SensorSlot.query.filter_by(person_id=person_id).order_by(SensorSlot.id).all()
+    sensors = _active_sensors()
+    loads = {sensor_id: used for sensor_id, (used, _) in _loads().items()}
+    while len(assigned) < copies:
+        sensor = _least_full(sensors, loads, exclude={row.sensor_id for row in assigned})
+        if sensor is None:
+            break
+        row = SensorSlot(sensor_id=sensor.id, person_id=person_id, slot=_free_slot(sensor))
+        db.session.add(row)
+        db.session.flush()
+        loads[sensor.id] = loads.get(sensor.id, 0) + 1
+        assigned.append(row)
+    if not assigned:
+        raise SensorCapacityError("No sensor has a free slot; register another sensor")
+    return assigned
+
+
+def reserve_slots(person_id: int, copies: Optional[int] = None) -> List[SensorSlot]:
+    """assign_slots, committed. Raises SensorCapacityError like assign_slots, and
+    DeviceBusy (503, retry) if other workers keep taking the chosen slots."""
+    for _ in range(_ALLOCATION_ATTEMPTS):
+        with _slot_lock:
+            try:
+                slots = assign_slots(person_id, copies)
+                db.session.commit()
+                return slots
+            except IntegrityError:
+                db.session.rollback()
+    raise DeviceBusy("Sensor slots are being allocated concurrently; retry", 1.0)
+
+
+def rebalance() -> dict:
+    """Spread slot assignments over the active sensors in proportion to their capacity.
+
+    Only slots not yet enrolled move: the firmware can neither export a template
+    nor copy it to another reader, so an enrolled finger stays where it is
+    (counted as `pinned`) until the person is enrolled again.
+    """
+    with _slot_lock:
+        return _rebalance()
+
+
+def _rebalance() -> dict:
+    sensors = _active_sensors()
+    moved = pinned = 0
+    if sensors:
+        loads = {sensor_id: used for sensor_id, (used, _) in _loads().items()}
+        total = sum(loads.get(s.id, 0) for s in sensors)
+        capacity = sum(s.capacity for s in sensors)
+        target = {s.id: math.ceil(total * s.capacity / capacity) for s in sensors}
+        for sensor in sorted(sensors, key=lambda s: loads.get(s.id, 0) - target[s.id], reverse=True):
+            excess = loads.get(sensor.id, 0) - target[sensor.id]
+            if excess <= 0:
+                continue
+            pending = (
+                SensorSlot.query.filter_by(sensor_id=sensor.id, enrolled=False)
+                .order_by(SensorSlot.id.desc())
+                .limit(excess)
+                .all()
+            )
+            for row in pending:
+                below = [s for s in sensors if loads.get(s.id, 0) < target[s.id]]
+                taken = {r.sensor_id for r in SensorSlot.query.filter_by(person_id=row.person_id)}
+                dest = _least_full(below, loads, exclude=taken)
+                if dest is None:
+                    break
+                row.sensor_id, row.slot = dest.id, _free_slot(dest)
+                db.session.flush()
+                loads[sensor.id] -= 1
+                loads[dest.id] = loads.get(dest.id, 0) + 1
+                moved += 1
+            pinned += max(loads.get(sensor.id, 0) - target[sensor.id], 0)
+        db.session.commit()
+    return {"moved": moved, "pinned": pinned, "sensors": list_sensors()}
+
+
+def person_slots(person_id: int) -> List[dict]:
+    return [row.to_dict() for row in SensorSlot.query.filter_by(person_id=person_id).order_by(SensorSlot.id)]
+
+
+def enroll_person(
+    person_id: int, max_retries: int = 3, per_try_timeout: float = 20.0, deadline: Optional[float] = None
+) -> Tuple[bool, str]:
+    """Enroll a person on every sensor holding a slot for them (assigning slots first).
+
+    Without registered sensors this is the single reader with the person id as slot, as before.
+    """
+    person = db.session.get(Person, person_id)
+    if not sharding_enabled():
+        success, message = arduino_manager.enroll_fingerprint(
+            entity_id=person_id, max_retries=max_retries, per_try_timeout=per_try_timeout, deadline=deadline
+        )
+        if success and person is not None and not person.fingerprint_verified:
+            # Door matches on this slot resolve to verified people only
+            person.fingerprint_verified = True
+            record_change(person.type, person)
+            db.session.commit()
+        return success, message
+    if person is None:
+        return False, "Person not found"
+    try:
+        slots = reserve_slots(person_id)
+    except SensorCapacityError as e:
+        db.session.rollback()
+        return False, str(e)
+    messages = []
+    for row in slots:
+        if row.enrolled:
+            continue
+        success, message = sensor_pool.manager(row.sensor.port).enroll_fingerprint(
+            entity_id=row.slot, max_retries=max_retries, per_try_timeout=per_try_timeout, deadline=deadline
+        )
+        if not success:
+            return False, f"{row.sensor.name}: {message}"
+        row.enrolled = True
+        person.fingerprint_verified = True
+        record_change(person.type, person)
+        db.session.commit()
+        messages.append(f"{row.sensor.name} slot {row.slot}")
+    return True, ("Enrolled on " + ", ".join(messages)) if messages else "Already enrolled"
+
+
+def verify_person(
+    person_id: int, per_try_timeout: float = 3.0, max_polls: int = 10, deadline: Optional[float] = None
+) -> Tuple[bool, str, Optional[int], Optional[str]]:
+    """1:1 verify on the reader holding the person's template: (success, message, matched person id, port).
+
+    With copies on several readers the least-queued one goes first; a busy or
+    disconnected reader falls through to the next. Each reader only ever
+    searches its own slots, so the time per verify does not grow with the roster.
+    """
+    if not sharding_enabled():
+        ok, message, matched_id = arduino_manager.verify_fingerprint(
+            expected_id=person_id, per_try_timeout=per_try_timeout, max_polls=max_polls, deadline=deadline
+        )
+        return ok, message, matched_id, arduino_manager.status().get("port")
+    rows = (
+        SensorSlot.query.join(Sensor)
+        .filter(SensorSlot.person_id == person_id, SensorSlot.enrolled.is_(True), Sensor.active.is_(True))
+        .all()
+    )
+    if not rows:
+        return False, "Fingerprint not enrolled on any sensor", None, None
+    candidates = []
+    for row in rows:
+        manager = sensor_pool.manager(row.sensor.port)
+        status = manager.status()
+        if status.get("connected"):
+            candidates.append((sum((status.get("queue") or {}).values()), row.id, manager, row))
+    busy: Optional[DeviceBusy] = None
+    for _, _, manager, row in sorted(candidates, key=lambda c: c[:2]):
+        try:
+            ok, message, matched_slot = manager.verify_fingerprint(
+                expected_id=row.slot, per_try_timeout=per_try_timeout, max_polls=max_polls, deadline=deadline
+            )
+        except DeviceBusy as e:
+            busy = e
+            continue
+        matched_id = person_id if ok else _person_in_slot(row.sensor_id, matched_slot)
+        return ok, message, matched_id, row.sensor.port
+    if busy is not None:
+        raise busy
+    return False, "Arduino not connected", None, None
+
+
+def _person_in_slot(sensor_id: int, slot: Optional[int]) -> Optional[int]:
+    if slot is None:
+        return None
+    return (
+        db.session.query(SensorSlot.person_id)
+        .filter_by(sensor_id=sensor_id, slot=slot, enrolled=True)
+        .scalar()
+    )
+
+
+def is_sensor_port(port: Optional[str]) -> bool:
+    return bool(port) and db.session.query(Sensor.query.filter_by(port=port).exists()).scalar()
+
+
+def sensor_ports(ports) -> set:
+    """The registered sensor ports among `ports`."""
+    ports = [p for p in set(ports) if p]
+    if not ports:
+        return set()
+    return {port for (port,) in db.session.query(Sensor.port).filter(Sensor.port.in_(ports))}
+
+
+def people_in_slots(pairs) -> Dict[Tuple[str, int], Tuple[str, int]]:
+    """Batch form of person_for_slot: (port, slot) -> (entity_type, person id) for enrolled slots."""
+    pairs = sorted(set(pairs))
+    owners: Dict[Tuple[str, int], Tuple[str, int]] = {}
+    for start in range(0, len(pairs), _LOOKUP_CHUNK):
+        rows = (
+            db.session.query(Sensor.port, SensorSlot.slot, Person.type, Person.id)
+            .join(SensorSlot, SensorSlot.sensor_id == Sensor.id)
+            .join(Person, Person.id == SensorSlot.person_id)
+            .filter(tuple_(Sensor.port, SensorSlot.slot).in_(pairs[start:start + _LOOKUP_CHUNK]),
+                    SensorSlot.enrolled.is_(True))
+        )
+        for port, slot, entity_type, person_id in rows:
+            owners[(port, slot)] = (entity_type, person_id)
+    return owners
+
+
+def person_for_slot(port: Optional[str], slot: int) -> Optional[Person]:
+    """Who is enrolled in `slot` on the sensor at `port` (None if that port is not a registered sensor)."""
+    if not port:
+        return None
+    return (
+        Person.query.join(SensorSlot, SensorSlot.person_id == Person.id)
+        .join(Sensor, Sensor.id == SensorSlot.sensor_id)
+        .filter(Sensor.port == port, SensorSlot.slot == slot, SensorSlot.enrolled.is_(True))
+        .first()
+    )
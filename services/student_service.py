@@ -1,10 +1,13 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import func
 
 from utils.db import db
+from utils.fragment_cache import encode_rows
+from utils.serialization import iso_column, raw_datetime
 from utils.validators import is_valid_email, require_non_empty
-from models import Student
+from models import Person, Student, name_parts
+from services.change_service import record_change
 from utils.arduino import arduino_manager
 
 
@@ -13,6 +16,40 @@ def get_all_students() -> List[dict]:
     return [s.to_dict() for s in students]
 
 
+def get_all_students_json() -> bytes:
+    """Same list as get_all_students(), JSON-encoded from per-row cached fragments."""
+    return encode_rows(Student, Student.id.desc())
+
+
+STUDENTS_FIELDS = (
+    "id", "firstName", "lastName", "email", "major", "studentNumber", "year", "fingerprintId",
+    "fingerprint_verified", "created_at", "updated_at",
+)
+
+
+def get_all_students_columns() -> Tuple[Tuple[str, ...], List[list]]:
+    """Same data as get_all_students(), one list per field, built straight from SQL rows."""
+    rows = (
+        db.session.query(
+            Student.id, Student.first_name, Student.last_name, Student.name,
+            Student.email, Student.major, Student.student_number, Student.year,
+            Student.fingerprint_id, Student.fingerprint_verified,
+            raw_datetime(Student.created_at), raw_datetime(Student.updated_at),
+        )
+        .order_by(Student.id.desc())
+        .all()
+    )
+    if not rows:
+        return STUDENTS_FIELDS, [[] for _ in STUDENTS_FIELDS]
+    (ids, first_names, last_names, names, email, major, student_number, year,
+     fingerprint_ids, verified, created_at, updated_at) = (list(c) for c in zip(*rows))
+    parts = [name_parts(f, l, n) for f, l, n in zip(first_names, last_names, names)]
+    return STUDENTS_FIELDS, [
+        ids, [p[0] for p in parts], [p[1] for p in parts], email, major, student_number, year,
+        fingerprint_ids, verified, iso_column(created_at), iso_column(updated_at),
+    ]
+
+
 def create_student(data: Dict[str, Any]) -> dict:
     # Accept either full name or firstName/lastName
     first_name = (data.get("firstName") or data.get("first_name") or "").strip() or None
@@ -55,18 +92,16 @@ def create_student(data: Dict[str, Any]) -> dict:
         # Flush to assign ID without committing
         db.session.flush()
         # Compute fingerprint numeric id as the sum of IDs created before this record.
-        # We approximate "created before" by summing student IDs < this id and all professor IDs.
-        sum_students_before = db.session.query(func.coalesce(func.sum(Student.id), 0)).filter(Student.id < student.id).scalar() or 0
-        # Import Professor lazily to avoid circular imports at module load
-        from models import Professor
-
-        sum_professors = db.session.query(func.coalesce(func.sum(Professor.id), 0)).scalar() or 0
-        fingerprint_num = int(sum_students_before + sum_professors)
+        # Students and professors share the people id sequence, so one query covers both roles.
+        fingerprint_num = int(
+            db.session.query(func.coalesce(func.sum(Person.id), 0)).filter(Person.id < student.id).scalar() or 0
+        )
         # Ensure fingerprint id is at least 1
         if fingerprint_num < 1:
             fingerprint_num = 1
         # Tentatively set numeric fingerprint_id on the model as string
         student.fingerprint_id = str(fingerprint_num)
+        record_change("student", student)
     except IntegrityError:
         db.session.rollback()
         raise ValueError("A unique constraint was violated (email/student number?)")
@@ -130,6 +165,7 @@ def update_student(student_id: int, data: Dict[str, Any]) -> Optional[dict]:
     if "fingerprint_verified" in data:
         student.fingerprint_verified = bool(data.get("fingerprint_verified"))
 
+    record_change("student", student)
     try:
         db.session.commit()
     except IntegrityError:
@@ -143,6 +179,7 @@ def delete_student(student_id: int) -> bool:
     student = Student.query.get(student_id)
     if not student:
         return False
+    record_change("student", student, op="delete")
     db.session.delete(student)
     db.session.commit()
     return True
@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import Dict, Optional
+
+from flask import current_app
+from sqlalchemy import func
+
+from utils.db import db
+from utils.matcher import template_matcher
+from models import FingerprintTemplate, Person
+
+class MatcherUnavailable(RuntimeError):
+    """The software matcher needs numpy, which is not installed."""
+
+
+def decode_template(value) -> bytes:
+    """Base64 template from a request body."""
+    if not isinstance(value, str) or not value:
+        raise ValueError("'template' must be a base64 string")
+    try:
+        return base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        raise ValueError("'template' must be a base64 string")
+
+
+def _version() -> tuple:
+    """Database-side version of the template set: any insert or delete changes it, whichever
+    worker made it (deleting a person deletes their templates through the ORM cascade)."""
+    return tuple(
+        db.session.query(
+            func.count(FingerprintTemplate.id), func.max(FingerprintTemplate.id), func.max(FingerprintTemplate.updated_at)
+        ).one()
+    )
+
+
+def _matcher():
+    """The shared matcher, reloaded from the database when the stored templates changed in any process."""
+    if not template_matcher.available():
+        raise MatcherUnavailable("Software matching needs numpy (pip install numpy)")
+    current = _version()
+    if template_matcher.generation != current:
+        rows = db.session.query(FingerprintTemplate.person_id, FingerprintTemplate.data).all()
+        template_matcher.load(rows, generation=current)
+    return template_matcher
+
+
+def _confidence(score: Optional[float]) -> int:
+    return max(0, round((score or 0.0) * 100))
+
+
+def store_template(person_id: int, template: bytes) -> Optional[Dict]:
+    """Keep one more template for a person (several fingers or samples each). None if no such person."""
+    person = db.session.get(Person, person_id)
+    if person is None:
+        return None
+    expected = current_app.config["MATCHER_TEMPLATE_BYTES"]
+    if len(template) != expected:
+        raise ValueError(f"'template' must be {expected} bytes, got {len(template)}")
+    db.session.add(FingerprintTemplate(person_id=person_id, data=template))
+    db.session.commit()
+    count = FingerprintTemplate.query.filter_by(person_id=person_id).count()
+    return {"personId": person_id, "entityType": person.type, "templates": count}
+
+
+def delete_templates(person_id: int) -> int:
+    deleted = FingerprintTemplate.query.filter_by(person_id=person_id).delete()
+    db.session.commit()
+    return deleted
+
+
+def identify(template: bytes, top_k: int = 5) -> Dict:
+    """1:N search of a probe template over everyone with stored templates."""
+    candidates = _matcher().identify(template, top_k=max(1, min(top_k, 50)))
+    types = dict(
+        db.session.query(Person.id, Person.type).filter(Person.id.in_([pid for pid, _ in candidates])).all()
+    ) if candidates else {}
+    items = [
+        {"personId": pid, "entityType": types.get(pid), "confidence": _confidence(score)}
+        for pid, score in candidates
+    ]
+    matched = bool(candidates) and candidates[0][1] >= current_app.config["MATCHER_THRESHOLD"]
+    return {
+        "matched": matched,
+        "personId": items[0]["personId"] if matched else None,
+        "entityType": items[0]["entityType"] if matched else None,
+        "confidence": items[0]["confidence"] if items else 0,
+        "candidates": items,
+    }
+
+
+def verify_template(entity_type: str, entity_id: int, template: bytes) -> Dict:
+    """1:1 check of a probe against one person's stored templates, shaped like the sensor verify result."""
+    person = db.session.get(Person, entity_id)
+    if person is None or person.type != entity_type:
+        return {"success": False, "confidence": 0, "message": "Entity not found", "matchedId": None}
+    score = _matcher().verify(entity_id, template)
+    if score is None:
+        return {"success": False, "confidence": 0, "message": "No stored template", "matchedId": None}
+    success = score >= current_app.config["MATCHER_THRESHOLD"]
+    return {
+        "success": success,
+        "confidence": _confidence(score),
+        "message": "Template match" if success else "Template mismatch",
+        "matchedId": entity_id if success else None,
+    }
@@ -4,7 +4,6 @@ BASE_DIR = Path(__file__).resolve().parents[1]
 if str(BASE_DIR) not in sys.path:
     sys.path.insert(0, str(BASE_DIR))
 import os
-import importlib
 import tempfile
 from typing import Dict
 
@@ -21,13 +20,11 @@ def test_db_path() -> str:
 
 
 @pytest.fixture(scope="session")
-def test_app(test_db_path):
-    # Ensure the app reads the test DB path on import
-    os.environ["DATABASE_URL"] = test_db_path
-    # Reload the app module so create_app() uses the env var
-    import app as app_module
-    importlib.reload(app_module)
-    return app_module.app
+def test_app(test_db_path, tmp_path_factory):
+    from app import create_app
+
+    # Slow-request reports from any test go to a temp dir, not the checkout
+    return create_app({"SQLALCHEMY_DATABASE_URI": test_db_path, "PROFILE_DIR": str(tmp_path_factory.mktemp("profiles"))})
 
 
 @pytest.fixture()
@@ -42,9 +39,21 @@ def client(test_app):
 @pytest.fixture(autouse=True)
 def _reset_db(test_app):
     # Ensure a clean schema and empty tables for each test
+    from utils.arduino import sensor_pool
+    from utils.fragment_cache import fragment_cache
+    from utils.idempotency import idempotency_store
+    from utils.matcher import template_matcher
+    from utils.response_cache import response_cache
+
     with test_app.app_context():
         db.drop_all()
         db.create_all()
+    # Tables were replaced behind the services' backs
+    response_cache.clear()
+    fragment_cache.clear()
+    idempotency_store.clear()
+    template_matcher.clear()
+    sensor_pool.clear()
 
 
 @pytest.fixture()
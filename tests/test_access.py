@@ -0,0 +1,240 @@
+from models import AccessLog, Student
+from utils.db import db
+
+
+def test_door_result_resolves_fingerprint_slot(test_app):
+    from services.access_service import record_door_result
+
+    with test_app.app_context():
+        ada = Student(name="Ada", email="ada@example.com", fingerprint_id="5", fingerprint_verified=True)
+        db.session.add(ada)
+        db.session.commit()
+
+        # The single reader's slot is the person id, whatever the fingerprint_id
+        assert record_door_result(True, 5)["entity_type"] == "unknown"
+        granted = record_door_result(True, ada.id)
+        denied = record_door_result(False, None)
+
+        assert granted["entity_type"] == "student" and granted["status"] == "granted"
+        assert denied["entity_type"] == "unknown" and denied["status"] == "denied"
+        assert AccessLog.query.count() == 3
+
+
+def test_door_match_resolves_to_the_person_enroll_wrote(client, test_app, auth_headers, monkeypatch):
+    from services.access_service import record_door_result
+    from utils import arduino
+
+    with test_app.app_context():
+        # As the roster allocator numbers them: both fingerprint_ids are "1", neither is a slot
+        first = Student(name="First", email="first@example.com", fingerprint_id="1")
+        second = Student(name="Second", email="second@example.com", fingerprint_id="1")
+        db.session.add_all([first, second])
+        db.session.commit()
+        first_id, second_id = first.id, second.id
+    assert second_id != 1
+
+    slots = []
+    monkeypatch.setattr(arduino.arduino_manager, "enroll_fingerprint",
+                        lambda entity_id, **kw: (slots.append(entity_id), (True, "Enroll success on attempt 1"))[1])
+    assert client.post("/students/biometric/enroll", json={"studentId": second_id}).get_json()["success"]
+
+    with test_app.app_context():
+        log = record_door_result(True, slots[0])
+    assert (log["entity_type"], log["entity_id"], log["status"]) == ("student", second_id, "granted")
+    event = {"seq": 1, "ts": "2026-01-05T10:00:00Z", "slot": slots[0], "success": True}
+    client.post("/access/ingest", json={"device": "door-1", "events": [event]}, headers=auth_headers)
+    with test_app.app_context():
+        replayed = AccessLog.query.filter_by(device="door-1").one()
+        assert (replayed.entity_id, replayed.status) == (second_id, "granted")
+        assert not db.session.get(Student, first_id).fingerprint_verified
+
+
+def test_async_verify_returns_operation(client, test_app, monkeypatch):
+    import threading
+    import time
+    from utils import arduino
+
+    release = threading.Event()
+    deadlines = []
+
+    def slow_verify(expected_id=None, per_try_timeout=3.0, max_polls=10, deadline=None):
+        deadlines.append(deadline)
+        release.wait(2)
+        return True, "Verification success", expected_id
+
+    monkeypatch.setattr(arduino.arduino_manager, "verify_fingerprint", slow_verify)
+    with test_app.app_context():
+        db.session.add(Student(name="Bo", email="bo@example.com", fingerprint_verified=True))
+        db.session.commit()
+        student_id = Student.query.filter_by(email="bo@example.com").first().id
+
+    submitted = time.monotonic()
+    r = client.post("/access/verify", json={"entity_type": "student", "entity_id": student_id},
+                    headers={"Prefer": "respond-async", "X-Request-Timeout": "20"})
+    assert r.status_code == 202
+    op_id = r.get_json()["operationId"]
+    assert r.headers["Location"] == f"/operations/{op_id}"
+    assert client.get(f"/operations/{op_id}").get_json()["status"] in {"pending", "running"}
+
+    release.set()
+    op = client.get(f"/operations/{op_id}?wait=2").get_json()
+    assert op["status"] == "done"
+    assert op["result"]["success"] is True
+    assert op["result"]["log"]["status"] == "granted"
+    # The operation keeps the budget of the request that submitted it
+    assert submitted + 19 < deadlines[0] <= time.monotonic() + 20
+
+
+def test_async_student_verify(client, monkeypatch):
+    from utils import arduino
+
+    monkeypatch.setattr(arduino.arduino_manager, "verify_fingerprint",
+                        lambda expected_id=None, **kw: (False, "Verification timeout ()", None))
+    r = client.post("/students/biometric/verify", json={"studentId": 3, "async": True})
+    assert r.status_code == 202
+    op = client.get(f"{r.get_json()['statusUrl']}?wait=2").get_json()
+    assert op["result"] == {"success": False, "confidence": 0, "message": "Verification timeout ()", "matchedId": None}
+
+
+def test_live_stats_windows_slide():
+    from utils.live_stats import LiveStats
+
+    now = [1_000_000.0]
+    stats = LiveStats(clock=lambda: now[0])
+    stats.seed(rows=[])
+    stats.record("student", "granted", "COM3")
+    stats.record("student", "denied", "COM3")
+    now[0] += 400  # past the 5 minute window
+    stats.record("professor", "granted", None)
+
+    windows = stats.snapshot()["windows"]
+    assert windows["5m"]["total"] == {"granted": 1}
+    assert windows["1h"]["total"] == {"granted": 2, "denied": 1}
+    assert windows["1h"]["by_entity_type"]["student"] == {"granted": 1, "denied": 1}
+    assert windows["1d"]["by_device"]["none"] == {"granted": 1}
+
+
+def test_live_stats_endpoint_seeds_from_db(client, test_app, auth_headers):
+    from services.access_service import record_door_result
+    from utils.live_stats import live_stats
+
+    live_stats.reset()
+    with test_app.app_context():
+        db.session.add(AccessLog(entity_type="student", entity_id=1, status="granted", device="COM3"))
+        db.session.commit()
+        record_door_result(False, None)
+
+    r = client.get("/access/live-stats", headers=auth_headers)
+    assert r.status_code == 200
+    window = r.get_json()["windows"]["5m"]
+    assert window["total"] == {"granted": 1, "denied": 1}
+    assert window["by_device"]["COM3"] == {"granted": 1}
+    live_stats.reset()
+
+
+def test_logs_are_enriched_and_filtered_by_role(client, test_app, auth_headers):
+    from models import Professor
+
+    with test_app.app_context():
+        student = Student(first_name="Ada", last_name="L", email="ada@example.com", student_number="S-1")
+        professor = Professor(name="Alan Turing", email="alan@example.com", employee_number="E-7", title="Dean")
+        untitled = Professor(name="Grace H", email="grace@example.com")
+        db.session.add_all([student, professor, untitled])
+        db.session.commit()
+        db.session.add_all([
+            AccessLog(entity_type="student", entity_id=student.id, status="granted"),
+            AccessLog(entity_type="professor", entity_id=professor.id, status="granted"),
+            AccessLog(entity_type="professor", entity_id=untitled.id, status="denied"),
+            AccessLog(entity_type="unknown", entity_id=0, status="denied"),
+        ])
+        db.session.commit()
+
+    items = client.get("/access/logs", headers=auth_headers).get_json()["items"]
+    assert [(i["name"], i["number"], i["role"], i["title"]) for i in items] == [
+        (None, None, "unknown", None),
+        ("Grace H", None, "professor", None),
+        ("Alan Turing", "E-7", "professor", "Dean"),
+        ("Ada L", "S-1", "student", None),
+    ]
+
+    # Titled professors are still professors
+    professors = client.get("/access/logs?role=Professor", headers=auth_headers).get_json()["items"]
+    assert [i["name"] for i in professors] == ["Grace H", "Alan Turing"]
+    deans = client.get("/access/logs?title=dean", headers=auth_headers).get_json()["items"]
+    assert [i["name"] for i in deans] == ["Alan Turing"]
+
+
+def test_live_stats_follow_other_workers_on_a_shared_bus(client, test_app, auth_headers, monkeypatch):
+    from utils.live_stats import live_stats
+    from utils.sse import sse_broker
+
+    live_stats.reset()
+    client.get("/access/live-stats", headers=auth_headers)  # seeded while empty
+    monkeypatch.setattr(sse_broker, "is_shared", lambda: True)
+    with test_app.app_context():
+        # Written by another worker: this process never records it
+        db.session.add(AccessLog(entity_type="student", entity_id=1, status="granted", device="COM4"))
+        db.session.commit()
+    window = client.get("/access/live-stats", headers=auth_headers).get_json()["windows"]["5m"]
+    assert window["total"] == {"granted": 1}
+
+    # Pushes reach this process's subscribers without going over the bus
+    published = []
+    monkeypatch.setattr(sse_broker, "_ensure_backend", lambda: published.append(True))
+    q = sse_broker.subscribe()
+    try:
+        sse_broker.publish_local("live_stats", {"n": 1})
+        assert q.get_nowait().startswith("event: live_stats") and not published
+    finally:
+        sse_broker.unsubscribe(q)
+    live_stats.reset()
+
+
+def test_ingest_replays_buffered_events_once(client, test_app, auth_headers, user_headers):
+    from datetime import datetime, timedelta
+    from utils.live_stats import live_stats
+
+    live_stats.reset()
+    with test_app.app_context():
+        ada = Student(name="Ada", email="ada@example.com", fingerprint_id="5", fingerprint_verified=True)
+        db.session.add(ada)
+        db.session.commit()
+        ada_id = ada.id
+
+    recent = (datetime.utcnow() - timedelta(seconds=30)).isoformat() + "Z"
+    batch = {
+        "device": "door-1",
+        "events": [
+            {"seq": 1, "ts": recent, "slot": ada_id, "success": True},
+            {"seq": 2, "ts": recent, "slot": 9, "success": True},
+            {"seq": 3, "ts": recent, "slot": None, "success": False},
+            {"seq": 4, "ts": "2020-01-01T08:00:00+02:00", "entity_type": "student", "entity_id": ada_id,
+             "status": "granted"},
+            {"seq": 4, "ts": recent, "entity_type": "student", "entity_id": ada_id, "status": "denied"},
+            {"seq": 5, "ts": recent, "entity_type": "visitor", "entity_id": 1, "status": "granted"},
+            {"seq": "x", "ts": recent},
+        ],
+    }
+    assert client.post("/access/ingest", json=batch, headers=user_headers).status_code == 403
+
+    r = client.post("/access/ingest", json=batch, headers=auth_headers)
+    assert r.status_code == 200
+    body = r.get_json()
+    assert (body["received"], body["inserted"], body["duplicates"]) == (7, 4, 1)
+    assert [item["index"] for item in body["rejected"]] == [5, 6]
+
+    # A reconnecting door replays the whole buffer
+    again = client.post("/access/ingest", json=batch, headers=auth_headers).get_json()
+    assert (again["inserted"], again["duplicates"]) == (0, 5)
+
+    with test_app.app_context():
+        logs = {log.sequence: log for log in AccessLog.query.filter_by(device="door-1")}
+        assert sorted(logs) == [1, 2, 3, 4]
+        assert (logs[1].entity_type, logs[1].entity_id, logs[1].status) == ("student", ada_id, "granted")
+        assert (logs[2].entity_type, logs[2].entity_id, logs[2].status) == ("unknown", 9, "denied")
+        assert logs[4].created_at == datetime(2020, 1, 1, 6, 0)
+
+    # Only the recent events fall inside the live windows
+    window = live_stats.snapshot()["windows"]["5m"]
+    assert window["by_device"]["door-1"] == {"granted": 1, "denied": 2}
+    live_stats.reset()
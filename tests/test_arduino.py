@@ -65,7 +65,7 @@ def test_disconnect_requires_admin(client, user_headers, auth_headers, monkeypat
 def test_test_capture_admin_only(client, auth_headers, user_headers, monkeypatch):
     from utils import arduino
 
-    def fake_capture(entity, entity_id, max_retries=3, per_try_timeout=8.0):
+    def fake_capture(entity, entity_id, max_retries=3, per_try_timeout=8.0, deadline=None):
         return True, "OK"
 
     monkeypatch.setattr(arduino.arduino_manager, "capture_fingerprint", fake_capture)
@@ -83,3 +83,284 @@ def test_test_capture_admin_only(client, auth_headers, user_headers, monkeypatch
         headers=auth_headers,
     )
     assert r.status_code == 200
+
+
+class _ScriptedSerial:
+    """Minimal stand-in for serial.Serial replaying canned device lines."""
+
+    def __init__(self, lines):
+        self._lines = [l.encode("utf-8") + b"\n" for l in lines]
+        self.written = []
+        self.is_open = True
+        self.timeout = None
+
+    def reset_input_buffer(self):
+        pass
+
+    def write(self, data):
+        self.written.append(data)
+
+    def readline(self):
+        return self._lines.pop(0) if self._lines else b""
+
+    def close(self):
+        self.is_open = False
+
+
+def test_verify_records_phase_trace(client):
+    from utils.arduino import ArduinoManager
+
+    manager = ArduinoManager()
+    manager._ser = _ScriptedSerial([
+        "ACK:V",
+        "VERIFICATION: EN_COURS",
+        "",
+        "VERIFICATION: SUCCES ID trouve: 7",
+    ])
+    manager._port = "COM-TEST"
+
+    ok, _, matched = manager.verify_fingerprint(expected_id=7, per_try_timeout=0.01)
+    assert ok and matched == 7
+
+    snap = manager.metrics_snapshot()
+    trace = snap["recent"][0]
+    assert trace["device"] == "COM-TEST"
+    assert trace["outcome"] == "success"
+    assert trace["polls"] == 3 and trace["timeouts"] == 1
+    assert {"queue_wait", "mode_ack", "first_en_cours", "result", "total"} <= set(trace["phases_ms"])
+    assert any(p["device"] == "COM-TEST" and p["phase"] == "result" for p in snap["phases"])
+
+
+def test_device_metrics_endpoint(client):
+    r = client.get("/arduino/metrics")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert {"phases", "polls", "recent"} <= set(data)
+    assert client.get("/arduino/metrics?limit=abc").status_code == 400
+    assert client.get("/arduino/metrics?limit=-5").status_code == 200
+
+
+class _BootingSerial(_ScriptedSerial):
+    """Port that prints the firmware banner after a couple of empty reads."""
+
+    def __init__(self, port=None, baudrate=9600, timeout=None):
+        super().__init__(["", "", "INFO: Systeme pret", "CAPTEUR: OK"])
+        self.port = port
+
+
+class _FakePySerial:
+    Serial = _BootingSerial
+
+
+def test_connect_returns_on_firmware_banner(monkeypatch):
+    import time
+    from utils import arduino
+
+    monkeypatch.setattr(arduino, "_pyserial", lambda: _FakePySerial)
+    manager = arduino.ArduinoManager()
+
+    started = time.monotonic()
+    ok, message = manager.connect("COM-TEST")
+    assert ok and "no readiness" not in message
+    assert time.monotonic() - started < 1.0
+    assert manager.status()["ready"] is True
+
+
+def test_io_error_triggers_background_reconnect(monkeypatch):
+    import time
+    from utils import arduino
+
+    class _UnpluggedSerial(_ScriptedSerial):
+        def readline(self):
+            raise OSError("device disconnected")
+
+    monkeypatch.setattr(arduino, "_pyserial", lambda: _FakePySerial)
+    monkeypatch.setattr(arduino.ArduinoManager, "_scan_ports", staticmethod(lambda: []))
+    manager = arduino.ArduinoManager()
+    manager.connect("COM-TEST")
+    manager._ser = _UnpluggedSerial([])
+
+    ok, message, _ = manager.verify_fingerprint()
+    assert not ok and "I/O error" in message
+
+    deadline = time.monotonic() + 2
+    while not manager.status()["connected"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert manager.status()["connected"] is True
+    manager.disconnect()
+
+
+def test_door_mode_streams_verification_lines():
+    import time
+    from utils.arduino import ArduinoManager
+
+    manager = ArduinoManager()
+    ser = _ScriptedSerial([
+        "ACK:V",
+        "VERIFICATION: EN_COURS",
+        "VERIFICATION: SUCCES ID trouve: 5",
+        "VERIFICATION: ECHEC",
+    ])
+    manager._ser = ser
+    manager._port = "COM-TEST"
+    results = []
+
+    assert manager.start_door_mode(lambda ok, matched, raw: results.append((ok, matched)))
+    deadline = time.monotonic() + 2
+    while len(results) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.stop_door_mode()
+
+    assert results == [(True, 5), (False, None)]
+    # Only one mode switch for the whole stream
+    assert ser.written.count(b"V\n") == 1
+
+
+def test_disconnect_interrupts_enrollment():
+    import threading
+    import time
+    from utils.arduino import ArduinoManager
+
+    class _EnrollingSerial(_ScriptedSerial):
+        def readline(self):
+            time.sleep(0.05)
+            return b"ENREGISTREMENT: EN_COURS\n"
+
+    manager = ArduinoManager()
+    ser = _EnrollingSerial([])
+    manager._ser = ser
+    manager._port = "COM-TEST"
+    result = []
+    enroll = threading.Thread(
+        target=lambda: result.append(manager.enroll_fingerprint(3, per_try_timeout=60)), daemon=True
+    )
+    enroll.start()
+    while b"I:3\n" not in ser.written:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    assert manager.disconnect() == (True, "Disconnected from COM-TEST")
+    assert time.monotonic() - started < 1
+    enroll.join(2)
+    assert result == [(False, "Enroll cancelled: device disconnecting")]
+    assert b"C\n" in ser.written and not ser.is_open
+
+
+def test_disconnect_during_reconnect_keeps_the_port_closed(monkeypatch):
+    import threading
+    from utils import arduino
+    from utils.arduino import ArduinoManager
+
+    opening, release = threading.Event(), threading.Event()
+    ser = _ScriptedSerial(["INFO: Systeme pret"])
+
+    def slow_open(port, baudrate, timeout):
+        opening.set()
+        release.wait(2)
+        return ser
+
+    monkeypatch.setattr(arduino, "_open_serial", slow_open)
+    manager = ArduinoManager()
+    manager.ports.list = lambda: []
+    manager.connect_in_background("COM-TEST")
+    assert opening.wait(2)
+
+    assert manager.disconnect() == (True, "Not connected")
+    release.set()
+    manager._reconnector.join(2)
+    assert not manager._reconnector.is_alive()
+    assert manager.status()["connected"] is False and not ser.is_open
+
+
+def test_door_mode_restart_leaves_one_reader():
+    import threading
+    from utils.arduino import ArduinoManager
+
+    entered, release = threading.Event(), threading.Event()
+
+    class _BlockingSerial(_ScriptedSerial):
+        def readline(self):
+            if not entered.is_set():
+                entered.set()
+                release.wait(2)
+                return b"VERIFICATION: SUCCES ID trouve: 5\n"
+            return super().readline()
+
+    manager = ArduinoManager()
+    manager._ser = _BlockingSerial(["ACK:V"])
+    manager._port = "COM-TEST"
+    old, new = [], []
+
+    assert manager.start_door_mode(lambda ok, matched, raw: old.append(matched))
+    first = manager._door_thread
+    assert entered.wait(2)
+    # Quick stop -> start while the first reader is still inside its read
+    assert manager.stop_door_mode()
+    assert manager.start_door_mode(lambda ok, matched, raw: new.append(matched))
+    assert not manager.start_door_mode(lambda ok, matched, raw: None)
+    release.set()
+    first.join(2)
+
+    assert not first.is_alive() and old == []
+    assert [t.name for t in threading.enumerate()].count("arduino-door") == 1
+    assert manager.status()["door_mode"] is True
+    assert manager.stop_door_mode()
+    manager._door_thread.join(2)
+
+
+def test_simulated_port_speaks_firmware_protocol(monkeypatch):
+    from utils import arduino
+    from utils.serial_sim import SimulatedSerial
+
+    manager = arduino.ArduinoManager()
+    ok, message = manager.connect("sim://bench?latency=0.02")
+    assert not ok and "disabled" in message
+
+    monkeypatch.setattr(arduino.Config, "ARDUINO_SIMULATOR", True)
+    ok, message = manager.connect("sim://bench?latency=0.02")
+    assert ok and "no readiness" not in message
+
+    assert manager.enroll_fingerprint(entity_id=5, per_try_timeout=1.0)[0]
+    SimulatedSerial.present("bench", 5)
+    ok, _, matched = manager.verify_fingerprint(expected_id=5, per_try_timeout=0.5)
+    assert ok and matched == 5
+    manager.disconnect()
+
+
+def test_expired_deadline_cancels_enrollment_and_frees_device(monkeypatch):
+    import time
+    from utils import arduino
+
+    monkeypatch.setattr(arduino.Config, "ARDUINO_SIMULATOR", True)
+    manager = arduino.ArduinoManager()
+    # No finger ever arrives: enrollment would otherwise wait 3 x 20 s
+    assert manager.connect("sim://deadline?latency=0.05&match=0")[0]
+    sensor = manager._ser
+
+    started = time.monotonic()
+    ok, message = manager.enroll_fingerprint(entity_id=7, deadline=started + 0.3)
+    assert not ok and "deadline" in message
+    assert time.monotonic() - started < 1.0
+    assert sensor.written[-1] == "C"
+    assert manager.metrics_snapshot()["recent"][0]["outcome"] == "deadline"
+
+    started = time.monotonic()
+    ok, message, _ = manager.verify_fingerprint(expected_id=7, deadline=started + 0.2)
+    assert not ok and "deadline" in message
+    assert time.monotonic() - started < 1.0
+    manager.disconnect()
+
+
+def test_request_timeout_header_becomes_device_deadline(client, monkeypatch):
+    import time
+    from routes import access as access_routes
+
+    seen = {}
+
+    def fake_verify(entity_type, entity_id, deadline=None):
+        seen["remaining"] = deadline - time.monotonic()
+        return {"success": False, "message": "x"}
+
+    monkeypatch.setattr(access_routes, "verify_access", fake_verify)
+    client.post("/access/verify", json={"entity_type": "student", "entity_id": 1}, headers={"X-Request-Timeout": "5"})
+    assert 4 < seen["remaining"] <= 5
@@ -0,0 +1,57 @@
+from models import Student
+from utils.db import db
+
+
+def test_change_feed_returns_upserts_and_tombstones(client, test_app):
+    from services.change_service import record_change
+
+    r = client.get("/students")
+    cursor = int(r.headers["X-Change-Cursor"])
+
+    with test_app.app_context():
+        ada = Student(name="Ada", email="ada@example.com")
+        bo = Student(name="Bo", email="bo@example.com")
+        db.session.add_all([ada, bo])
+        db.session.flush()
+        record_change("student", ada)
+        record_change("student", bo)
+        db.session.commit()
+        ada_id, bo_id = ada.id, bo.id
+
+    assert client.put(f"/students/{ada_id}", json={"major": "Math"}).status_code == 200
+    assert client.delete(f"/students/{bo_id}").status_code == 200
+
+    feed = client.get(f"/students/changes?since={cursor}").get_json()
+    assert [(c["op"], c["id"]) for c in feed["changes"]] == [("upsert", ada_id), ("delete", bo_id)]
+    assert feed["changes"][0]["data"]["major"] == "Math"
+    assert feed["changes"][1]["data"] is None
+    assert feed["hasMore"] is False
+
+    again = client.get(f"/students/changes?since={feed['cursor']}").get_json()
+    assert again["changes"] == [] and again["cursor"] == feed["cursor"]
+    assert client.get("/professors/changes?since=0").get_json()["changes"] == []
+
+
+def test_changes_are_published_after_commit_only(test_app):
+    from services.change_service import record_change
+    from utils.sse import sse_broker
+
+    q = sse_broker.subscribe()
+    try:
+        with test_app.app_context():
+            ghost = Student(name="Ghost", email="ghost@example.com")
+            db.session.add(ghost)
+            db.session.flush()
+            record_change("student", ghost)
+            db.session.rollback()
+            assert q.empty()
+
+            cy = Student(name="Cy", email="cy@example.com")
+            db.session.add(cy)
+            db.session.flush()
+            record_change("student", cy)
+            db.session.commit()
+        payload = q.get(timeout=1)
+        assert payload.startswith("event: changes") and '"op": "upsert"' in payload
+    finally:
+        sse_broker.unsubscribe(q)
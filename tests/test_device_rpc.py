@@ -0,0 +1,104 @@
+import os
+import threading
+import time
+
+from utils.device_rpc import ArduinoClient, DeviceServer
+from utils.sse import SSEBroker
+
+
+class _FakeManager:
+    def __init__(self):
+        self.verified = []
+
+    def list_ports(self):
+        return [{"device": "/dev/ttyACM0"}]
+
+    def refresh_ports(self):
+        return self.list_ports()
+
+    def connect(self, port, baudrate=9600, timeout=2.0, ready_timeout=None):
+        return True, f"Connected to {port}"
+
+    def disconnect(self):
+        return True, "Not connected"
+
+    def status(self):
+        return {"connected": True, "port": "/dev/ttyACM0", "baudrate": 9600}
+
+    def metrics_snapshot(self, limit=50):
+        return {"recent": []}
+
+    def enroll_fingerprint(self, entity_id, max_retries=3, per_try_timeout=20.0):
+        return True, "Enroll success on attempt 1"
+
+    def verify_fingerprint(self, expected_id=None, per_try_timeout=3.0, max_polls=10, deadline=None):
+        self.verified.append(expected_id)
+        self.deadline = deadline
+        return True, "Verification success", expected_id
+
+    def capture_fingerprint(self, entity, entity_id, max_retries=3, per_try_timeout=20.0):
+        return self.enroll_fingerprint(entity_id)
+
+
+def test_client_proxies_manager_over_unix_socket(tmp_path):
+    path = str(tmp_path / "device.sock")
+    manager, broker = _FakeManager(), SSEBroker()
+    server = DeviceServer(path, manager, broker, extra={"start_door_mode": lambda: True})
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        client = ArduinoClient(path)
+        assert client.verify_fingerprint(expected_id=4) == (True, "Verification success", 4)
+        assert manager.deadline is None
+        assert client.enroll_fingerprint(4) == (True, "Enroll success on attempt 1")
+        assert client.status()["port"] == "/dev/ttyACM0"
+        assert client.list_ports() == [{"device": "/dev/ttyACM0"}]
+        assert client.start_door_mode() is True
+        assert manager.verified == [4]
+        # Deadlines travel as seconds remaining
+        client.verify_fingerprint(expected_id=5, deadline=time.monotonic() + 5)
+        assert 4 < manager.deadline - time.monotonic() <= 5
+
+        events = client.events()
+        received = []
+        reader = threading.Thread(target=lambda: received.append(next(events)), daemon=True)
+        reader.start()
+        deadline = time.monotonic() + 2
+        while broker.subscriber_count() == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        broker.publish("device", {"event": "reconnected"})
+        reader.join(2)
+        assert received == ['event: device\ndata: {"event": "reconnected"}\n\n']
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_client_reports_unreachable_daemon(tmp_path):
+    client = ArduinoClient(str(tmp_path / "missing.sock"))
+    ok, message, matched = client.verify_fingerprint(expected_id=1)
+    assert not ok and "unreachable" in message and matched is None
+    assert client.status()["connected"] is False
+    assert client.list_ports() == client.refresh_ports() == []
+    assert client.metrics_snapshot()["recent"] == []
+    assert client.start_door_mode() is False and client.stop_door_mode() is False
+
+
+def test_client_for_another_sensor_is_routed_by_port(tmp_path):
+    path = str(tmp_path / "device.sock")
+    primary, other = _FakeManager(), _FakeManager()
+    routed = []
+
+    def route(port):
+        routed.append(port)
+        return other
+
+    server = DeviceServer(path, primary, SSEBroker(), route=route)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        ArduinoClient(path, sensor_port="/dev/readerB").verify_fingerprint(expected_id=7)
+        ArduinoClient(path).verify_fingerprint(expected_id=8)
+        assert (routed, other.verified, primary.verified) == (["/dev/readerB"], [7], [8])
+    finally:
+        server.shutdown()
+        server.server_close()
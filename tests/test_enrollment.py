@@ -0,0 +1,137 @@
+import time
+
+from models import Student
+from utils.db import db
+
+
+def _wait_for(client, campaign_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        data = client.get(f"/enrollment/campaigns/{campaign_id}").get_json()
+        if data["status"] == status:
+            return data
+        time.sleep(0.02)
+    raise AssertionError(f"campaign never reached {status}: {data}")
+
+
+def test_campaign_enrolls_in_order_and_retries_failures(client, test_app, monkeypatch):
+    from services import enrollment_service
+    from utils import arduino
+
+    with test_app.app_context():
+        for n in range(3):
+            db.session.add(Student(name=f"S{n}", email=f"s{n}@example.com", fingerprint_id=str(10 + n)))
+        db.session.commit()
+        ids = [s.id for s in Student.query.order_by(Student.id).all()]
+
+    calls = []
+    fail_once = {ids[1]}
+
+    def fake_enroll(entity_id, max_retries=3, per_try_timeout=20.0):
+        calls.append(entity_id)
+        if entity_id in fail_once:
+            fail_once.discard(entity_id)
+            return False, "ECHEC"
+        return True, "OK"
+
+    monkeypatch.setattr(arduino.arduino_manager, "enroll_fingerprint", fake_enroll)
+    monkeypatch.setattr(enrollment_service, "STEP_DELAY", 0)
+
+    r = client.post("/enrollment/campaigns", json={"studentIds": ids})
+    assert r.status_code == 201
+    campaign_id = r.get_json()["id"]
+
+    data = _wait_for(client, campaign_id, "completed")
+    # The slot is the person id, as for /biometric/enroll and verify
+    assert calls == ids
+    assert [i["status"] for i in data["items"]] == ["success", "failed", "success"]
+
+    r = client.post(f"/enrollment/campaigns/{campaign_id}/retry", json={})
+    assert r.status_code == 200
+    data = _wait_for(client, campaign_id, "completed")
+    assert calls == ids + [ids[1]]
+    assert data["counts"] == {"success": 3}
+
+    with test_app.app_context():
+        assert all(s.fingerprint_verified for s in Student.query.all())
+
+
+def test_campaign_rejects_unknown_people(client):
+    r = client.post("/enrollment/campaigns", json={"studentIds": [999]})
+    assert r.status_code == 400
+
+
+def test_retry_while_runner_finishes_is_not_lost(client, test_app, monkeypatch):
+    import threading
+
+    from services import enrollment_service
+    from utils import arduino
+
+    with test_app.app_context():
+        db.session.add(Student(name="S0", email="s0@example.com", fingerprint_id="10"))
+        db.session.commit()
+        student_id = Student.query.one().id
+
+    outcomes = [False, True]
+    monkeypatch.setattr(arduino.arduino_manager, "enroll_fingerprint",
+                        lambda entity_id, max_retries=3, per_try_timeout=20.0: (outcomes.pop(0), "r"))
+    monkeypatch.setattr(enrollment_service, "STEP_DELAY", 0)
+
+    # The retry lands right after the runner found nothing pending, before it completes
+    # (the first empty lookup is the "next up" preview published with the failure)
+    next_pending = enrollment_service._next_pending
+    empty, retried = [], []
+
+    def racing_next_pending(campaign_id):
+        item = next_pending(campaign_id)
+        if item is None:
+            empty.append(campaign_id)
+        if len(empty) == 2 and not retried:
+            retry = threading.Thread(
+                target=lambda: retried.append(test_app.test_client().post(f"/enrollment/campaigns/{campaign_id}/retry"))
+            )
+            retry.start()
+            retry.join(5)
+        return item
+
+    monkeypatch.setattr(enrollment_service, "_next_pending", racing_next_pending)
+    campaign_id = client.post("/enrollment/campaigns", json={"studentIds": [student_id]}).get_json()["id"]
+
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        data = client.get(f"/enrollment/campaigns/{campaign_id}").get_json()
+        if data["status"] == "completed" and data["counts"] == {"success": 1}:
+            break
+        time.sleep(0.02)
+    assert retried and retried[0].status_code == 200
+    assert [i["status"] for i in data["items"]] == ["success"] and outcomes == []
+
+
+def test_campaign_never_writes_an_unsafe_slot(client, test_app, monkeypatch):
+    from services import enrollment_service
+    from utils import arduino
+
+    with test_app.app_context():
+        ok, taken = Student(name="S0", email="s0@example.com"), Student(name="S1", email="s1@example.com")
+        db.session.add_all([ok, taken])
+        db.session.commit()
+        # Enrolled before slots followed person ids: their template sits in `taken`'s slot
+        old = Student(name="Old", email="old@example.com", fingerprint_id=str(taken.id), fingerprint_verified=True)
+        too_big = Student(id=test_app.config["SENSOR_CAPACITY"], name="S2", email="s2@example.com")
+        db.session.add_all([old, too_big])
+        db.session.commit()
+        ids, old_id = [ok.id, taken.id, too_big.id], old.id
+
+    calls = []
+    monkeypatch.setattr(arduino.arduino_manager, "enroll_fingerprint",
+                        lambda entity_id, max_retries=3, per_try_timeout=20.0: (calls.append(entity_id), (True, "OK"))[1])
+    monkeypatch.setattr(enrollment_service, "STEP_DELAY", 0)
+
+    campaign_id = client.post("/enrollment/campaigns", json={"studentIds": ids}).get_json()["id"]
+    data = _wait_for(client, campaign_id, "completed")
+    assert calls == [ids[0]]
+    assert [(i["status"], i["message"]) for i in data["items"]] == [
+        ("success", "OK"),
+        ("failed", f"Slot {ids[1]} is already held by student {old_id}"),
+        ("failed", f"Slot {ids[2]} is outside the sensor's 0-{ids[2] - 1}"),
+    ]
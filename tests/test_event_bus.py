@@ -0,0 +1,52 @@
+import time
+
+from utils.event_bus import UnixSocketBackend, backend_from_url, LocalBackend
+from utils.sse import SSEBroker
+
+
+def _next(q, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not q.empty():
+            return q.get_nowait()
+        time.sleep(0.01)
+    return None
+
+
+def test_unix_socket_bus_fans_out_between_brokers(tmp_path):
+    path = str(tmp_path / "events.sock")
+    worker_a = SSEBroker(UnixSocketBackend(path))
+    worker_b = SSEBroker(UnixSocketBackend(path))
+    q_a, q_b = worker_a.subscribe(), worker_b.subscribe()
+    worker_a._ensure_backend()
+    worker_b._ensure_backend()
+    # start() returns only after the hub (worker A's process) registered the client
+    assert len(worker_a._backend._hub_clients) == 2
+
+    worker_a.publish("access", {"id": 1})
+
+    expected = 'event: access\ndata: {"id": 1}\n\n'
+    assert _next(q_b) == expected
+    assert _next(q_a) == expected
+
+
+def test_idle_hub_clients_stay_connected(tmp_path):
+    path = str(tmp_path / "events.sock")
+    worker_a = SSEBroker(UnixSocketBackend(path))
+    worker_b = SSEBroker(UnixSocketBackend(path))
+    q_b = worker_b.subscribe()
+    worker_a._ensure_backend()
+    worker_b._ensure_backend()
+    client_sock = worker_b._backend._sock
+
+    time.sleep(1.5)  # longer than any socket timeout on the hub side
+    for i in range(20):
+        worker_a.publish("access", {"id": i})
+    received = [_next(q_b) for _ in range(20)]
+    assert received == [f'event: access\ndata: {{"id": {i}}}\n\n' for i in range(20)]
+    assert worker_b._backend._sock is client_sock
+
+
+def test_backend_from_url():
+    assert isinstance(backend_from_url("local"), LocalBackend)
+    assert isinstance(backend_from_url("unix:///tmp/x.sock"), UnixSocketBackend)
@@ -0,0 +1,43 @@
+import pytest
+
+from models import AccessLog, Professor, Student
+from utils.db import db
+
+
+def _rows(columnar):
+    fields, columns = columnar["fields"], columnar["columns"]
+    return [dict(zip(fields, values)) for values in zip(*columns)]
+
+
+def _seed(test_app):
+    with test_app.app_context():
+        db.session.add_all([
+            Student(name="Ada Lovelace", email="ada@example.com", year=2),
+            Student(first_name="Bo", email="bo@example.com", student_number="S-2"),
+            Professor(name="Alan Turing", email="alan@example.com", title="Dean"),
+            AccessLog(entity_type="student", entity_id=1, status="granted"),
+        ])
+        db.session.commit()
+
+
+def test_columnar_json_matches_row_json(client, test_app, auth_headers):
+    _seed(test_app)
+    for path in ("/students", "/professors"):
+        rows = client.get(path).get_json()
+        r = client.get(path, headers={"Accept": "application/vnd.fac.columnar+json"})
+        assert r.mimetype == "application/vnd.fac.columnar+json"
+        assert "Accept" in r.headers["Vary"]
+        assert _rows(r.get_json()) == rows
+        assert client.get(f"{path}?format=columnar").get_json() == r.get_json()
+
+    logs = client.get("/access/logs", headers=auth_headers).get_json()["items"]
+    columnar = client.get("/access/logs?format=columnar", headers=auth_headers).get_json()
+    assert _rows(columnar) == logs and columnar["count"] == 1
+
+
+def test_msgpack_roster(client, test_app):
+    msgpack = pytest.importorskip("msgpack")
+    _seed(test_app)
+    r = client.get("/students", headers={"Accept": "application/msgpack"})
+    assert r.mimetype == "application/x-msgpack"
+    assert _rows(msgpack.unpackb(r.get_data(), raw=False)) == client.get("/students").get_json()
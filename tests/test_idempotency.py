@@ -0,0 +1,100 @@
+import threading
+
+from models import AccessLog, Student
+from utils.db import db
+
+
+def _enrolled_student(test_app) -> int:
+    with test_app.app_context():
+        student = Student(name="Ada", email="ada@example.com", fingerprint_verified=True)
+        db.session.add(student)
+        db.session.commit()
+        return student.id
+
+
+def test_duplicate_verify_replays_first_result(client, test_app, monkeypatch):
+    from utils import arduino
+
+    calls = []
+
+    def fake_verify(expected_id=None, per_try_timeout=3.0, max_polls=10, deadline=None):
+        calls.append(expected_id)
+        return True, "Verification success", expected_id
+
+    monkeypatch.setattr(arduino.arduino_manager, "verify_fingerprint", fake_verify)
+    student_id = _enrolled_student(test_app)
+    body = {"entity_type": "student", "entity_id": student_id}
+    headers = {"Idempotency-Key": "kiosk-1-0001"}
+
+    first = client.post("/access/verify", json=body, headers=headers)
+    second = client.post("/access/verify", json=body, headers=headers)
+    assert first.status_code == second.status_code == 200
+    assert second.get_json() == first.get_json()
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert "Idempotent-Replayed" not in first.headers
+    assert len(calls) == 1
+    with test_app.app_context():
+        assert AccessLog.query.count() == 1
+
+    # Same key, different request
+    r = client.post("/access/verify", json={**body, "entity_id": student_id + 1}, headers=headers)
+    assert r.status_code == 422
+    # No key: every request runs
+    client.post("/access/verify", json=body)
+    assert len(calls) == 2
+
+
+def test_concurrent_duplicates_join_the_running_request(test_app, monkeypatch):
+    from utils import arduino
+
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow_capture(entity, entity_id, max_retries=3, per_try_timeout=20.0, deadline=None):
+        calls.append(entity_id)
+        started.set()
+        release.wait(2)
+        return True, "Enroll success on attempt 1"
+
+    monkeypatch.setattr(arduino.arduino_manager, "capture_fingerprint", slow_capture)
+    request = {"json": {"entity": "student", "entity_id": 3}, "headers": {"Idempotency-Key": "retry-me"}}
+    responses = []
+
+    def post():
+        responses.append(test_app.test_client().post("/arduino/test-capture", **request))
+
+    first = threading.Thread(target=post)
+    first.start()
+    assert started.wait(2)
+    second = threading.Thread(target=post)
+    second.start()
+    release.set()
+    first.join(2)
+    second.join(2)
+
+    assert len(calls) == 1
+    assert [r.status_code for r in responses] == [200, 200]
+    assert responses[0].get_json() == responses[1].get_json()
+    assert sum(r.headers.get("Idempotent-Replayed") == "true" for r in responses) == 1
+
+
+def test_server_errors_release_the_key(client, test_app, monkeypatch):
+    from utils import arduino
+    from utils.scheduler import DeviceBusy
+
+    outcomes = [DeviceBusy("Device queue full for 'verify'", 2.0), (True, "Verification success", 1)]
+
+    def flaky_verify(expected_id=None, per_try_timeout=3.0, max_polls=10, deadline=None):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(arduino.arduino_manager, "verify_fingerprint", flaky_verify)
+    student_id = _enrolled_student(test_app)
+    request = {"json": {"entity_type": "student", "entity_id": student_id}, "headers": {"Idempotency-Key": "k"}}
+
+    assert client.post("/access/verify", **request).status_code == 503
+    retried = client.post("/access/verify", **request)
+    assert retried.status_code == 200 and retried.get_json()["success"] is True
+    assert "Idempotent-Replayed" not in retried.headers
@@ -0,0 +1,103 @@
+import base64
+import random
+
+import pytest
+
+from models import FingerprintTemplate, Professor, Student
+from utils.db import db
+
+np = pytest.importorskip("numpy")
+
+
+def _finger(rng, size=512):
+    return bytes(rng.randrange(256) for _ in range(size))
+
+
+def _reading(template: bytes, rng, noise=40):
+    """Another read of the same finger: the template plus sensor noise."""
+    return bytes(min(255, max(0, b + int(rng.gauss(0, noise)))) for b in template)
+
+
+def test_vectorised_identify_and_verify():
+    from utils.matcher import TemplateMatcher
+
+    rng = random.Random(7)
+    fingers = {person_id: _finger(rng) for person_id in range(1, 401)}
+    matcher = TemplateMatcher()
+    # Two enrolment samples per person
+    rows = [(pid, _reading(t, rng)) for pid, t in fingers.items()] + [(pid, t) for pid, t in fingers.items()]
+    assert matcher.load(rows) == 800
+
+    best = matcher.identify(_reading(fingers[123], rng), top_k=3)
+    assert [pid for pid, _ in best][0] == 123 and best[0][1] > 0.8
+    assert best[1][1] < 0.3
+    assert matcher.identify(_finger(rng), top_k=1)[0][1] < 0.3
+    assert matcher.verify(123, _reading(fingers[123], rng)) > 0.8
+    assert matcher.verify(124, _reading(fingers[123], rng)) < 0.3
+    assert matcher.verify(999, fingers[1]) is None
+    with pytest.raises(ValueError):
+        matcher.identify(b"short")
+
+
+def test_templates_api_scores_verify_and_identify(client, test_app, auth_headers):
+    rng = random.Random(11)
+    ada_finger, bob_finger = _finger(rng), _finger(rng)
+    with test_app.app_context():
+        ada = Student(name="Ada L", email="ada@example.com", fingerprint_verified=True)
+        bob = Professor(name="Bob K", email="bob@example.com", fingerprint_verified=True)
+        db.session.add_all([ada, bob])
+        db.session.commit()
+        ada_id, bob_id = ada.id, bob.id
+
+    def b64(data):
+        return base64.b64encode(data).decode()
+
+    for person_id, finger in ((ada_id, ada_finger), (bob_id, bob_finger)):
+        r = client.post("/matching/templates", json={"personId": person_id, "template": b64(finger)}, headers=auth_headers)
+        assert r.status_code == 201
+    assert client.post("/matching/templates", json={"personId": ada_id, "template": b64(b"x" * 10)},
+                       headers=auth_headers).status_code == 400
+
+    probe = b64(_reading(ada_finger, rng))
+    found = client.post("/matching/identify", json={"template": probe}, headers=auth_headers).get_json()
+    assert found["matched"] and (found["personId"], found["entityType"]) == (ada_id, "student")
+    assert found["confidence"] > 80 and found["candidates"][1]["personId"] == bob_id
+
+    # Kiosks learn only the match; anonymous callers nothing
+    assert client.post("/matching/identify", json={"template": probe}).status_code == 401
+    client.post("/auth/register", json={"username": "kiosk1", "email": "kiosk1@example.com",
+                                        "password": "Kiosk123!", "role": "kiosk"})
+    token = client.post("/auth/login", json={"identifier": "kiosk1", "password": "Kiosk123!"}).get_json()["access_token"]
+    kiosk = client.post("/matching/identify", json={"template": probe},
+                        headers={"Authorization": f"Bearer {token}"}).get_json()
+    assert kiosk == {"matched": True, "personId": ada_id, "entityType": "student"}
+
+    verified = client.post("/students/biometric/verify", json={"studentId": ada_id, "template": probe},
+                           headers=auth_headers).get_json()
+    assert verified["success"] and verified["matchedId"] == ada_id and 80 < verified["confidence"] <= 100
+    rejected = client.post("/professors/biometric/verify", json={"professorId": bob_id, "template": probe},
+                           headers=auth_headers).get_json()
+    assert not rejected["success"] and rejected["confidence"] < 30
+    # The 1:1 check is no score oracle either
+    assert client.post("/students/biometric/verify", json={"studentId": ada_id, "template": probe}).status_code == 401
+    kiosk = client.post("/professors/biometric/verify", json={"professorId": bob_id, "template": probe},
+                        headers={"Authorization": f"Bearer {token}"}).get_json()
+    assert kiosk == {"success": False, "matchedId": None}
+
+    # A template written by another worker (straight to the database) is picked up too
+    carl_finger = _finger(rng)
+    with test_app.app_context():
+        carl = Student(name="Carl G", email="carl@example.com", fingerprint_verified=True)
+        db.session.add(carl)
+        db.session.flush()
+        db.session.add(FingerprintTemplate(person_id=carl.id, data=carl_finger))
+        db.session.commit()
+        carl_id = carl.id
+    found = client.post("/matching/identify", json={"template": b64(_reading(carl_finger, rng))},
+                        headers=auth_headers).get_json()
+    assert found["personId"] == carl_id
+
+    # Deleting the person drops their templates from the matcher
+    assert client.delete(f"/students/{ada_id}").status_code == 200
+    again = client.post("/matching/identify", json={"template": probe}, headers=auth_headers).get_json()
+    assert not again["matched"] and ada_id not in [c["personId"] for c in again["candidates"]]
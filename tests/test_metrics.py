@@ -0,0 +1,30 @@
+from utils.metrics import MetricsRegistry
+
+
+def test_histogram_renders_prometheus_buckets():
+    registry = MetricsRegistry()
+    h = registry.histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    h.observe(0.05, route="/a")
+    h.observe(0.5, route="/a")
+    h.observe(5.0, route="/a")
+
+    text = registry.render()
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{route="/a"} 3' in text
+
+
+def test_metrics_endpoint_exposes_request_latency(client):
+    assert client.get("/health").status_code == 200
+
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.mimetype == "text/plain"
+    text = r.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in text
+    assert "http_requests_in_flight" in text
+    assert "sse_subscribers" in text
+    assert "# TYPE sse_dropped_subscribers_total counter" in text
+    assert "sql_queries_total" in text
@@ -0,0 +1,46 @@
+import importlib.util
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from models import AccessLog
+
+MIGRATIONS = Path(__file__).resolve().parents[1] / "migrations"
+
+
+def _load(name):
+    spec = importlib.util.spec_from_file_location(f"migration_{name[:4]}", MIGRATIONS / name)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_baseline_database_upgrades_to_current_access_logs(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'baseline.db'}")
+    with engine.begin() as conn:
+        # access_logs as the first release created it
+        conn.execute(text("CREATE TABLE access_logs (id INTEGER PRIMARY KEY, entity_type VARCHAR(20) NOT NULL, "
+                          "entity_id INTEGER NOT NULL, status VARCHAR(20) NOT NULL, created_at DATETIME NOT NULL)"))
+        conn.execute(text("INSERT INTO access_logs VALUES (1, 'student', 1, 'granted', '2026-01-05 10:00:00.000000')"))
+
+    _load("0001_people_table.py").upgrade(engine)
+    migration = _load("0002_access_log_columns.py")
+    assert migration.upgrade(engine)["migrated"] is True
+    assert migration.upgrade(engine)["migrated"] is False
+
+    assert {"device", "sequence"} <= {column["name"] for column in inspect(engine).get_columns("access_logs")}
+
+    with Session(engine) as session:
+        for sequence in (None, None, 1):
+            session.add(AccessLog(entity_type="student", entity_id=1, status="denied", device="door-1", sequence=sequence))
+        session.commit()
+        assert [(log.device, log.sequence) for log in session.query(AccessLog).order_by(AccessLog.id)] == [
+            (None, None), ("door-1", None), ("door-1", None), ("door-1", 1),
+        ]
+        # The index the ingest path relies on to drop replays
+        session.add(AccessLog(entity_type="student", entity_id=1, status="denied", device="door-1", sequence=1))
+        with pytest.raises(IntegrityError):
+            session.commit()
@@ -0,0 +1,33 @@
+import threading
+
+import pytest
+
+
+def test_unfinished_operations_are_kept_and_bounded():
+    from utils.operations import OperationManager
+    from utils.scheduler import DeviceBusy
+
+    manager = OperationManager(max_workers=1, max_operations=1, max_pending=2)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(2)
+
+    first = manager.submit("slow", slow)
+    second = manager.submit("slow", slow)
+    assert started.wait(2)
+
+    # Over max_operations, but neither is finished: both stay visible
+    assert manager.get(first["id"])["status"] == "running"
+    assert manager.get(second["id"])["status"] == "pending"
+    with pytest.raises(DeviceBusy) as busy:
+        manager.submit("slow", slow)
+    assert busy.value.retry_after >= 1
+
+    release.set()
+    assert manager.get(second["id"], wait=2)["status"] == "done"
+    third = manager.submit("fast", lambda: 3)
+    assert manager.get(third["id"], wait=2)["result"] == 3
+    # Now the finished ones make room, oldest first
+    assert manager.get(first["id"]) is None and manager.get(second["id"]) is None
@@ -0,0 +1,78 @@
+import importlib.util
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import Session
+
+from models import Person, Professor, Student
+from utils.db import db
+
+MIGRATION = Path(__file__).resolve().parents[1] / "migrations" / "0001_people_table.py"
+
+
+def _migration():
+    spec = importlib.util.spec_from_file_location("people_table_migration", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_roles_share_one_identity_table(test_app):
+    from services.access_service import _find_entity_by_fingerprint
+    from services.professor_service import create_professor
+
+    with test_app.app_context():
+        ada = Student(name="Ada L", email="ada@example.com", fingerprint_id="7", fingerprint_verified=True)
+        bob = Professor(name="Bob K", email="bob@example.com", title="Dr", fingerprint_id="8", fingerprint_verified=True)
+        db.session.add_all([ada, bob])
+        db.session.commit()
+        assert ada.id != bob.id
+        assert {type(p) for p in Person.query.all()} == {Student, Professor}
+        assert _find_entity_by_fingerprint(bob.id) == ("professor", bob)
+
+        # Emails are unique across roles
+        with pytest.raises(ValueError):
+            create_professor({"name": "Ada Again", "email": "ada@example.com"})
+        db.session.rollback()
+
+        # A change to a role-table column alone still moves updated_at (row fragments key on it)
+        before = ada.updated_at
+        time.sleep(0.01)
+        ada.major = "Math"
+        db.session.commit()
+        assert ada.updated_at > before
+
+
+def test_migration_moves_legacy_tables_onto_people(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    person = ("name VARCHAR(120), first_name VARCHAR(80), last_name VARCHAR(80), email VARCHAR(120) NOT NULL UNIQUE, "
+              "fingerprint_id VARCHAR(128), fingerprint_verified BOOLEAN NOT NULL, "
+              "created_at DATETIME NOT NULL, updated_at DATETIME NOT NULL")
+    with engine.begin() as conn:
+        conn.execute(text(f"CREATE TABLE students (id INTEGER PRIMARY KEY, {person}, major VARCHAR(120), "
+                          "student_number VARCHAR(64) UNIQUE, year INTEGER)"))
+        conn.execute(text(f"CREATE TABLE professors (id INTEGER PRIMARY KEY, {person}, department VARCHAR(120), "
+                          "employee_number VARCHAR(64) UNIQUE, title VARCHAR(120))"))
+        conn.execute(text("CREATE TABLE access_logs (id INTEGER PRIMARY KEY, entity_type VARCHAR(20), entity_id INTEGER)"))
+        now = "2026-01-05 10:00:00.000000"
+        for i in (1, 2):
+            conn.execute(text(f"INSERT INTO students VALUES ({i}, 'S {i}', NULL, NULL, 's{i}@x.com', '{i}', 1, "
+                              f"'{now}', '{now}', 'CS', 'S00{i}', 1)"))
+        conn.execute(text(f"INSERT INTO professors VALUES (1, 'P 1', NULL, NULL, 'p1@x.com', '9', 1, "
+                          f"'{now}', '{now}', 'Math', 'E001', 'Dr')"))
+        conn.execute(text("INSERT INTO access_logs VALUES (1, 'professor', 1), (2, 'student', 1)"))
+
+    migration = _migration()
+    result = migration.upgrade(engine)
+    assert result["migrated"] and result["professor_id_offset"] == 2
+    assert result["rewritten"] == {"access_logs": 1}
+    assert migration.upgrade(engine)["migrated"] is False
+
+    with Session(engine) as session:
+        professor = session.get(Professor, 3)
+        assert (professor.email, professor.title, professor.fingerprint_id) == ("p1@x.com", "Dr", "9")
+        assert session.get(Student, 2).to_dict()["studentNumber"] == "S002"
+        logs = session.execute(text("SELECT entity_type, entity_id FROM access_logs ORDER BY id")).all()
+        assert logs == [("professor", 3), ("student", 1)]
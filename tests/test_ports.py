@@ -0,0 +1,35 @@
+from utils.ports import PortInventory
+from utils.sse import sse_broker
+
+
+def test_inventory_serves_cached_list_until_refresh():
+    devices = [{"device": "/dev/ttyACM0"}]
+    inventory = PortInventory(lambda: list(devices), ttl=60, watch_interval=0)
+
+    assert inventory.list() == [{"device": "/dev/ttyACM0"}]
+    assert inventory.list() == [{"device": "/dev/ttyACM0"}]
+    assert inventory.scans == 1
+
+    devices.append({"device": "/dev/ttyACM1"})
+    assert len(inventory.list()) == 1
+    assert len(inventory.refresh()) == 2
+    assert inventory.scans == 2
+
+
+def test_inventory_publishes_device_changes():
+    devices = [{"device": "/dev/ttyACM0"}]
+    inventory = PortInventory(lambda: list(devices), ttl=60, watch_interval=0)
+    inventory.list()
+    seen = []
+    inventory.add_listener(lambda added, removed: seen.append((added, removed)))
+
+    q = sse_broker.subscribe()
+    try:
+        devices[:] = [{"device": "/dev/ttyUSB0"}]
+        inventory.refresh()
+        msg = q.get_nowait()
+    finally:
+        sse_broker.unsubscribe(q)
+
+    assert msg.startswith("event: ports")
+    assert seen == [([{"device": "/dev/ttyUSB0"}], [{"device": "/dev/ttyACM0"}])]
@@ -0,0 +1,47 @@
+import os
+
+
+def test_profile_header_requires_admin(client, test_app, user_headers, auth_headers, tmp_path, monkeypatch):
+    monkeypatch.setitem(test_app.config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setitem(test_app.config, "PROFILE_SLOW_MS", 0)
+
+    r = client.get("/access/logs", headers={**user_headers, "X-Profile": "1"})
+    assert "X-Profile-Report" not in r.headers
+    assert os.listdir(tmp_path) == []
+
+    r = client.get("/access/logs", headers={**auth_headers, "X-Profile": "1"})
+    assert r.status_code == 200
+    report = tmp_path / r.headers["X-Profile-Report"]
+    text = report.read_text()
+    assert "reason: header" in text
+    assert "SELECT" in text
+    assert "cumulative" in text
+
+
+def test_slow_requests_are_captured_and_bounded(client, test_app, tmp_path, monkeypatch):
+    monkeypatch.setitem(test_app.config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setitem(test_app.config, "PROFILE_SLOW_MS", 0.0001)
+    monkeypatch.setitem(test_app.config, "PROFILE_MAX_REPORTS", 2)
+
+    for _ in range(4):
+        r = client.get("/students")
+        assert "reason: slow" in (tmp_path / r.headers["X-Profile-Report"]).read_text()
+
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_profiling_is_skipped_when_another_profiler_is_active(client, test_app, auth_headers, tmp_path, monkeypatch):
+    from utils import profiler
+
+    class _Busy:
+        def enable(self):
+            raise ValueError("Another profiling tool is already active")
+
+    monkeypatch.setitem(test_app.config, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setitem(test_app.config, "PROFILE_SLOW_MS", 0)
+    monkeypatch.setattr(profiler.cProfile, "Profile", _Busy)
+
+    r = client.get("/access/logs", headers={**auth_headers, "X-Profile": "1"})
+    assert r.status_code == 200
+    text = (tmp_path / r.headers["X-Profile-Report"]).read_text()
+    assert "reason: header" in text and "cumulative" not in text
@@ -0,0 +1,85 @@
+import pytest
+
+from models import Student
+from utils.db import db
+
+
+@pytest.fixture(autouse=True)
+def _cache_enabled(test_app, monkeypatch):
+    # Off by default (several workers would serve stale reads); these tests turn it on
+    monkeypatch.setitem(test_app.config, "RESPONSE_CACHE_ENABLED", True)
+
+
+def test_roster_is_served_from_cache_until_a_write(client, test_app):
+    from services.change_service import record_change
+
+    first = client.get("/students")
+    assert first.headers["X-Cache"] == "MISS"
+    second = client.get("/students")
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.get_json() == first.get_json() == []
+    assert second.headers["X-Change-Cursor"] == first.headers["X-Change-Cursor"]
+
+    with test_app.app_context():
+        ada = Student(name="Ada", email="ada@example.com")
+        db.session.add(ada)
+        db.session.flush()
+        record_change("student", ada)
+        db.session.commit()
+        ada_id = ada.id
+
+    fresh = client.get("/students")
+    assert fresh.headers["X-Cache"] == "MISS"
+    assert [s["id"] for s in fresh.get_json()] == [ada_id]
+
+    client.put(f"/students/{ada_id}", json={"major": "Math"})
+    assert client.get("/students").get_json()[0]["major"] == "Math"
+    # Professors are a separate dataset
+    client.get("/professors")
+    assert client.get("/professors").headers["X-Cache"] == "HIT"
+
+
+def test_cache_is_bounded_and_keyed_by_query(client, test_app, auth_headers):
+    from services.access_service import record_door_result
+    from utils.response_cache import ResponseCache, _Entry, response_cache
+
+    assert client.get("/access/logs?period=day", headers=auth_headers).headers["X-Cache"] == "MISS"
+    assert client.get("/access/logs?period=all", headers=auth_headers).headers["X-Cache"] == "MISS"
+    assert client.get("/access/logs?period=day", headers=auth_headers).headers["X-Cache"] == "HIT"
+    with test_app.app_context():
+        record_door_result(False, None)
+    logs = client.get("/access/logs?period=day", headers=auth_headers)
+    assert logs.headers["X-Cache"] == "MISS" and logs.get_json()["count"] == 1
+    assert response_cache.entry_count() == 2
+
+    small = ResponseCache(max_entries=2, max_bytes=10)
+    for i in range(3):
+        small.put(("k", i), _Entry((), None, b"abcd", 200, []))
+    assert small.entry_count() == 2 and small.size_bytes() == 8 and small.evictions == 1
+    assert small.get(("k", 0), ())[1] == "miss"
+
+
+def test_roster_rows_are_reencoded_only_when_updated(client, test_app):
+    from flask import jsonify
+    from services.student_service import get_all_students, update_student
+    from utils.fragment_cache import fragment_cache, fragment_lookups
+
+    with test_app.app_context():
+        db.session.add_all([Student(name="Ada Lovelace", email="ada@example.com"), Student(name="Bo", email="bo@example.com")])
+        db.session.commit()
+        fragment_cache.clear()
+
+        from services.student_service import get_all_students_json
+
+        body = get_all_students_json()
+        with test_app.test_request_context():
+            assert body == jsonify(get_all_students()).get_data()
+        misses = fragment_lookups.value(model="students", result="miss")
+        hits = fragment_lookups.value(model="students", result="hit")
+
+        ada = Student.query.filter_by(email="ada@example.com").first()
+        update_student(ada.id, {"major": "Math"})
+        body = get_all_students_json()
+        assert fragment_lookups.value(model="students", result="miss") == misses + 1
+        assert fragment_lookups.value(model="students", result="hit") == hits + 1
+        assert b'"major":"Math"' in body
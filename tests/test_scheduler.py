@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+
+from utils.scheduler import DeviceBusy, DeviceScheduler
+
+
+def _occupy(scheduler, release):
+    started = threading.Event()
+
+    def run():
+        with scheduler.slot("enroll"):
+            started.set()
+            release.wait(2)
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait(1)
+
+
+def test_verify_jumps_ahead_of_queued_enrollment():
+    scheduler = DeviceScheduler(lambda: "dev")
+    release = threading.Event()
+    _occupy(scheduler, release)
+    order = []
+
+    def queued(kind):
+        with scheduler.slot(kind):
+            order.append(kind)
+
+    threads = [threading.Thread(target=queued, args=("enroll",))]
+    threads[0].start()
+    while scheduler.depth()["enroll"] == 0:
+        time.sleep(0.005)
+    threads.append(threading.Thread(target=queued, args=("verify",)))
+    threads[1].start()
+    while scheduler.depth()["verify"] == 0:
+        time.sleep(0.005)
+
+    release.set()
+    for t in threads:
+        t.join(2)
+    assert order == ["verify", "enroll"]
+
+
+def test_full_queue_and_deadline_are_rejected():
+    scheduler = DeviceScheduler(lambda: "dev", max_depth={"verify": 0})
+    release = threading.Event()
+    _occupy(scheduler, release)
+
+    with pytest.raises(DeviceBusy) as full:
+        with scheduler.slot("verify"):
+            pass
+    assert full.value.retry_after >= 1
+
+    with pytest.raises(DeviceBusy):
+        with scheduler.slot("status", deadline=time.monotonic() + 0.05):
+            pass
+    release.set()
+
+
+def test_busy_device_maps_to_503(client, monkeypatch):
+    from utils import arduino
+
+    def busy(*args, **kwargs):
+        raise DeviceBusy("Device queue full for 'verify'", retry_after=4)
+
+    monkeypatch.setattr(arduino.arduino_manager, "verify_fingerprint", busy)
+    r = client.post("/students/biometric/verify", json={"studentId": 1})
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "4"
@@ -0,0 +1,194 @@
+from models import AccessLog, SensorSlot, Student
+from utils.db import db
+
+
+class _Reader:
+    """One fake sensor: remembers which slots were enrolled and matches only those."""
+
+    def __init__(self, port):
+        self.port = port
+        self.slots = set()
+        self.verified = []
+
+    def status(self):
+        return {"connected": True, "port": self.port, "queue": {"verify": 0}}
+
+    def connect_in_background(self, port, baudrate=9600):
+        pass
+
+    def enroll_fingerprint(self, entity_id, max_retries=3, per_try_timeout=20.0, deadline=None):
+        self.slots.add(entity_id)
+        return True, "Enroll success on attempt 1"
+
+    def verify_fingerprint(self, expected_id=None, per_try_timeout=3.0, max_polls=10, deadline=None):
+        self.verified.append(expected_id)
+        if expected_id in self.slots:
+            return True, "Verification success", expected_id
+        return False, "Verification timeout (ECHEC)", None
+
+
+def _readers(*ports):
+    from utils.arduino import sensor_pool
+
+    readers = [_Reader(port) for port in ports]
+    for reader in readers:
+        sensor_pool.add(reader.port, reader)
+    return readers
+
+
+def _students(test_app, n):
+    with test_app.app_context():
+        students = [Student(name=f"S {i}", email=f"s{i}@example.com") for i in range(n)]
+        db.session.add_all(students)
+        db.session.commit()
+        return [s.id for s in students]
+
+
+def test_people_are_sharded_across_sensors(client, test_app, auth_headers):
+    from services.access_service import _find_entity_by_fingerprint
+
+    a, b = _readers("/dev/readerA", "/dev/readerB")
+    for name, port in (("door-a", a.port), ("door-b", b.port)):
+        r = client.post("/sensors", json={"name": name, "port": port, "capacity": 2}, headers=auth_headers)
+        assert r.status_code == 201
+    ids = _students(test_app, 5)
+
+    for student_id in ids[:4]:
+        r = client.post("/students/biometric/enroll", json={"studentId": student_id}).get_json()
+        assert r["success"], r
+    # Least-full sensor first: A and B take turns, each from slot 0
+    assert a.slots == b.slots == {0, 1}
+    full = client.post("/students/biometric/enroll", json={"studentId": ids[4]}).get_json()
+    assert not full["success"] and "No sensor has a free slot" in full["message"]
+    assert [s["free"] for s in client.get("/sensors").get_json()] == [0, 0]
+
+    # Verification goes to the one reader holding the person's slot
+    r = client.post("/students/biometric/verify", json={"studentId": ids[3]}).get_json()
+    assert r["success"] and r["matchedId"] == ids[3]
+    assert (a.verified, b.verified) == ([], [1])
+    r = client.post("/access/verify", json={"entity_type": "student", "entity_id": ids[0]}).get_json()
+    assert r["success"] and r["log"]["device"] == a.port
+    r = client.post("/access/verify", json={"entity_type": "student", "entity_id": ids[4]}).get_json()
+    assert not r["success"]
+
+    with test_app.app_context():
+        assert _find_entity_by_fingerprint(1, b.port)[1].id == ids[3]
+        assert db.session.get(Student, ids[3]).fingerprint_verified
+        assert AccessLog.query.filter_by(status="granted").count() == 1
+    assert client.get(f"/sensors/people/{ids[1]}").get_json() == [
+        {"sensor": "door-b", "port": b.port, "personId": ids[1], "slot": 0, "enrolled": True}
+    ]
+    # Deleting a person frees their slot
+    assert client.delete(f"/students/{ids[0]}").status_code == 200
+    assert [s["free"] for s in client.get("/sensors").get_json()] == [1, 0]
+    # The template left behind on A resolves to nobody, and a registered sensor never
+    # falls back to the single-reader rule (slot = person id)
+    with test_app.app_context():
+        other = db.session.get(Student, ids[4])
+        other.fingerprint_verified = True
+        db.session.commit()
+        assert _find_entity_by_fingerprint(0, a.port) == (None, None)
+        assert _find_entity_by_fingerprint(ids[4], a.port) == (None, None)
+        assert _find_entity_by_fingerprint(ids[4], "/dev/legacy")[1].id == ids[4]
+
+
+def test_new_sensor_takes_pending_slots(client, test_app, auth_headers):
+    from services.sensor_service import assign_slots
+
+    client.post("/sensors", json={"name": "door-a", "port": "/dev/readerA", "capacity": 4}, headers=auth_headers)
+    ids = _students(test_app, 4)
+    with test_app.app_context():
+        for person_id in ids:
+            assign_slots(person_id)
+        # Three captured on A already; only the fourth can still move
+        SensorSlot.query.filter(SensorSlot.person_id.in_(ids[:3])).update({"enrolled": True})
+        db.session.commit()
+
+    r = client.post("/sensors", json={"name": "door-b", "port": "/dev/readerB", "capacity": 4}, headers=auth_headers)
+    body = r.get_json()
+    assert (body["moved"], body["pinned"]) == (1, 1)
+    assert [(s["name"], s["used"], s["enrolled"]) for s in body["sensors"]] == [("door-a", 3, 3), ("door-b", 1, 0)]
+    assert client.get(f"/sensors/people/{ids[3]}").get_json()[0]["sensor"] == "door-b"
+    assert client.post("/sensors", json={"name": "door-c", "port": "/dev/readerB"},
+                       headers=auth_headers).status_code == 400
+
+
+def test_ingest_resolves_slots_per_sensor(client, test_app, auth_headers):
+    from services.sensor_service import assign_slots
+
+    client.post("/sensors", json={"name": "door-a", "port": "/dev/readerA", "capacity": 1}, headers=auth_headers)
+    client.post("/sensors", json={"name": "door-b", "port": "/dev/readerB", "capacity": 1}, headers=auth_headers)
+    on_a, on_b, legacy = _students(test_app, 3)
+    with test_app.app_context():
+        for person_id in (on_a, on_b):
+            assign_slots(person_id)
+        SensorSlot.query.update({"enrolled": True})
+        # Enrolled on the single reader (slot = person id): must not claim that slot on a registered sensor
+        db.session.get(Student, legacy).fingerprint_verified = True
+        db.session.commit()
+
+    events = [("/dev/readerA", 1, 0), ("/dev/readerB", 1, 0), ("/dev/readerB", 2, legacy), ("door-legacy", 1, legacy)]
+    for device, seq, slot in events:
+        event = {"seq": seq, "ts": "2026-01-05T10:00:00Z", "slot": slot, "success": True}
+        r = client.post("/access/ingest", json={"device": device, "events": [event]}, headers=auth_headers)
+        assert r.get_json()["inserted"] == 1
+    with test_app.app_context():
+        logs = {(log.device, log.sequence): (log.entity_type, log.entity_id, log.status) for log in AccessLog.query}
+    assert logs == {
+        ("/dev/readerA", 1): ("student", on_a, "granted"),
+        ("/dev/readerB", 1): ("student", on_b, "granted"),
+        ("/dev/readerB", 2): ("unknown", legacy, "denied"),
+        ("door-legacy", 1): ("student", legacy, "granted"),
+    }
+
+
+def test_slot_taken_by_another_worker_is_retried(client, test_app, auth_headers, monkeypatch):
+    from models import Sensor
+    from services import sensor_service
+
+    client.post("/sensors", json={"name": "door-a", "port": "/dev/readerA", "capacity": 4}, headers=auth_headers)
+    mine, theirs = _students(test_app, 2)
+    free_slot = sensor_service._free_slot
+    raced = []
+
+    def racing_free_slot(sensor):
+        slot = free_slot(sensor)
+        if not raced:
+            # Another worker commits the same slot between our lookup and our insert
+            raced.append(slot)
+            with db.engine.begin() as conn:
+                conn.execute(SensorSlot.__table__.insert().values(
+                    sensor_id=sensor.id, person_id=theirs, slot=slot, enrolled=False,
+                    created_at=sensor.created_at, updated_at=sensor.created_at,
+                ))
+        return slot
+
+    monkeypatch.setattr(sensor_service, "_free_slot", racing_free_slot)
+    with test_app.app_context():
+        slots = sensor_service.reserve_slots(mine)
+        assert [row.slot for row in slots] == [1] and raced == [0]
+        assert Sensor.query.count() == 1 and SensorSlot.query.count() == 2
+
+
+def test_new_sensor_ports_connect_in_the_background():
+    import threading
+    from utils.arduino import ArduinoManager, SensorPool
+
+    opening, release = threading.Event(), threading.Event()
+    manager = ArduinoManager()
+
+    def slow_open(port, baudrate, timeout, ready_timeout):
+        opening.set()
+        release.wait(2)
+        return False, "gone"
+
+    manager._open = slow_open
+    manager.ports.list = lambda: []
+    pool = SensorPool(object(), lambda port: manager)
+
+    assert pool.manager("/dev/readerC") is manager
+    # The request got its manager back while the port is still opening
+    assert opening.wait(2) and manager.status()["reconnecting"]
+    assert manager.target_port == "/dev/readerC"
+    manager.disconnect()
+    release.set()
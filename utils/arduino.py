@@ -2,10 +2,156 @@ from __future__ import annotations
 
 import threading
 import time
-from typing import List, Optional, Tuple
+from collections import deque
+from datetime import datetime
+from typing import TYPE_CHECKING, Callable, Deque, Dict, List, Optional, Tuple
 
-import serial
-import serial.tools.list_ports
+from config import Config
+from utils.metrics import metrics
+from utils.ports import PortInventory
+from utils.scheduler import DeviceBusy, DeviceScheduler
+from utils.serial_sim import SIMULATED_PORT_PREFIX, SimulatedSerial
+from utils.sse import sse_broker
+
+if TYPE_CHECKING:
+    import serial
+
+
+def _pyserial():
+    """Import pyserial on first device use so importing the app stays cheap."""
+    import serial
+    import serial.tools.list_ports
+
+    return serial
+
+
+def _open_serial(port: str, baudrate: int, timeout: float):
+    if port.startswith(SIMULATED_PORT_PREFIX):
+        if not Config.ARDUINO_SIMULATOR:
+            raise ValueError("simulated ports are disabled (set ARDUINO_SIMULATOR=1)")
+        return SimulatedSerial(port, baudrate=baudrate, timeout=timeout)
+    return _pyserial().Serial(port=port, baudrate=baudrate, timeout=timeout)
+
+
+serial_operations = metrics.counter(
+    "serial_operations_total", "Arduino serial operations by outcome.", ("operation", "outcome")
+)
+serial_phase_seconds = metrics.histogram(
+    "serial_phase_seconds",
+    "Time from operation start to each protocol phase, per device.",
+    ("device", "operation", "phase"),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 40.0, 60.0, 120.0),
+)
+serial_operation_polls = metrics.histogram(
+    "serial_operation_polls",
+    "Serial reads used per operation, per device.",
+    ("device", "operation"),
+    buckets=(1, 2, 3, 5, 8, 10, 15, 20, 30, 60),
+)
+serial_read_timeouts = metrics.counter(
+    "serial_read_timeouts_total", "Serial reads that returned no line before the timeout.", ("device", "operation")
+)
+
+# Size of the recent-operations ring buffer exposed on /arduino/metrics
+RECENT_OPERATIONS = 200
+
+# Connect readiness detection: lines the firmware prints once it accepts commands
+READY_PREFIXES = ("INFO", "CAPTEUR", "ACK", "ERR", "PORTE")
+# Wait this long for a boot banner before sending the first probe, then re-probe
+READY_PROBE_GRACE = 0.3
+READY_PROBE_INTERVAL = 0.5
+READY_READ_SLICE = 0.05
+
+# After 'C' on an expired or interrupted enrollment, wait this long for the ACK before releasing the device
+CANCEL_ACK_WAIT = 0.2
+
+# disconnect() interrupts the running operation, then waits at most this long for the device
+DISCONNECT_WAIT = 10.0
+
+# Door mode: longest single read while holding the device lock, and back-off while disconnected
+DOOR_READ_SLICE = 0.25
+DOOR_IDLE_WAIT = 0.5
+
+
+def _bucket_quantile(snap: dict, q: float) -> Optional[float]:
+    """Upper bound of the histogram bucket containing quantile q (None if unknown)."""
+    count = snap.get("count", 0)
+    if not count:
+        return None
+    target = q * count
+    for bound, cumulative in snap.get("buckets", []):
+        if cumulative >= target:
+            return bound
+    return None
+
+
+def _bucket_quantile_ms(snap: dict, q: float) -> Optional[float]:
+    bound = _bucket_quantile(snap, q)
+    return None if bound is None else round(bound * 1000, 2)
+
+
+def _read_timeout(slice_: float, deadline: Optional[float]) -> float:
+    """`slice_`, shortened so a read never blocks past `deadline` (monotonic)."""
+    if deadline is None:
+        return slice_
+    return max(min(slice_, deadline - time.monotonic()), 0.0)
+
+
+def _expired(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _parse_matched_id(text: str) -> Optional[int]:
+    """Trailing numeric token of 'VERIFICATION: SUCCES ID trouve: <id>'."""
+    matched_id = None
+    for tok in text.replace(":", " ").split():
+        if tok.isdigit():
+            matched_id = int(tok)
+    return matched_id
+
+
+class OperationTrace:
+    """Timing of one device operation: each phase is recorded as seconds since start."""
+
+    def __init__(self, operation: str, device: str) -> None:
+        self.operation = operation
+        self.device = device
+        self.started_at = datetime.utcnow()
+        self._t0 = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.polls = 0
+        self.timeouts = 0
+        self.attempts = 0
+        self.outcome: Optional[str] = None
+
+    def mark(self, phase: str) -> None:
+        self.phases[phase] = time.perf_counter() - self._t0
+
+    def mark_once(self, phase: str) -> None:
+        if phase not in self.phases:
+            self.mark(phase)
+
+    def finish(self, outcome: str) -> None:
+        self.mark("total")
+        self.outcome = outcome
+        for phase, elapsed in self.phases.items():
+            serial_phase_seconds.observe(elapsed, device=self.device, operation=self.operation, phase=phase)
+        serial_operation_polls.observe(self.polls, device=self.device, operation=self.operation)
+        if self.timeouts:
+            serial_read_timeouts.inc(self.timeouts, device=self.device, operation=self.operation)
+        serial_operations.inc(operation=self.operation, outcome=outcome)
+
+    def to_dict(self) -> dict:
+        return {
+            "operation": self.operation,
+            "device": self.device,
+            "started_at": self.started_at.isoformat(),
+            "outcome": self.outcome,
+            "phases_ms": {k: round(v * 1000, 2) for k, v in self.phases.items()},
+            "polls": self.polls,
+            "timeouts": self.timeouts,
+            "attempts": self.attempts,
+        }
 
 
 class ArduinoManager:
@@ -24,14 +170,47 @@ class ArduinoManager:
     """
 
     def __init__(self) -> None:
+        # Guards connection state only; exclusive device use goes through self._scheduler
         self._lock = threading.Lock()
+        self._scheduler = DeviceScheduler(lambda: self._port or "unknown")
         self._ser: Optional[serial.Serial] = None
         self._port: Optional[str] = None
         self._baudrate: int = 9600
+        self._recent_lock = threading.Lock()
+        self._recent: Deque[dict] = deque(maxlen=RECENT_OPERATIONS)
+        self.ports = PortInventory(
+            self._scan_ports, ttl=Config.PORTS_CACHE_TTL, watch_interval=Config.PORTS_WATCH_INTERVAL
+        )
+        self.ports.add_listener(self._on_ports_changed)
+        self._ready = False
+        # Serializes connect attempts without holding the device lock while waiting
+        self._connect_lock = threading.Lock()
+        # (port, baudrate) the caller asked for; None after an explicit disconnect
+        self._target: Optional[Tuple[str, int]] = None
+        self._reconnector: Optional[threading.Thread] = None
+        self._reconnect_wake = threading.Event()
+        # Last mode command sent to the sensor ('V' or 'E'); None after (re)connect
+        self._mode: Optional[str] = None
+        # Set while disconnect() waits for the device: enroll/verify give it up at their next read
+        self._abort = threading.Event()
+        # Door mode: start/stop are serialized; each run gets its own stop event, so a
+        # reader still finishing its last read after a stop cannot outlive it into the next run
+        self._door_lock = threading.Lock()
+        self._door_stop: Optional[threading.Event] = None
+        self._door_thread: Optional[threading.Thread] = None
 
     # ---------------------- Connection management ----------------------
     def list_ports(self) -> List[dict]:
-        ports = serial.tools.list_ports.comports()
+        """Cached port list; rescanned on TTL expiry or hot-plug."""
+        return self.ports.list()
+
+    def refresh_ports(self) -> List[dict]:
+        """Force a full rescan of the serial ports."""
+        return self.ports.refresh()
+
+    @staticmethod
+    def _scan_ports() -> List[dict]:
+        ports = _pyserial().tools.list_ports.comports()
         return [
             {
                 "device": p.device,
@@ -47,34 +226,121 @@ class ArduinoManager:
             for p in ports
         ]
 
-    def connect(self, port: str, baudrate: int = 9600, timeout: float = 2.0) -> Tuple[bool, str]:
+    def connect(
+        self,
+        port: str,
+        baudrate: int = 9600,
+        timeout: float = 2.0,
+        ready_timeout: Optional[float] = None,
+    ) -> Tuple[bool, str]:
+        """Open the port and return as soon as the firmware shows it is ready
+        (boot banner or probe reply), or after `ready_timeout` at the latest.
+        The device lock is not held while waiting, so other calls are not blocked.
+        """
         with self._lock:
             if self._ser and self._ser.is_open:
+                serial_operations.inc(operation="connect", outcome="already_connected")
                 return True, f"Already connected to {self._port}"
+        self._target = (port, baudrate)
+        return self._open(port, baudrate, timeout, ready_timeout)
+
+    def _open(
+        self, port: str, baudrate: int, timeout: float, ready_timeout: Optional[float]
+    ) -> Tuple[bool, str]:
+        with self._connect_lock:
+            with self._lock:
+                if self._ser and self._ser.is_open:
+                    return True, f"Already connected to {self._port}"
+            try:
+                ser = _open_serial(port, baudrate, timeout)
+            except Exception as e:
+                serial_operations.inc(operation="connect", outcome="error")
+                return False, f"Connection failed: {e}"
+            started = time.perf_counter()
             try:
-                ser = serial.Serial(port=port, baudrate=baudrate, timeout=timeout)
-                # Give the Arduino time to reset after opening serial
-                time.sleep(2)
+                ready = self._wait_ready(ser, Config.ARDUINO_READY_TIMEOUT if ready_timeout is None else ready_timeout)
+            except OSError as e:
+                ser.close()
+                serial_operations.inc(operation="connect", outcome="error")
+                return False, f"Connection failed: {e}"
+            serial_phase_seconds.observe(
+                time.perf_counter() - started, device=port, operation="connect", phase="ready"
+            )
+            with self._lock:
+                target = self._target
+                if target is None or target[0] != port:
+                    # disconnect() (or a connect to another port) ran while this port was opening
+                    ser.close()
+                    serial_operations.inc(operation="connect", outcome="cancelled")
+                    return False, f"Connection to {port} cancelled"
                 self._ser = ser
                 self._port = port
                 self._baudrate = baudrate
-                return True, f"Connected to {port} at {baudrate}"
-            except Exception as e:
-                self._ser = None
-                self._port = None
-                return False, f"Connection failed: {e}"
+                self._ready = ready
+                self._mode = None
+            serial_operations.inc(operation="connect", outcome="success" if ready else "unconfirmed")
+            suffix = "" if ready else " (no readiness signal from firmware)"
+            return True, f"Connected to {port} at {baudrate}{suffix}"
+
+    @staticmethod
+    def _wait_ready(ser, ready_timeout: float) -> bool:
+        """Read until the firmware prints a banner/ACK line, probing periodically.
+
+        Boards that reset on open print INFO/CAPTEUR lines once booted; boards that
+        don't reset answer the probe command. Returns False if nothing arrives
+        before the deadline (the port stays open either way).
+        """
+        now = time.monotonic()
+        deadline = now + ready_timeout
+        next_probe = now + READY_PROBE_GRACE
+        while True:
+            now = time.monotonic()
+            if now >= deadline:
+                return False
+            if now >= next_probe:
+                ser.write((Config.ARDUINO_PROBE_COMMAND + "\n").encode("utf-8"))
+                next_probe = now + READY_PROBE_INTERVAL
+            ser.timeout = min(READY_READ_SLICE, max(deadline - now, 0.0))
+            text = ser.readline().decode("utf-8", errors="ignore").strip().upper()
+            if text.startswith(READY_PREFIXES):
+                return True
 
     def disconnect(self) -> Tuple[bool, str]:
-        with self._lock:
-            if self._ser:
-                try:
-                    self._ser.close()
-                finally:
-                    self._ser = None
-                    prev = self._port
-                    self._port = None
-                    return True, f"Disconnected from {prev}"
-            return True, "Not connected"
+        """Close the port. A running enrollment is cancelled ('C') rather than waited for.
+
+        Operations that get the device before the disconnect does return at once,
+        so the caller waits for one read slice, not for the queue.
+        """
+        # Explicit disconnect also stops background reconnection
+        self._target = None
+        self._reconnect_wake.set()
+        self._abort.set()
+        try:
+            with self._scheduler.slot("status", time.monotonic() + DISCONNECT_WAIT), self._lock:
+                serial_operations.inc(operation="disconnect", outcome="success")
+                if self._ser:
+                    try:
+                        self._ser.close()
+                    finally:
+                        self._ser = None
+                        prev = self._port
+                        self._port = None
+                        self._ready = False
+                        return True, f"Disconnected from {prev}"
+                return True, "Not connected"
+        finally:
+            self._abort.clear()
+
+    def connect_in_background(self, port: str, baudrate: int = 9600) -> None:
+        """Make `port` the target and open it on the reconnect thread; returns at once."""
+        self._target = (port, baudrate)
+        self._schedule_reconnect()
+
+    @property
+    def target_port(self) -> Optional[str]:
+        """Port this manager is (or keeps reconnecting) connected to."""
+        target = self._target
+        return target[0] if target else self._port
 
     def status(self) -> dict:
         with self._lock:
@@ -82,63 +348,200 @@ class ArduinoManager:
                 "connected": bool(self._ser and self._ser.is_open),
                 "port": self._port,
                 "baudrate": self._baudrate,
+                "ready": self._ready,
+                "reconnecting": bool(self._reconnector and self._reconnector.is_alive()),
+                "door_mode": self._door_running(),
+                "queue": self._scheduler.depth(),
             }
 
+    # ---------------------- Reconnection ----------------------
+    def _drop_connection(self, reason: Exception) -> None:
+        """Forget a port that failed with an I/O error and reconnect in the background.
+        Caller must own the device scheduler slot.
+        """
+        serial_operations.inc(operation="io", outcome="error")
+        with self._lock:
+            if self._ser is not None:
+                try:
+                    self._ser.close()
+                except Exception:
+                    pass
+            self._ser = None
+            self._ready = False
+        self._schedule_reconnect()
+
+    def _schedule_reconnect(self) -> None:
+        if self._target is None:
+            return
+        if self._reconnector is not None and self._reconnector.is_alive():
+            self._reconnect_wake.set()
+            return
+        self._reconnect_wake.clear()
+        self._reconnector = threading.Thread(target=self._reconnect_loop, name="arduino-reconnect", daemon=True)
+        self._reconnector.start()
+
+    def _on_ports_changed(self, added: List[dict], removed: List[dict]) -> None:
+        target = self._target
+        if target and any(p.get("device") == target[0] for p in added):
+            self._reconnect_wake.set()
+
+    def _reconnect_loop(self) -> None:
+        """Retry the last requested port with exponential backoff; hot-plug of that
+        port wakes the loop immediately."""
+        try:
+            self.ports.list()  # seeds the inventory and starts the hot-plug watcher
+        except Exception:
+            pass
+        delay = Config.ARDUINO_RECONNECT_MIN_DELAY
+        while True:
+            target = self._target
+            if target is None:
+                return
+            with self._lock:
+                if self._ser and self._ser.is_open:
+                    return
+            ok, _ = self._open(target[0], target[1], 2.0, None)
+            if ok:
+                serial_operations.inc(operation="reconnect", outcome="success")
+                sse_broker.publish("device", {"event": "reconnected", "port": target[0]})
+                return
+            self._reconnect_wake.wait(delay)
+            self._reconnect_wake.clear()
+            delay = min(delay * 2, Config.ARDUINO_RECONNECT_MAX_DELAY)
+
     # ---------------------- Helpers ----------------------
     def _write_line(self, s: str) -> None:
         assert self._ser is not None
         self._ser.write((s + "\n").encode("utf-8"))
 
+    def _stopping(self, deadline: Optional[float]) -> bool:
+        """The running operation should give up the device: deadline passed or disconnect pending."""
+        return self._abort.is_set() or _expired(deadline)
+
     def _read_line(self, timeout: float) -> str:
         assert self._ser is not None
         self._ser.timeout = timeout
         line = self._ser.readline()
         return line.decode("utf-8", errors="ignore").strip()
 
+    # ---------------------- Instrumentation ----------------------
+    def _begin(self, operation: str) -> "OperationTrace":
+        return OperationTrace(operation, self._port or "unknown")
+
+    def _finish(self, trace: "OperationTrace", outcome: str) -> None:
+        trace.finish(outcome)
+        with self._recent_lock:
+            self._recent.append(trace.to_dict())
+
+    def metrics_snapshot(self, limit: int = 50) -> dict:
+        """Per-device phase histograms and the most recent operation traces."""
+        phases = []
+        for labels in serial_phase_seconds.label_sets():
+            snap = serial_phase_seconds.snapshot(**labels) or {}
+            count = snap.get("count", 0)
+            phases.append({
+                **labels,
+                "count": count,
+                "avg_ms": round(snap.get("sum", 0.0) * 1000 / count, 2) if count else None,
+                "p50_ms": _bucket_quantile_ms(snap, 0.50),
+                "p95_ms": _bucket_quantile_ms(snap, 0.95),
+                "buckets": [[bound, n] for bound, n in snap.get("buckets", [])],
+            })
+        polls = []
+        for labels in serial_operation_polls.label_sets():
+            snap = serial_operation_polls.snapshot(**labels) or {}
+            count = snap.get("count", 0)
+            polls.append({
+                **labels,
+                "count": count,
+                "avg_polls": round(snap.get("sum", 0.0) / count, 2) if count else None,
+                "p95_polls": _bucket_quantile(snap, 0.95),
+            })
+        with self._recent_lock:
+            recent = list(self._recent)[-max(limit, 0):] if limit else []
+        return {"phases": phases, "polls": polls, "recent": list(reversed(recent))}
+
     # ---------------------- Enrollment & Verification ----------------------
     def enroll_fingerprint(
         self,
         entity_id: int,
         max_retries: int = 3,
         per_try_timeout: float = 20.0,
+        deadline: Optional[float] = None,
     ) -> Tuple[bool, str]:
         """Enroll a fingerprint for a given ID using E + I:<id> sequence.
         Expects 'ENREGISTREMENT: SUCCES' from device.
+        Raises DeviceBusy if the device queue is full or `deadline` (monotonic) passes while queued.
+        If the deadline passes (or disconnect() is called) during enrollment, the sensor gets 'C'
+        and the device is released at once.
         """
-        with self._lock:
+        trace = self._begin("enroll")
+        with self._scheduler.slot("enroll", deadline):
+            trace.mark("queue_wait")
+            trace.device = self._port or trace.device
             if not (self._ser and self._ser.is_open):
+                self._finish(trace, "not_connected")
                 return False, "Arduino not connected"
 
             self._ser.reset_input_buffer()
             last_msg = ""
             for attempt in range(1, max_retries + 1):
+                if self._stopping(deadline):
+                    break
+                trace.attempts = attempt
                 try:
                     # Enter enrollment mode and set ID
                     self._write_line("E")
+                    self._mode = "E"
                     # read ack lines quickly (non-blocking-ish)
-                    _ = self._read_line(timeout=1.0)
+                    _ = self._read_line(timeout=_read_timeout(1.0, deadline))
                     self._write_line(f"I:{int(entity_id)}")
-                    _ = self._read_line(timeout=1.0)
+                    _ = self._read_line(timeout=_read_timeout(1.0, deadline))
+                    trace.mark_once("mode_ack")
 
                     # Wait for enrollment result
                     # Device will emit ENREGISTREMENT: EN_COURS, then SUCCES or ECHEC/ABANDONNE
                     start = time.time()
-                    while time.time() - start < per_try_timeout:
-                        text = (self._read_line(timeout=2.0) or "").upper()
-                        print(f"Enroll attempt {attempt}, received: {text}")
+                    while time.time() - start < per_try_timeout and not self._stopping(deadline):
+                        trace.polls += 1
+                        text = (self._read_line(timeout=_read_timeout(2.0, deadline)) or "").upper()
                         if not text:
+                            trace.timeouts += 1
                             continue
+                        if "ENREGISTREMENT: EN_COURS" in text:
+                            trace.mark_once("first_en_cours")
                         if "ENREGISTREMENT: SUCCES" in text:
+                            trace.mark_once("result")
+                            self._finish(trace, "success")
                             return True, f"Enroll success on attempt {attempt}"
                         if "ENREGISTREMENT: ECHEC" in text:
+                            trace.mark_once("result")
                             last_msg = "ECHEC"
                             break
                         if "ENREGISTREMENT: ABANDONNE" in text:
+                            trace.mark_once("result")
+                            self._finish(trace, "cancelled")
                             return False, "Enroll cancelled"
                         # ignore other INFO/ACK lines
                     # retry if not successful
+                except OSError as e:
+                    # Port vanished (USB glitch/unplug): stop retrying and reconnect in the background
+                    self._drop_connection(e)
+                    self._finish(trace, "io_error")
+                    return False, f"Device I/O error: {e}"
                 except Exception as e:
                     last_msg = f"Error: {e}"
+            if self._stopping(deadline):
+                try:
+                    self._cancel_enrollment()
+                except OSError as e:
+                    self._drop_connection(e)
+                if self._abort.is_set():
+                    self._finish(trace, "cancelled")
+                    return False, "Enroll cancelled: device disconnecting"
+                self._finish(trace, "deadline")
+                return False, "Enroll cancelled: deadline exceeded"
+            self._finish(trace, "failed")
             return False, f"Enroll failed after {max_retries} attempts ({last_msg})"
 
     def verify_fingerprint(
@@ -146,44 +549,148 @@ class ArduinoManager:
         expected_id: Optional[int] = None,
         per_try_timeout: float = 3.0,
         max_polls: int = 10,
+        deadline: Optional[float] = None,
     ) -> Tuple[bool, str, Optional[int]]:
         """Verify by switching to V mode and polling for VERIFICATION result.
         Returns (success, message, matched_id). If expected_id is set, success is True only if matched_id == expected_id.
+        Verify runs ahead of queued enrollments; raises DeviceBusy like enroll_fingerprint.
+        Polling stops as soon as `deadline` passes, freeing the device for the next caller.
         """
-        with self._lock:
+        trace = self._begin("verify")
+        with self._scheduler.slot("verify", deadline):
+            trace.mark("queue_wait")
+            trace.device = self._port or trace.device
             if not (self._ser and self._ser.is_open):
+                self._finish(trace, "not_connected")
                 return False, "Arduino not connected", None
 
-            self._ser.reset_input_buffer()
-            # Enter verify mode
-            self._write_line("V")
-            _ = self._read_line(timeout=1.0)
+            try:
+                self._ser.reset_input_buffer()
+                # Enter verify mode
+                self._write_line("V")
+                self._mode = "V"
+                _ = self._read_line(timeout=_read_timeout(1.0, deadline))
+                trace.mark("mode_ack")
 
-            polls = 0
-            last_msg = ""
-            while polls < max_polls:
-                polls += 1
-                text = (self._read_line(timeout=per_try_timeout) or "").upper()
-                if not text:
-                    continue
-                if text.startswith("VERIFICATION: SUCCES"):
-                    # Attempt to parse ID
-                    matched_id = None
-                    # find trailing number
-                    for tok in text.split():
-                        if tok.isdigit():
-                            matched_id = int(tok)
-                    # If expected specified, compare
-                    if expected_id is None or (matched_id == expected_id):
-                        return True, "Verification success", matched_id
-                    else:
-                        return False, f"Verification matched ID {matched_id}, expected {expected_id}", matched_id
-                if "VERIFICATION: ECHEC" in text:
-                    last_msg = "ECHEC"
-                    # keep polling for next attempt
-                    continue
-                # ignore other lines
-            return False, f"Verification timeout ({last_msg})", None
+                polls = 0
+                last_msg = ""
+                while polls < max_polls:
+                    if self._abort.is_set():
+                        self._finish(trace, "cancelled")
+                        return False, "Verification abandoned: device disconnecting", None
+                    if _expired(deadline):
+                        self._finish(trace, "deadline")
+                        return False, "Verification abandoned: deadline exceeded", None
+                    polls += 1
+                    trace.polls = polls
+                    text = (self._read_line(timeout=_read_timeout(per_try_timeout, deadline)) or "").upper()
+                    if not text:
+                        trace.timeouts += 1
+                        continue
+                    if "VERIFICATION: EN_COURS" in text:
+                        trace.mark_once("first_en_cours")
+                    if text.startswith("VERIFICATION: SUCCES"):
+                        trace.mark_once("result")
+                        matched_id = _parse_matched_id(text)
+                        # If expected specified, compare
+                        if expected_id is None or (matched_id == expected_id):
+                            self._finish(trace, "success")
+                            return True, "Verification success", matched_id
+                        else:
+                            self._finish(trace, "mismatch")
+                            return False, f"Verification matched ID {matched_id}, expected {expected_id}", matched_id
+                    if "VERIFICATION: ECHEC" in text:
+                        trace.mark_once("result")
+                        last_msg = "ECHEC"
+                        # keep polling for next attempt
+                        continue
+                    # ignore other lines
+                self._finish(trace, "timeout")
+                return False, f"Verification timeout ({last_msg})", None
+            except OSError as e:
+                self._drop_connection(e)
+                self._finish(trace, "io_error")
+                return False, f"Device I/O error: {e}", None
+
+    def _cancel_enrollment(self) -> None:
+        """Send 'C' so the sensor leaves enrollment mode. Caller owns the device slot."""
+        self._write_line("C")
+        # Whoever runs next (door mode included) has to set the mode again
+        self._mode = None
+        _ = self._read_line(timeout=CANCEL_ACK_WAIT)
+
+    # ---------------------- Continuous door mode ----------------------
+    def start_door_mode(self, on_result: Callable[[bool, Optional[int], str], None]) -> bool:
+        """Keep the sensor in 'V' and hand every verification line to on_result(success, matched_id, raw).
+
+        The reader holds the device (at the lowest priority) only for one short
+        read at a time, so enroll/verify calls interleave; the sensor is switched back to 'V' only
+        when another operation changed its mode. Returns False if already running.
+        """
+        with self._door_lock:
+            if self._door_running():
+                return False
+            stop = threading.Event()
+            self._door_stop = stop
+            self._door_thread = threading.Thread(
+                target=self._door_loop, args=(on_result, stop), name="arduino-door", daemon=True
+            )
+            self._door_thread.start()
+            return True
+
+    def stop_door_mode(self) -> bool:
+        with self._door_lock:
+            if not self._door_running():
+                return False
+            self._door_stop.set()
+            return True
+
+    def _door_running(self) -> bool:
+        stop = self._door_stop
+        return stop is not None and not stop.is_set()
+
+    def _door_loop(self, on_result: Callable[[bool, Optional[int], str], None], stop: threading.Event) -> None:
+        while not stop.is_set():
+            try:
+                connected, text = self._door_read()
+            except DeviceBusy:
+                connected, text = False, ""
+            if not connected:
+                stop.wait(DOOR_IDLE_WAIT)
+                continue
+            if stop.is_set():
+                # Stopped during the read: a newer run (if any) owns the results now
+                break
+            if text.startswith("VERIFICATION: SUCCES"):
+                serial_operations.inc(operation="door", outcome="success")
+                self._dispatch_door_result(on_result, True, _parse_matched_id(text), text)
+            elif "VERIFICATION: ECHEC" in text:
+                serial_operations.inc(operation="door", outcome="failure")
+                self._dispatch_door_result(on_result, False, None, text)
+            else:
+                # Let queued device calls take the device between reads
+                time.sleep(0)
+
+    def _door_read(self) -> Tuple[bool, str]:
+        """One short read in verification mode; returns (connected, upper-cased line)."""
+        with self._scheduler.slot("door"):
+            if not (self._ser and self._ser.is_open):
+                return False, ""
+            try:
+                if self._mode != "V":
+                    self._write_line("V")
+                    self._mode = "V"
+                return True, (self._read_line(timeout=DOOR_READ_SLICE) or "").upper()
+            except OSError as e:
+                self._drop_connection(e)
+                return False, ""
+
+    @staticmethod
+    def _dispatch_door_result(on_result, success: bool, matched_id: Optional[int], raw: str) -> None:
+        try:
+            on_result(success, matched_id, raw)
+        except Exception:
+            pass
 
     # Backward-compatible wrapper used by existing services for registration
     def capture_fingerprint(
@@ -192,8 +699,61 @@ class ArduinoManager:
         entity_id: int,
         max_retries: int = 3,
         per_try_timeout: float = 20.0,
+        deadline: Optional[float] = None,
     ) -> Tuple[bool, str]:
-        return self.enroll_fingerprint(entity_id=entity_id, max_retries=max_retries, per_try_timeout=per_try_timeout)
+        return self.enroll_fingerprint(
+            entity_id=entity_id, max_retries=max_retries, per_try_timeout=per_try_timeout, deadline=deadline
+        )
+
+
+class SensorPool:
+    """One manager per reader port, so several sensors run side by side.
+
+    The primary manager (the one /arduino/connect drives, and door mode) serves
+    its own port; any other port gets its own manager from `factory`, with its
+    own device queue. With `connect` set, a port is opened in the background on
+    first use (the request that asked for it is not held up; until the port is
+    ready its manager reports "Arduino not connected") and then kept up by the
+    manager's reconnect logic.
+    """
+
+    def __init__(self, primary, factory: Callable[[str], object], connect: bool = True) -> None:
+        self._primary = primary
+        self._factory = factory
+        self._connect = connect
+        self._lock = threading.Lock()
+        self._managers: Dict[str, object] = {}
+
+    def manager(self, port: str):
+        if port == getattr(self._primary, "target_port", None):
+            return self._primary
+        with self._lock:
+            manager = self._managers.get(port)
+            if manager is None:
+                manager = self._managers[port] = self._factory(port)
+        if self._connect:
+            status = manager.status()
+            if not status.get("connected") and not status.get("reconnecting"):
+                manager.connect_in_background(port)
+        return manager
+
+    def add(self, port: str, manager) -> None:
+        with self._lock:
+            self._managers[port] = manager
+
+    def clear(self) -> None:
+        with self._lock:
+            self._managers.clear()
+
 
+if Config.ARDUINO_MODE == "client":
+    from utils.device_rpc import ArduinoClient
 
-arduino_manager = ArduinoManager()
+    arduino_manager = ArduinoClient(Config.ARDUINO_DAEMON_SOCKET)
+    # The daemon owns every port: each client names the sensor it wants
+    sensor_pool = SensorPool(
+        arduino_manager, lambda port: ArduinoClient(Config.ARDUINO_DAEMON_SOCKET, sensor_port=port), connect=False
+    )
+else:
+    arduino_manager = ArduinoManager()
+    sensor_pool = SensorPool(arduino_manager, lambda port: ArduinoManager())
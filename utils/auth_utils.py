@@ -1,8 +1,8 @@
 from functools import wraps
-from typing import Callable
+from typing import Callable, Optional
 
 from flask import jsonify
-from flask_jwt_extended import get_jwt
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
 
 
 def roles_required(*roles: str) -> Callable:
@@ -27,3 +27,20 @@ def roles_required(*roles: str) -> Callable:
         return wrapper
 
     return decorator
+
+
+def check_roles(*roles: str) -> Optional[tuple]:
+    """
+    roles_required for one branch of a view whose other branches stay public.
+    Returns None if the caller holds a JWT with one of `roles`, else the 403
+    response to return; a missing or invalid token is a 401 as with @jwt_required().
+    Example:
+        denied = check_roles("admin", "kiosk")
+        if denied:
+            return denied
+    """
+    verify_jwt_in_request()
+    role = (get_jwt() or {}).get("role")
+    if roles and role not in roles:
+        return jsonify({"error": "Forbidden: insufficient role"}), 403
+    return None
@@ -3,3 +3,10 @@ from flask_sqlalchemy import SQLAlchemy
 # Global SQLAlchemy instance to be initialized with the Flask app
 
 db = SQLAlchemy()
+
+
+def init_db() -> None:
+    """Create tables that don't exist yet. Requires an application context."""
+    import models  # noqa: F401 - ensure models are registered
+
+    db.create_all()
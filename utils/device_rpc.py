@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from typing import Any, Callable, Dict, Generator, List, Optional, Tuple
+
+from utils.scheduler import DeviceBusy
+
+# Manager methods callable over RPC; tuple results are sent as JSON arrays
+RPC_METHODS = (
+    "list_ports",
+    "refresh_ports",
+    "connect",
+    "disconnect",
+    "status",
+    "metrics_snapshot",
+    "enroll_fingerprint",
+    "verify_fingerprint",
+    "capture_fingerprint",
+)
+
+
+class DeviceRPCError(RuntimeError):
+    pass
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "DeviceServer"
+
+    def handle(self) -> None:
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                self._reply({"error": "invalid JSON"})
+                continue
+            method = request.get("method")
+            params = request.get("params") or {}
+            if method == "subscribe":
+                self._stream_events()
+                return
+            if "deadline_in" in params:
+                # Deadlines cross the socket as seconds remaining and become monotonic again here
+                params["deadline"] = time.monotonic() + float(params.pop("deadline_in"))
+            if "sensor_port" in params:
+                # A call for another reader than the primary one
+                port = params.pop("sensor_port")
+                if self.server.route is None or method not in RPC_METHODS:
+                    self._reply({"id": request.get("id"), "error": f"cannot route '{method}' to sensor {port}"})
+                    continue
+                handler = getattr(self.server.route(port), method)
+            else:
+                handler = self.server.handlers.get(method)
+            if handler is None:
+                self._reply({"id": request.get("id"), "error": f"unknown method '{method}'"})
+                continue
+            try:
+                result = handler(**params)
+                self._reply({"id": request.get("id"), "result": result})
+            except DeviceBusy as e:
+                self._reply({"id": request.get("id"), "error": str(e), "retry_after": e.retry_after})
+            except Exception as e:
+                self._reply({"id": request.get("id"), "error": str(e)})
+
+    def _reply(self, message: dict) -> None:
+        self.wfile.write((json.dumps(message) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def _stream_events(self) -> None:
+        broker = self.server.broker
+        q = broker.subscribe()
+        try:
+            while True:
+                self._reply({"event": q.get()})
+        except OSError:
+            pass
+        finally:
+            broker.unsubscribe(q)
+
+
+class DeviceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Serves the device owner's manager to web workers over a Unix socket.
+
+    Protocol: one JSON object per line, `{"id", "method", "params"}` in and
+    `{"id", "result"}` / `{"id", "error"}` out. A `deadline_in` param (seconds
+    left) reaches the method as an absolute `deadline`; a `sensor_port` param runs
+    it on `route(port)` (utils.arduino.SensorPool.manager) instead. `subscribe` turns the
+    connection into a stream of `{"event": <SSE payload>}` lines.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        manager: Any,
+        broker: Any,
+        extra: Optional[Dict[str, Callable]] = None,
+        route: Optional[Callable[[str], Any]] = None,
+    ) -> None:
+        if os.path.exists(path):
+            os.unlink(path)
+        self.handlers: Dict[str, Callable] = {name: getattr(manager, name) for name in RPC_METHODS}
+        self.handlers.update(extra or {})
+        self.broker = broker
+        self.route = route
+        # Anyone who can connect can drive the sensor: the socket is owner-only from the start
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+        os.chmod(path, 0o600)
+
+
+def _deadline_param(deadline: Optional[float]) -> Dict[str, float]:
+    return {} if deadline is None else {"deadline_in": max(deadline - time.monotonic(), 0.0)}
+
+
+class ArduinoClient:
+    """Drop-in stand-in for ArduinoManager in web workers: every call goes to the device daemon."""
+
+    def __init__(self, path: str, connect_timeout: float = 2.0, sensor_port: Optional[str] = None) -> None:
+        self.path = path
+        # None: the daemon's primary manager; else the reader on that port
+        self.sensor_port = sensor_port
+        self._connect_timeout = connect_timeout
+        self._ids = 0
+        self._ids_lock = threading.Lock()
+
+    def _open(self) -> socket.socket:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self._connect_timeout)
+        try:
+            sock.connect(self.path)
+        except OSError as e:
+            sock.close()
+            raise DeviceRPCError(f"Device daemon unreachable at {self.path}: {e}") from e
+        # Device operations can legitimately run for minutes (enrollment)
+        sock.settimeout(None)
+        return sock
+
+    def _call(self, method: str, **params) -> Any:
+        with self._ids_lock:
+            self._ids += 1
+            call_id = self._ids
+        if self.sensor_port is not None:
+            params["sensor_port"] = self.sensor_port
+        sock = self._open()
+        try:
+            sock.sendall((json.dumps({"id": call_id, "method": method, "params": params}) + "\n").encode("utf-8"))
+            line = sock.makefile("rb").readline()
+        finally:
+            sock.close()
+        if not line:
+            raise DeviceRPCError("Device daemon closed the connection")
+        reply = json.loads(line)
+        if "retry_after" in reply:
+            raise DeviceBusy(reply["error"], reply["retry_after"])
+        if "error" in reply:
+            raise DeviceRPCError(reply["error"])
+        return reply.get("result")
+
+    def _call_or(self, method: str, fallback: Any, **params) -> Any:
+        """Like _call, but returns `fallback` when the daemon is unreachable."""
+        try:
+            return self._call(method, **params)
+        except DeviceRPCError:
+            return fallback
+
+    def _call_tuple(self, method: str, fallback: Tuple, **params) -> Tuple:
+        try:
+            return tuple(self._call(method, **params))
+        except DeviceRPCError as e:
+            return fallback[:1] + (str(e),) + fallback[2:]
+
+    # ---------------------- ArduinoManager interface ----------------------
+    def list_ports(self) -> List[dict]:
+        return self._call_or("list_ports", [])
+
+    def refresh_ports(self) -> List[dict]:
+        return self._call_or("refresh_ports", [])
+
+    def connect(self, port: str, baudrate: int = 9600, timeout: float = 2.0, ready_timeout: Optional[float] = None):
+        return self._call_tuple("connect", (False, ""), port=port, baudrate=baudrate, timeout=timeout,
+                                ready_timeout=ready_timeout)
+
+    def disconnect(self):
+        return self._call_tuple("disconnect", (False, ""))
+
+    def status(self) -> dict:
+        try:
+            return {**self._call("status"), "daemon": self.path}
+        except DeviceRPCError as e:
+            return {"connected": False, "port": None, "baudrate": None, "daemon": self.path, "error": str(e)}
+
+    def metrics_snapshot(self, limit: int = 50) -> dict:
+        return self._call_or("metrics_snapshot", {"phases": [], "polls": [], "recent": []}, limit=limit)
+
+    def enroll_fingerprint(self, entity_id: int, max_retries: int = 3, per_try_timeout: float = 20.0,
+                           deadline: Optional[float] = None):
+        return self._call_tuple("enroll_fingerprint", (False, ""), entity_id=entity_id, max_retries=max_retries,
+                                per_try_timeout=per_try_timeout, **_deadline_param(deadline))
+
+    def verify_fingerprint(self, expected_id: Optional[int] = None, per_try_timeout: float = 3.0, max_polls: int = 10,
+                           deadline: Optional[float] = None):
+        return self._call_tuple("verify_fingerprint", (False, "", None), expected_id=expected_id,
+                                per_try_timeout=per_try_timeout, max_polls=max_polls, **_deadline_param(deadline))
+
+    def capture_fingerprint(self, entity: str, entity_id: int, max_retries: int = 3, per_try_timeout: float = 20.0,
+                            deadline: Optional[float] = None):
+        return self._call_tuple("capture_fingerprint", (False, ""), entity=entity, entity_id=entity_id,
+                                max_retries=max_retries, per_try_timeout=per_try_timeout, **_deadline_param(deadline))
+
+    def start_door_mode(self, on_result: Optional[Callable] = None) -> bool:
+        # Door results are recorded by the daemon itself; on_result stays in-process only
+        return bool(self._call_or("start_door_mode", False))
+
+    def stop_door_mode(self) -> bool:
+        return bool(self._call_or("stop_door_mode", False))
+
+    def events(self) -> Generator[str, None, None]:
+        """Yield SSE payloads published inside the daemon."""
+        sock = self._open()
+        try:
+            sock.sendall(b'{"method": "subscribe"}\n')
+            for line in sock.makefile("rb"):
+                yield json.loads(line)["event"]
+        finally:
+            sock.close()
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from typing import Callable, List, Optional
+
+Deliver = Callable[[str], None]
+
+# A hub client that cannot take a frame within this many seconds is dropped (it reconnects)
+HUB_SEND_TIMEOUT = 1.0
+# First line the hub sends a client, once frames are being relayed to it (not JSON, so never delivered)
+HUB_ACK = b"registered\n"
+
+
+class LocalBackend:
+    """Single-process bus: published payloads go straight to this process's subscribers."""
+
+    def __init__(self) -> None:
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    def publish(self, payload: str) -> None:
+        if self._deliver is not None:
+            self._deliver(payload)
+
+
+class UnixSocketBackend:
+    """Fans events out to every process on one host through a Unix-socket hub.
+
+    The first process to take an flock on `<path>.lock` serves the hub; every
+    process (hub included) connects to it as a client. The hub relays each frame
+    to all clients, so the publisher receives its own events through the same path
+    as everyone else. If the hub process exits, its lock is released and the next
+    client to reconnect takes over. While no hub is reachable, events are still
+    delivered locally. start() returns once the hub has registered this client,
+    so nothing published after it is missed.
+    """
+
+    def __init__(self, path: str, connect_timeout: float = 1.0) -> None:
+        self.path = path
+        self._connect_timeout = connect_timeout
+        self._deliver: Optional[Deliver] = None
+        self._sock: Optional[socket.socket] = None
+        self._send_lock = threading.Lock()
+        self._connected = threading.Event()
+        self._lock_file = None
+        self._hub_clients: List[socket.socket] = []
+        self._hub_lock = threading.Lock()
+
+    # ---------------------- Client side ----------------------
+    def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        threading.Thread(target=self._client_loop, name="event-bus-client", daemon=True).start()
+        self._connected.wait(self._connect_timeout)
+
+    def publish(self, payload: str) -> None:
+        frame = (json.dumps(payload) + "\n").encode("utf-8")
+        with self._send_lock:
+            if self._sock is not None:
+                try:
+                    self._sock.sendall(frame)
+                    return
+                except OSError:
+                    self._drop()
+        if self._deliver is not None:
+            self._deliver(payload)
+
+    def _drop(self) -> None:
+        # Caller holds self._send_lock
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = None
+        self._connected.clear()
+
+    def _client_loop(self) -> None:
+        delay = 0.05
+        while True:
+            sock = self._connect()
+            if sock is None:
+                time.sleep(delay)
+                delay = min(delay * 2, 2.0)
+                continue
+            delay = 0.05
+            with self._send_lock:
+                self._sock = sock
+            try:
+                reader = sock.makefile("rb")
+                for line in reader:
+                    if line == HUB_ACK:
+                        self._connected.set()
+                        continue
+                    try:
+                        payload = json.loads(line)
+                    except ValueError:
+                        continue
+                    if self._deliver is not None:
+                        self._deliver(payload)
+            except OSError:
+                pass
+            with self._send_lock:
+                if self._sock is sock:
+                    self._drop()
+
+    def _connect(self) -> Optional[socket.socket]:
+        self._try_become_hub()
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            s.connect(self.path)
+            return s
+        except OSError:
+            s.close()
+            return None
+
+    # ---------------------- Hub side ----------------------
+    def _try_become_hub(self) -> None:
+        if self._lock_file is not None:
+            return
+        import fcntl
+
+        fh = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            fh.close()
+            return
+        self._lock_file = fh
+        # We hold the lock, so any existing socket file is stale
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(self.path)
+        server.listen(64)
+        threading.Thread(target=self._hub_accept, args=(server,), name="event-bus-hub", daemon=True).start()
+
+    def _hub_accept(self, server: socket.socket) -> None:
+        while True:
+            conn, _ = server.accept()
+            # Reads stay blocking (idle clients are normal); only sends are bounded
+            conn.setsockopt(
+                socket.SOL_SOCKET, socket.SO_SNDTIMEO, struct.pack("ll", int(HUB_SEND_TIMEOUT), int(HUB_SEND_TIMEOUT % 1 * 1e6))
+            )
+            with self._hub_lock:
+                self._hub_clients.append(conn)
+                # Under the lock, so the ack goes out before any broadcast to this client
+                try:
+                    conn.sendall(HUB_ACK)
+                except OSError:
+                    self._hub_clients.remove(conn)
+                    conn.close()
+                    continue
+            threading.Thread(target=self._hub_read, args=(conn,), name="event-bus-hub-conn", daemon=True).start()
+
+    def _hub_read(self, conn: socket.socket) -> None:
+        try:
+            for line in conn.makefile("rb"):
+                self._hub_broadcast(line)
+        except OSError:
+            pass
+        self._hub_remove(conn)
+
+    def _hub_broadcast(self, frame: bytes) -> None:
+        with self._hub_lock:
+            clients = list(self._hub_clients)
+        for client in clients:
+            try:
+                client.sendall(frame)
+            except OSError:
+                # Slow or dead client: drop it, it will reconnect
+                self._hub_remove(client)
+
+    def _hub_remove(self, conn: socket.socket) -> None:
+        with self._hub_lock:
+            if conn in self._hub_clients:
+                self._hub_clients.remove(conn)
+        try:
+            conn.close()
+        except OSError:
+            pass
+
+
+class RedisBackend:
+    """Network bus over Redis pub/sub for workers spread across hosts (requires the `redis` package)."""
+
+    def __init__(self, url: str, channel: str = "fac:sse") -> None:
+        self.url = url
+        self.channel = channel
+        self._client = None
+        self._deliver: Optional[Deliver] = None
+
+    def start(self, deliver: Deliver) -> None:
+        try:
+            import redis
+        except ImportError as e:
+            raise RuntimeError("EVENT_BUS_URL uses redis:// but the 'redis' package is not installed") from e
+        self._deliver = deliver
+        self._client = redis.Redis.from_url(self.url)
+        threading.Thread(target=self._listen, name="event-bus-redis", daemon=True).start()
+
+    def publish(self, payload: str) -> None:
+        try:
+            self._client.publish(self.channel, payload)
+        except Exception:
+            # Broker unreachable: at least keep this process's dashboards live
+            self._deliver(payload)
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                for message in pubsub.listen():
+                    data = message.get("data")
+                    if isinstance(data, bytes):
+                        data = data.decode("utf-8")
+                    self._deliver(data)
+            except Exception:
+                time.sleep(1.0)
+
+
+def backend_from_url(url: Optional[str]):
+    """'local' (default), 'unix:///path/to/hub.sock' or 'redis://host:6379/0'."""
+    url = (url or "local").strip()
+    if url in {"", "local", "memory"}:
+        return LocalBackend()
+    if url.startswith("unix://"):
+        return UnixSocketBackend(url[len("unix://"):])
+    if url.startswith(("redis://", "rediss://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported EVENT_BUS_URL: {url}")
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app
+
+from utils.db import db
+from utils.metrics import metrics
+
+fragment_lookups = metrics.counter(
+    "fragment_cache_lookups_total", "Row JSON fragments served from cache (hit) or re-encoded (miss).", ("model", "result")
+)
+
+# SQLite allows 999 bound parameters per statement
+_IN_CHUNK = 500
+
+
+class FragmentCache:
+    """Bounded LRU of JSON-encoded rows keyed by (model, id), valid for one updated_at."""
+
+    def __init__(self, max_entries: int = 50000) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[datetime, bytes]]" = OrderedDict()
+
+    def get(self, key: Tuple[str, int], updated_at: datetime) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != updated_at:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Tuple[str, int], updated_at: datetime, fragment: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (updated_at, fragment)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+fragment_cache = FragmentCache()
+metrics.gauge("fragment_cache_entries", "Row JSON fragments held in the fragment cache.", callback=lambda: len(fragment_cache))
+
+
+def encode_rows(model, order_by) -> bytes:
+    """JSON array of `model.to_dict()` for every row, assembled from cached per-row fragments.
+
+    Only (id, updated_at) is read for every row; full rows are loaded and
+    re-encoded only for ids whose fragment is missing or older than updated_at.
+    The bytes match what jsonify() produces for the same list outside debug mode.
+    """
+    name = model.__tablename__
+    versions: List[Tuple[int, datetime]] = db.session.query(model.id, model.updated_at).order_by(order_by).all()
+    fragments: Dict[int, bytes] = {}
+    missing: List[int] = []
+    for row_id, updated_at in versions:
+        fragment = fragment_cache.get((name, row_id), updated_at)
+        if fragment is None:
+            missing.append(row_id)
+        else:
+            fragments[row_id] = fragment
+    if fragments:
+        fragment_lookups.inc(len(fragments), model=name, result="hit")
+    if missing:
+        fragment_lookups.inc(len(missing), model=name, result="miss")
+        dumps = current_app.json.dumps
+        for start in range(0, len(missing), _IN_CHUNK):
+            for row in model.query.filter(model.id.in_(missing[start:start + _IN_CHUNK])).all():
+                fragment = dumps(row.to_dict(), separators=(",", ":")).encode("utf-8")
+                fragment_cache.put((name, row.id), row.updated_at, fragment)
+                fragments[row.id] = fragment
+    # A row deleted between the two queries simply drops out
+    return b"[" + b",".join(fragments[row_id] for row_id, _ in versions if row_id in fragments) + b"]\n"
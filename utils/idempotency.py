@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Optional, Tuple
+
+from flask import Response, current_app, jsonify, make_response, request
+
+from utils.metrics import metrics
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+
+idempotent_requests = metrics.counter(
+    "idempotent_requests_total",
+    "Requests carrying an Idempotency-Key, by result (executed, replayed, joined, conflict, in_progress).",
+    ("endpoint", "result"),
+)
+
+
+class _Entry:
+    __slots__ = ("fingerprint", "done", "expires", "body", "status", "headers")
+
+    def __init__(self, fingerprint: str) -> None:
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.expires: Optional[float] = None
+        self.body: Optional[bytes] = None
+        self.status = 0
+        self.headers: list = []
+
+
+class IdempotencyStore:
+    """Bounded LRU of in-flight and completed responses keyed by (endpoint, Idempotency-Key).
+
+    The first request with a key claims it and runs; duplicates wait for that run
+    and get its response. Completed entries live for `ttl` seconds. A run that
+    raises or answers 5xx releases the key so a retry executes again.
+    """
+
+    def __init__(self, max_entries: int = 10000, ttl: float = 3600.0) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+
+    def configure(self, max_entries: int, ttl: float) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.ttl = ttl
+
+    def claim(self, key: tuple, fingerprint: str) -> Tuple[_Entry, bool]:
+        """(entry, True) if the caller must run the request, else the existing entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires is not None and entry.expires <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, False
+            entry = _Entry(fingerprint)
+            self._entries[key] = entry
+            # Only completed entries are evicted; in-flight ones must stay joinable
+            for old_key in list(self._entries):
+                if len(self._entries) <= self.max_entries:
+                    break
+                if self._entries[old_key].done.is_set():
+                    del self._entries[old_key]
+            return entry, True
+
+    def complete(self, key: tuple, entry: _Entry, response: Optional[Response]) -> None:
+        with self._lock:
+            if response is None or response.status_code >= 500:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            else:
+                entry.body = response.get_data()
+                entry.status = response.status_code
+                entry.headers = [(k, v) for k, v in response.headers.items() if k.lower() != "content-length"]
+                entry.expires = time.monotonic() + self.ttl
+        entry.done.set()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+idempotency_store = IdempotencyStore()
+metrics.gauge("idempotency_keys", "Idempotency keys held (in flight or completed).", callback=lambda: len(idempotency_store))
+
+
+def _replay(entry: _Entry) -> Response:
+    response = Response(entry.body, status=entry.status, headers=entry.headers)
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view: Callable) -> Callable:
+    """Run a POST view at most once per Idempotency-Key.
+
+    Without the header the view runs as usual. A duplicate that arrives while
+    the first request is still running waits for it (up to IDEMPOTENCY_WAIT
+    seconds, then 409) and returns the same response; later duplicates get the
+    stored response. Reusing a key with a different body is rejected with 422.
+    Replays carry `Idempotent-Replayed: true`.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        raw_key = (request.headers.get(IDEMPOTENCY_HEADER) or "").strip()
+        if not raw_key:
+            return view(*args, **kwargs)
+        if len(raw_key) > MAX_KEY_LENGTH:
+            return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be at most {MAX_KEY_LENGTH} characters"}), 400
+        endpoint = request.endpoint
+        key = (endpoint, raw_key)
+        fingerprint = hashlib.sha256(request.get_data() + request.query_string).hexdigest()
+
+        while True:
+            entry, owner = idempotency_store.claim(key, fingerprint)
+            if owner:
+                break
+            if entry.fingerprint != fingerprint:
+                idempotent_requests.inc(endpoint=endpoint, result="conflict")
+                return jsonify({"error": f"{IDEMPOTENCY_HEADER} was already used with a different request"}), 422
+            joined = not entry.done.is_set()
+            if joined and not entry.done.wait(current_app.config.get("IDEMPOTENCY_WAIT", 180.0)):
+                idempotent_requests.inc(endpoint=endpoint, result="in_progress")
+                return jsonify({"error": "A request with this key is still in progress"}), 409, {"Retry-After": "1"}
+            if entry.body is None:
+                # The first run failed and released the key: run it here instead
+                continue
+            idempotent_requests.inc(endpoint=endpoint, result="joined" if joined else "replayed")
+            return _replay(entry)
+
+        response = None
+        try:
+            response = make_response(view(*args, **kwargs))
+        finally:
+            idempotency_store.complete(key, entry, response)
+        idempotent_requests.inc(endpoint=endpoint, result="executed")
+        return response
+
+    return wrapper
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from utils.sse import sse_broker
+
+# name -> (window seconds, bucket seconds); counts are exact to within one bucket
+WINDOWS: Dict[str, Tuple[int, int]] = {
+    "5m": (300, 5),
+    "1h": (3600, 60),
+    "1d": (86400, 900),
+}
+
+Key = Tuple[str, str, str]  # (entity_type, status, device)
+
+
+class _Ring:
+    """Fixed number of time buckets; adding is O(1), stale buckets are recycled in place."""
+
+    __slots__ = ("width", "counts", "bucket_ids")
+
+    def __init__(self, window: int, width: int) -> None:
+        self.width = width
+        n = window // width
+        self.counts = [0] * n
+        self.bucket_ids = [-1] * n
+
+    def add(self, ts: float, n: int = 1) -> None:
+        bucket = int(ts // self.width)
+        slot = bucket % len(self.counts)
+        if self.bucket_ids[slot] != bucket:
+            if self.bucket_ids[slot] > bucket:
+                return  # older than the window
+            self.bucket_ids[slot] = bucket
+            self.counts[slot] = 0
+        self.counts[slot] += n
+
+    def total(self, now: float) -> int:
+        oldest = int(now // self.width) - len(self.counts) + 1
+        return sum(c for c, b in zip(self.counts, self.bucket_ids) if b >= oldest)
+
+
+class LiveStats:
+    """Sliding-window access counters per (entity_type, status, device).
+
+    `record` is called for every access log this process writes; the first call
+    (or `seed`) loads the last day of logs from the database so counts survive a
+    restart. Recorded counts cover logs written through this process only, so with
+    a shared event bus (several workers) `sync` reloads them from the database.
+    """
+
+    def __init__(self, windows: Optional[Dict[str, Tuple[int, int]]] = None, clock: Callable[[], float] = time.time) -> None:
+        self.windows = windows or WINDOWS
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._rings: Dict[Key, Dict[str, _Ring]] = {}
+        self._seeded = False
+        self._pusher: Optional[threading.Thread] = None
+
+    def _add(self, key: Key, ts: float) -> None:
+        # Caller holds self._lock
+        rings = self._rings.get(key)
+        if rings is None:
+            rings = self._rings[key] = {name: _Ring(*spec) for name, spec in self.windows.items()}
+        for ring in rings.values():
+            ring.add(ts)
+
+    def record(self, entity_type: str, status: str, device: Optional[str] = None, ts: Optional[float] = None) -> None:
+        with self._lock:
+            self._add((entity_type, status, device or "none"), self._clock() if ts is None else ts)
+
+    def seed(self, rows: Optional[Iterable[Tuple[str, str, Optional[str], datetime]]] = None) -> None:
+        """Load (entity_type, status, device, created_at) rows; by default the last day of AccessLog.
+
+        Runs once. Call it before committing the first log this process writes so
+        that log is not counted twice.
+        """
+        with self._lock:
+            if self._seeded:
+                return
+            self._seeded = True
+            if rows is None:
+                rows = self._load_recent()
+            for entity_type, status, device, created_at in rows:
+                # created_at is naive UTC (datetime.utcnow)
+                ts = (created_at - datetime(1970, 1, 1)).total_seconds()
+                self._add((entity_type, status, device or "none"), ts)
+
+    def refresh(self) -> None:
+        """Replace the counters with the last day of AccessLog, whichever process wrote it."""
+        rows = self._load_recent()
+        with self._lock:
+            self._rings.clear()
+            self._seeded = False
+        self.seed(rows)
+
+    def sync(self) -> None:
+        """Make the counters current before reading them: seed once in a single process,
+        reload from the database when other workers write logs too."""
+        if sse_broker.is_shared():
+            self.refresh()
+        else:
+            self.seed()
+
+    def _load_recent(self) -> List[Tuple[str, str, Optional[str], datetime]]:
+        from sqlalchemy.exc import SQLAlchemyError
+
+        from models import AccessLog
+        from utils.db import db
+
+        horizon = max(window for window, _ in self.windows.values())
+        since = datetime.utcnow() - timedelta(seconds=horizon)
+        try:
+            return (
+                db.session.query(AccessLog.entity_type, AccessLog.status, AccessLog.device, AccessLog.created_at)
+                .filter(AccessLog.created_at >= since)
+                .all()
+            )
+        except SQLAlchemyError:
+            # Schema not created yet (init-db pending)
+            db.session.rollback()
+            return []
+
+    def snapshot(self) -> dict:
+        """Counts per window: totals by status, and the same split by entity type and device."""
+        now = self._clock()
+        with self._lock:
+            items = [(key, {name: ring.total(now) for name, ring in rings.items()}) for key, rings in self._rings.items()]
+        out = {}
+        for name in self.windows:
+            window = {"total": {}, "by_entity_type": {}, "by_device": {}}
+            for (entity_type, status, device), counts in items:
+                count = counts[name]
+                if not count:
+                    continue
+                window["total"][status] = window["total"].get(status, 0) + count
+                per_type = window["by_entity_type"].setdefault(entity_type, {})
+                per_type[status] = per_type.get(status, 0) + count
+                per_device = window["by_device"].setdefault(device, {})
+                per_device[status] = per_device.get(status, 0) + count
+            out[name] = window
+        return {"generated_at": datetime.utcnow().isoformat(), "windows": out}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._rings.clear()
+            self._seeded = False
+
+    def start_push(self, app, interval: float) -> None:
+        """Push a `live_stats` SSE event every `interval` seconds to this process's stream subscribers.
+
+        Each worker pushes to its own subscribers only (never over the bus), so
+        dashboards do not receive one partial snapshot per worker.
+        """
+        if interval <= 0 or (self._pusher is not None and self._pusher.is_alive()):
+            return
+
+        def loop() -> None:
+            while True:
+                time.sleep(interval)
+                if sse_broker.subscriber_count() == 0:
+                    continue
+                with app.app_context():
+                    self.sync()
+                sse_broker.publish_local("live_stats", self.snapshot())
+
+        self._pusher = threading.Thread(target=loop, name="live-stats-push", daemon=True)
+        self._pusher.start()
+
+
+live_stats = LiveStats()
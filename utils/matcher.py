@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from utils.metrics import metrics
+
+match_seconds = metrics.histogram(
+    "template_match_seconds",
+    "Software template matching time per probe, by mode (identify = 1:N, verify = 1:1).",
+    ("mode",),
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25),
+)
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+class TemplateMatcher:
+    """In-memory 1:N matcher over fixed-length fingerprint feature templates.
+
+    Every stored template is one row of a contiguous float32 matrix, mean-centred
+    and L2-normalised, with rows grouped by person. Scoring a probe against all
+    of them is then a single matrix-vector product (normalised correlation,
+    -1..1), reduced to the best score per person with `maximum.reduceat`.
+    Requires the optional `numpy` package; `available()` is False without it.
+    """
+
+    def __init__(self, template_bytes: int = 512) -> None:
+        self.template_bytes = template_bytes
+        self._lock = threading.Lock()
+        self._matrix = None  # (templates, template_bytes) float32
+        self._owners = None  # person id per row, ascending
+        self._people = None  # distinct person ids, ascending
+        self._starts = None  # first row of each person in _matrix
+        self.generation: Optional[tuple] = None
+
+    @staticmethod
+    def available() -> bool:
+        return _numpy() is not None
+
+    def configure(self, template_bytes: int) -> None:
+        with self._lock:
+            changed = template_bytes != self.template_bytes
+            self.template_bytes = template_bytes
+        if changed:
+            self.clear()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrix = self._owners = self._people = self._starts = None
+            self.generation = None
+
+    def _normalise(self, np, vectors):
+        vectors = vectors - vectors.mean(axis=-1, keepdims=True)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        # A flat template carries no ridge information and matches nothing
+        return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+    def _probe(self, np, template: bytes):
+        if len(template) != self.template_bytes:
+            raise ValueError(f"template must be {self.template_bytes} bytes, got {len(template)}")
+        return self._normalise(np, np.frombuffer(template, dtype=np.uint8).astype(np.float32))
+
+    def load(self, rows: Iterable[Tuple[int, bytes]], generation: Optional[tuple] = None) -> int:
+        """Replace the enrolled set with (person_id, template) rows; wrong-sized templates are skipped."""
+        np = _numpy()
+        rows = sorted((int(person_id), data) for person_id, data in rows if len(data) == self.template_bytes)
+        owners = np.fromiter((person_id for person_id, _ in rows), dtype=np.int64, count=len(rows))
+        raw = np.frombuffer(b"".join(data for _, data in rows), dtype=np.uint8)
+        matrix = self._normalise(np, raw.reshape(len(rows), self.template_bytes).astype(np.float32))
+        people, starts = np.unique(owners, return_index=True)
+        with self._lock:
+            self._matrix = np.ascontiguousarray(matrix)
+            self._owners, self._people, self._starts = owners, people, starts
+            self.generation = generation
+        return len(rows)
+
+    def identify(self, template: bytes, top_k: int = 5) -> List[Tuple[int, float]]:
+        """Best (person_id, score) pairs against every enrolled person, highest first."""
+        np = _numpy()
+        probe = self._probe(np, template)
+        started = time.perf_counter()
+        with self._lock:
+            if self._matrix is None or not len(self._matrix):
+                return []
+            per_person = np.maximum.reduceat(self._matrix @ probe, self._starts)
+            k = max(1, min(top_k, len(per_person)))
+            best = np.argpartition(-per_person, k - 1)[:k]
+            best = best[np.argsort(-per_person[best])]
+            result = [(int(self._people[i]), float(per_person[i])) for i in best]
+        match_seconds.observe(time.perf_counter() - started, mode="identify")
+        return result
+
+    def verify(self, person_id: int, template: bytes) -> Optional[float]:
+        """Best score against one person's templates; None if they have none."""
+        np = _numpy()
+        probe = self._probe(np, template)
+        started = time.perf_counter()
+        with self._lock:
+            if self._owners is None:
+                return None
+            lo, hi = np.searchsorted(self._owners, [person_id, person_id + 1])
+            if lo == hi:
+                return None
+            score = float((self._matrix[lo:hi] @ probe).max())
+        match_seconds.observe(time.perf_counter() - started, mode="verify")
+        return score
+
+    def __len__(self) -> int:
+        return 0 if self._matrix is None else len(self._matrix)
+
+
+template_matcher = TemplateMatcher()
+metrics.gauge("template_matcher_templates", "Templates held by the software matcher.", callback=lambda: len(template_matcher))
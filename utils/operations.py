@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from flask import Flask, current_app, jsonify, request
+
+from utils.scheduler import DeviceBusy
+from utils.sse import sse_broker
+
+
+def wants_async(data: Optional[dict] = None) -> bool:
+    """True if the client asked for 202 + operation id (Prefer: respond-async, ?async=1 or {"async": true})."""
+    if "respond-async" in (request.headers.get("Prefer") or "").lower():
+        return True
+    if (request.args.get("async") or "").lower() in {"1", "true", "yes"}:
+        return True
+    return bool((data or {}).get("async"))
+
+
+def request_deadline() -> Optional[float]:
+    """Absolute time.monotonic() after which the client stops waiting for this request.
+
+    Taken from the X-Request-Timeout header (seconds), else DEVICE_REQUEST_TIMEOUT;
+    None when neither is set. Pass it to device calls made while the client waits,
+    and to work handed to the operation pool: the budget runs from the request
+    that submitted it, so a queued operation does not outlive it.
+    """
+    raw = request.headers.get(current_app.config.get("REQUEST_TIMEOUT_HEADER", "X-Request-Timeout"))
+    try:
+        seconds = float(raw) if raw else float(current_app.config.get("DEVICE_REQUEST_TIMEOUT") or 0)
+    except ValueError:
+        seconds = 0.0
+    return time.monotonic() + seconds if seconds > 0 else None
+
+
+def accepted(op: dict):
+    """202 response pointing at the operation's long-poll URL."""
+    status_url = f"/operations/{op['id']}"
+    body = {"operationId": op["id"], "status": op["status"], "statusUrl": status_url}
+    return jsonify(body), 202, {"Location": status_url}
+
+
+class _Operation:
+    def __init__(self, kind: str) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = "pending"  # pending, running, done, error
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.utcnow()
+        self.finished_at: Optional[datetime] = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
+
+
+class OperationManager:
+    """Runs slow device work off the request thread.
+
+    submit() returns immediately with an operation id. The result is published as
+    an 'operation' SSE event and can be fetched (or long-polled) by id. Finished
+    operations are kept in a bounded, insertion-ordered store; pending and running
+    ones are never evicted. Once `max_pending` operations are unfinished, submit()
+    raises DeviceBusy (503 + Retry-After) instead of queueing more.
+
+    Operations live in this process only: ask the worker that accepted one for it.
+    """
+
+    def __init__(self, max_workers: int = 4, max_operations: int = 1000, max_pending: int = 64) -> None:
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = max_workers
+        self._max_operations = max_operations
+        self._max_pending = max_pending
+        self._lock = threading.Lock()
+        self._operations: "OrderedDict[str, _Operation]" = OrderedDict()
+        self._unfinished = 0
+        # Exponentially weighted mean run time, for Retry-After
+        self._avg_run = 1.0
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="device-op")
+            return self._executor
+
+    def submit(self, kind: str, fn: Callable[..., Any], *args, app: Optional[Flask] = None, **kwargs) -> dict:
+        op = _Operation(kind)
+        with self._lock:
+            if self._unfinished >= self._max_pending:
+                retry_after = max(1.0, math.ceil(self._avg_run * self._unfinished / self._max_workers))
+                raise DeviceBusy("Too many operations in progress", retry_after)
+            self._unfinished += 1
+            self._operations[op.id] = op
+            self._evict()
+        self._pool().submit(self._run, op, fn, app, args, kwargs)
+        return op.to_dict()
+
+    def _evict(self) -> None:
+        # Caller holds self._lock; oldest finished operations go first
+        excess = len(self._operations) - self._max_operations
+        if excess <= 0:
+            return
+        for op_id in [op.id for op in self._operations.values() if op.done.is_set()][:excess]:
+            del self._operations[op_id]
+
+    def _run(self, op: _Operation, fn: Callable[..., Any], app: Optional[Flask], args, kwargs) -> None:
+        op.status = "running"
+        started = time.monotonic()
+        try:
+            if app is not None:
+                with app.app_context():
+                    op.result = fn(*args, **kwargs)
+            else:
+                op.result = fn(*args, **kwargs)
+            op.status = "done"
+        except Exception as e:
+            op.status = "error"
+            op.error = str(e)
+        op.finished_at = datetime.utcnow()
+        with self._lock:
+            self._unfinished -= 1
+            self._avg_run = 0.8 * self._avg_run + 0.2 * (time.monotonic() - started)
+        op.done.set()
+        sse_broker.publish("operation", op.to_dict())
+
+    def get(self, op_id: str, wait: float = 0.0) -> Optional[dict]:
+        with self._lock:
+            op = self._operations.get(op_id)
+        if op is None:
+            return None
+        if wait > 0:
+            op.done.wait(wait)
+        return op.to_dict()
+
+
+operations = OperationManager()
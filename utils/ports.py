@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+
+from utils.sse import sse_broker
+
+# Paths whose modification time changes when serial devices are plugged/unplugged (Linux).
+WATCH_PATHS: Tuple[str, ...] = ("/dev", "/dev/serial/by-id", "/sys/class/tty")
+
+
+def _watch_signature(paths: Tuple[str, ...]) -> Tuple[int, ...]:
+    sig = []
+    for path in paths:
+        try:
+            sig.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            sig.append(0)
+    return tuple(sig)
+
+
+class PortInventory:
+    """Cached serial port list.
+
+    Listing is a memory read. The cache is rescanned when it is older than `ttl`,
+    when `refresh()` is called, or when the background watcher sees the device
+    directories change (hot-plug). Every change in the set of devices is published
+    as a `ports` SSE event and passed to registered listeners.
+    """
+
+    def __init__(
+        self,
+        scanner: Callable[[], List[dict]],
+        ttl: float = 30.0,
+        watch_interval: float = 1.0,
+        watch_paths: Tuple[str, ...] = WATCH_PATHS,
+    ) -> None:
+        self._scanner = scanner
+        self._ttl = ttl
+        self._watch_interval = watch_interval
+        self._watch_paths = tuple(p for p in watch_paths if os.path.exists(p))
+        self._lock = threading.Lock()
+        self._ports: List[dict] = []
+        self._scanned_at: Optional[float] = None
+        self._listeners: List[Callable[[List[dict], List[dict]], None]] = []
+        self._watcher: Optional[threading.Thread] = None
+        self.scans = 0
+
+    def add_listener(self, fn: Callable[[List[dict], List[dict]], None]) -> None:
+        """fn(added, removed) is called after each rescan that changed the device set."""
+        self._listeners.append(fn)
+
+    def list(self) -> List[dict]:
+        self.watch()
+        with self._lock:
+            fresh = self._scanned_at is not None and time.monotonic() - self._scanned_at < self._ttl
+            if fresh:
+                return list(self._ports)
+        return self.refresh()
+
+    def refresh(self) -> List[dict]:
+        ports = self._scanner()
+        with self._lock:
+            before = {p["device"]: p for p in self._ports}
+            self._ports = ports
+            self._scanned_at = time.monotonic()
+            self.scans += 1
+            first_scan = self.scans == 1
+        after = {p["device"]: p for p in ports}
+        added = [after[d] for d in after.keys() - before.keys()]
+        removed = [before[d] for d in before.keys() - after.keys()]
+        if (added or removed) and not first_scan:
+            sse_broker.publish("ports", {"added": added, "removed": removed, "ports": ports})
+            for fn in list(self._listeners):
+                try:
+                    fn(added, removed)
+                except Exception:
+                    pass
+        return list(ports)
+
+    def watch(self) -> None:
+        """Start the hot-plug watcher thread if it isn't running yet."""
+        if self._watcher is not None or not self._watch_paths or self._watch_interval <= 0:
+            return
+        with self._lock:
+            if self._watcher is not None:
+                return
+            self._watcher = threading.Thread(target=self._watch, name="port-watcher", daemon=True)
+            self._watcher.start()
+
+    def _watch(self) -> None:
+        last = _watch_signature(self._watch_paths)
+        while True:
+            time.sleep(self._watch_interval)
+            current = _watch_signature(self._watch_paths)
+            if current != last:
+                last = current
+                try:
+                    self.refresh()
+                except Exception:
+                    pass
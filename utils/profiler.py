@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import os
+import pstats
+import random
+import re
+import time
+from datetime import datetime
+from typing import List, Optional
+
+from flask import Flask, current_app, g, request
+from flask_jwt_extended import get_jwt, verify_jwt_in_request
+
+# Max SQL statements kept per request for slow-request reports
+MAX_CAPTURED_STATEMENTS = 500
+
+
+def _header_requested_by_admin() -> bool:
+    header = current_app.config.get("PROFILE_HEADER", "X-Profile")
+    if request.headers.get(header, "").strip().lower() not in {"1", "true", "yes"}:
+        return False
+    try:
+        verify_jwt_in_request(optional=True)
+        return (get_jwt() or {}).get("role") == "admin"
+    except Exception:
+        return False
+
+
+def _profile_reason() -> Optional[str]:
+    if _header_requested_by_admin():
+        return "header"
+    rate = float(current_app.config.get("PROFILE_SAMPLE_RATE") or 0)
+    if rate > 0 and random.random() < rate:
+        return "sampled"
+    return None
+
+
+def _safe_name(path: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", path).strip("_")[:60] or "root"
+
+
+def _prune(directory: str, keep: int) -> None:
+    try:
+        entries = [os.path.join(directory, n) for n in os.listdir(directory) if n.endswith(".txt")]
+    except FileNotFoundError:
+        return
+    if len(entries) <= keep:
+        return
+    entries.sort(key=os.path.getmtime)
+    for path in entries[: len(entries) - keep]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _write_report(
+    reason: str,
+    elapsed: float,
+    status: int,
+    statements: List[tuple],
+    profiler: Optional[cProfile.Profile],
+) -> str:
+    directory = current_app.config.get("PROFILE_DIR") or "profiles"
+    os.makedirs(directory, exist_ok=True)
+    stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
+    filename = f"{stamp}_{request.method}_{_safe_name(request.path)}_{int(elapsed * 1000)}ms.txt"
+    path = os.path.join(directory, filename)
+
+    out = io.StringIO()
+    out.write(f"{request.method} {request.full_path.rstrip('?')}\n")
+    out.write(f"status: {status}\nduration_ms: {elapsed * 1000:.2f}\nreason: {reason}\n")
+    out.write(f"sql_statements: {len(statements)} ({sum(t for _, t in statements) * 1000:.2f} ms)\n\n")
+    for statement, took in statements:
+        out.write(f"[{took * 1000:8.2f} ms] {' '.join(statement.split())}\n")
+    if profiler is not None:
+        out.write("\n")
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+
+    with open(path, "w", encoding="utf-8") as fh:
+        fh.write(out.getvalue())
+    _prune(directory, int(current_app.config.get("PROFILE_MAX_REPORTS") or 50))
+    return path
+
+
+def record_statement(statement: str, elapsed: float) -> None:
+    """Called from the SQL hooks while a request is active."""
+    statements = g.get("_profile_statements")
+    if statements is not None and len(statements) < MAX_CAPTURED_STATEMENTS:
+        statements.append((statement, elapsed))
+
+
+def init_profiler(app: Flask) -> None:
+    """Per-request cProfile (admin header or sampling) and automatic slow-request reports."""
+
+    @app.before_request
+    def _profile_before():
+        reason = _profile_reason()
+        slow_ms = float(current_app.config.get("PROFILE_SLOW_MS") or 0)
+        if reason is None and slow_ms <= 0:
+            return
+        g._profile_reason = reason
+        g._profile_statements = []
+        g._profile_start = time.perf_counter()
+        if reason is not None:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Python 3.12+: only one profiler per process; another request already has it.
+                # The report still gets timing and SQL, just no call profile.
+                return
+            g._profiler = profiler
+
+    @app.after_request
+    def _profile_after(response):
+        start = g.pop("_profile_start", None)
+        if start is None:
+            return response
+        profiler = g.pop("_profiler", None)
+        if profiler is not None:
+            profiler.disable()
+        elapsed = time.perf_counter() - start
+        reason = g.pop("_profile_reason", None)
+        slow_ms = float(current_app.config.get("PROFILE_SLOW_MS") or 0)
+        if reason is None and slow_ms > 0 and elapsed * 1000 >= slow_ms:
+            reason = "slow"
+        statements = g.pop("_profile_statements", [])
+        if reason is not None:
+            try:
+                path = _write_report(reason, elapsed, response.status_code, statements, profiler)
+                response.headers["X-Profile-Report"] = os.path.basename(path)
+            except OSError:
+                pass
+        return response
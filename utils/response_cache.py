@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from flask import Response, current_app, make_response, request
+
+from utils.metrics import metrics
+
+cache_requests = metrics.counter(
+    "response_cache_requests_total", "Cached GET endpoints by result (hit, miss, stale).", ("endpoint", "result")
+)
+
+
+class Generations:
+    """Per-dataset change counters. Writers bump after commit; cache entries remember
+    the counters they were built under and are stale as soon as one has moved."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: Dict[str, int] = {}
+
+    def bump(self, *names: str) -> None:
+        with self._lock:
+            for name in names:
+                self._values[name] = self._values.get(name, 0) + 1
+
+    def snapshot(self, names: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._values.get(name, 0) for name in names)
+
+
+class _Entry:
+    __slots__ = ("generations", "expires", "body", "status", "headers")
+
+    def __init__(self, generations, expires, body, status, headers) -> None:
+        self.generations = generations
+        self.expires = expires
+        self.body = body
+        self.status = status
+        self.headers = headers
+
+
+class ResponseCache:
+    """Size-bounded LRU of encoded response bodies (entry count and total bytes)."""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 32 * 1024 * 1024) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    def configure(self, max_entries: int, max_bytes: int) -> None:
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self._evict()
+
+    def get(self, key: tuple, generations: Tuple[int, ...]) -> Tuple[Optional[_Entry], str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None, "miss"
+            if entry.generations != generations or (entry.expires is not None and entry.expires <= time.monotonic()):
+                self._drop(key)
+                return None, "stale"
+            self._entries.move_to_end(key)
+            return entry, "hit"
+
+    def put(self, key: tuple, entry: _Entry) -> None:
+        if len(entry.body) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = entry
+            self._bytes += len(entry.body)
+            self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _drop(self, key: tuple) -> None:
+        # Caller holds self._lock
+        self._bytes -= len(self._entries.pop(key).body)
+
+    def _evict(self) -> None:
+        # Caller holds self._lock
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= len(entry.body)
+            self.evictions += 1
+
+    def entry_count(self) -> int:
+        return len(self._entries)
+
+    def size_bytes(self) -> int:
+        return self._bytes
+
+
+generations = Generations()
+response_cache = ResponseCache()
+
+metrics.gauge("response_cache_entries", "Responses held in the response cache.", callback=response_cache.entry_count)
+metrics.gauge("response_cache_bytes", "Encoded bytes held in the response cache.", callback=response_cache.size_bytes)
+metrics.gauge(
+    "response_cache_evictions_total", "Responses evicted to stay within the size bounds.",
+    callback=lambda: response_cache.evictions,
+)
+
+
+def cached_response(*datasets: str, ttl: Optional[float] = None) -> Callable:
+    """Serve a GET view from the response cache.
+
+    The key is the endpoint, its sorted query parameters and the Accept header.
+    An entry is reused until one of `datasets` has its generation bumped, or
+    `ttl` seconds pass (for time-relative queries such as ?period=day). Put it
+    below the auth decorators so access checks still run on every request.
+    """
+
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if not current_app.config.get("RESPONSE_CACHE_ENABLED", False):
+                return view(*args, **kwargs)
+            key = (
+                request.endpoint,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+                request.headers.get("Accept", ""),
+            )
+            # Read the generations before the view queries: a write committing
+            # meanwhile bumps them, so the entry stored below is already stale.
+            current = generations.snapshot(datasets)
+            entry, result = response_cache.get(key, current)
+            cache_requests.inc(endpoint=request.endpoint, result=result)
+            if entry is not None:
+                response = Response(entry.body, status=entry.status, headers=entry.headers)
+                response.headers["X-Cache"] = "HIT"
+                return response
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                expires = time.monotonic() + ttl if ttl is not None else None
+                headers = [(k, v) for k, v in response.headers.items() if k.lower() != "content-length"]
+                response_cache.put(key, _Entry(current, expires, response.get_data(), response.status_code, headers))
+            response.headers["X-Cache"] = "MISS"
+            return response
+
+        return wrapper
+
+    return decorator
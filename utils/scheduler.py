@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from utils.metrics import metrics
+
+# Lower value runs first
+PRIORITIES: Dict[str, int] = {"verify": 0, "status": 1, "enroll": 2, "door": 3}
+# Max queued (not yet running) operations per class before fast rejection
+DEFAULT_MAX_DEPTH: Dict[str, int] = {"verify": 16, "status": 8, "enroll": 4, "door": 1}
+# Default longest queue wait per class, in seconds (None = wait as long as needed)
+DEFAULT_MAX_WAIT: Dict[str, Optional[float]] = {"verify": 10.0, "status": 5.0, "enroll": 60.0, "door": None}
+
+queue_wait_seconds = metrics.histogram(
+    "device_queue_wait_seconds", "Time device operations spent queued before running.", ("device", "kind")
+)
+queue_depth = metrics.gauge("device_queue_depth", "Device operations currently queued.", ("device", "kind"))
+queue_rejections = metrics.counter(
+    "device_queue_rejections_total", "Device operations rejected by the scheduler.", ("device", "kind", "reason")
+)
+
+
+class DeviceBusy(Exception):
+    """The device queue cannot take (or finish waiting for) this operation; retry later."""
+
+    def __init__(self, message: str, retry_after: float = 1.0) -> None:
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeviceScheduler:
+    """Grants exclusive use of one device to one operation at a time.
+
+    Waiting operations run in priority order (verify > status > enroll > door),
+    FIFO within a class. Each class has a bounded queue: when it is full, callers
+    are rejected immediately with DeviceBusy and a Retry-After estimate. A caller
+    that is still queued at its deadline also gets DeviceBusy.
+    """
+
+    def __init__(
+        self,
+        device: Callable[[], str],
+        max_depth: Optional[Dict[str, int]] = None,
+        max_wait: Optional[Dict[str, Optional[float]]] = None,
+    ) -> None:
+        self._device = device
+        self._max_depth = {**DEFAULT_MAX_DEPTH, **(max_depth or {})}
+        self._max_wait = {**DEFAULT_MAX_WAIT, **(max_wait or {})}
+        self._cond = threading.Condition()
+        self._heap: List[Tuple[int, int]] = []
+        self._depth: Dict[str, int] = {k: 0 for k in PRIORITIES}
+        self._seq = itertools.count()
+        self._busy = False
+        self._running_since: Optional[float] = None
+        # Exponentially weighted mean hold time per class, for Retry-After
+        self._avg_hold: Dict[str, float] = {k: 1.0 for k in PRIORITIES}
+
+    def depth(self) -> Dict[str, int]:
+        with self._cond:
+            return dict(self._depth)
+
+    def _retry_after(self, kind: str) -> float:
+        # Caller holds self._cond
+        ahead = sum(n for k, n in self._depth.items() if PRIORITIES[k] <= PRIORITIES[kind])
+        return max(1.0, math.ceil(self._avg_hold[kind] * (ahead + 1)))
+
+    @contextmanager
+    def slot(self, kind: str, deadline: Optional[float] = None) -> Iterator[float]:
+        """Block until this operation owns the device; yields the seconds spent queued.
+
+        `deadline` is an absolute time.monotonic() value; without one the class default applies.
+        """
+        device = self._device()
+        enqueued = time.monotonic()
+        if deadline is None and self._max_wait.get(kind) is not None:
+            deadline = enqueued + self._max_wait[kind]
+        ticket = (PRIORITIES[kind], next(self._seq))
+        with self._cond:
+            if not self._busy and not self._heap:
+                self._busy = True
+            else:
+                if self._depth[kind] >= self._max_depth[kind]:
+                    queue_rejections.inc(device=device, kind=kind, reason="queue_full")
+                    raise DeviceBusy(f"Device queue full for '{kind}'", self._retry_after(kind))
+                heapq.heappush(self._heap, ticket)
+                self._depth[kind] += 1
+                queue_depth.inc(device=device, kind=kind)
+                try:
+                    while self._busy or self._heap[0] != ticket:
+                        remaining = None if deadline is None else deadline - time.monotonic()
+                        if remaining is not None and remaining <= 0:
+                            self._heap.remove(ticket)
+                            heapq.heapify(self._heap)
+                            queue_rejections.inc(device=device, kind=kind, reason="deadline")
+                            self._cond.notify_all()
+                            raise DeviceBusy(f"Timed out waiting for the device ({kind})", self._retry_after(kind))
+                        self._cond.wait(remaining)
+                    heapq.heappop(self._heap)
+                    self._busy = True
+                finally:
+                    self._depth[kind] -= 1
+                    queue_depth.dec(device=device, kind=kind)
+            self._running_since = time.monotonic()
+        waited = self._running_since - enqueued
+        queue_wait_seconds.observe(waited, device=device, kind=kind)
+        try:
+            yield waited
+        finally:
+            with self._cond:
+                held = time.monotonic() - (self._running_since or time.monotonic())
+                self._avg_hold[kind] = 0.8 * self._avg_hold[kind] + 0.2 * held
+                self._busy = False
+                self._running_since = None
+                self._cond.notify_all()
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Ports named sim://<name>?latency=0.3&match=0.9 open a SimulatedSerial instead of a real device
+SIMULATED_PORT_PREFIX = "sim://"
+
+
+class SimulatedSerial:
+    """In-process stand-in for serial.Serial that speaks the firmware's line protocol.
+
+    Understands `C` (probe, or cancel a pending enrollment), `V` (verification
+    mode), `E` + `I:<slot>` (enrollment) and prints the boot banner on open. In
+    verification mode a finger is "presented" every `latency` seconds (plus `idle`
+    seconds between fingers): it matches with probability `match`, reporting the slot queued with `present()` for
+    this port or else a random enrolled slot. Used by scripts/loadgen.py and the tests
+    to exercise the full serial path without hardware.
+
+    Query parameters: latency (s, default 0.3), idle (s, default 0), match (0-1,
+    default 1), slots (random match range when nothing is enrolled, default 100),
+    boot (banner delay in s, default 0.05), seed.
+    """
+
+    _presented: Dict[str, Deque[int]] = {}
+    _presented_lock = threading.Lock()
+
+    def __init__(self, port: str, baudrate: int = 9600, timeout: Optional[float] = None) -> None:
+        url = urlsplit(port)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        self.port = port
+        self.name = url.netloc or url.path or "sim"
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.is_open = True
+        self.latency = float(params.get("latency", 0.3))
+        self.idle = float(params.get("idle", 0.0))
+        self.match = float(params.get("match", 1.0))
+        self.slots = max(1, int(params.get("slots", 100)))
+        self._random = random.Random(params.get("seed"))
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._mode: Optional[str] = None
+        self._scan_due: Optional[float] = None
+        self._enrolling: Optional[int] = None
+        self.enrolled: Set[int] = set()
+        self.written: List[str] = []
+        boot = float(params.get("boot", 0.05))
+        self._emit("INFO: Systeme pret", boot)
+        self._emit("CAPTEUR: OK", boot)
+
+    @classmethod
+    def present(cls, name: str, slot: int) -> None:
+        """Queue the slot the next successful scan on sim://<name> reports."""
+        with cls._presented_lock:
+            cls._presented.setdefault(name, deque()).append(int(slot))
+
+    def _next_presented(self) -> Optional[int]:
+        with self._presented_lock:
+            queued = self._presented.get(self.name)
+            return queued.popleft() if queued else None
+
+    # ---------------------- Device side ----------------------
+    def _emit(self, line: str, delay: float = 0.0) -> None:
+        heapq.heappush(self._pending, (time.monotonic() + delay, next(self._seq), line))
+
+    def _scan(self) -> None:
+        """Schedule one verification attempt in 'V' mode."""
+        self._emit("VERIFICATION: EN_COURS", self.latency / 2)
+        if self._random.random() < self.match:
+            slot = self._next_presented()
+            if slot is None:
+                slot = self._random.choice(sorted(self.enrolled)) if self.enrolled else self._random.randint(1, self.slots)
+            self._emit(f"VERIFICATION: SUCCES ID trouve: {slot}", self.latency)
+        else:
+            self._emit("VERIFICATION: ECHEC", self.latency)
+        self._scan_due = time.monotonic() + self.latency + self.idle
+
+    def _enroll(self, slot: int) -> None:
+        self._emit("ENREGISTREMENT: EN_COURS", self.latency)
+        # The slot counts as enrolled once the result is scheduled; 'C' before then takes it back
+        self._enrolling = None
+        if self._random.random() < self.match:
+            if slot not in self.enrolled:
+                self._enrolling = slot
+            self.enrolled.add(slot)
+            self._emit("ENREGISTREMENT: SUCCES", 2 * self.latency)
+        else:
+            self._emit("ENREGISTREMENT: ECHEC", 2 * self.latency)
+
+    def _abandon_enrollment(self) -> None:
+        """'C' during enrollment: drop the pending result and leave enrollment mode."""
+        pending = [p for p in self._pending if not p[2].startswith("ENREGISTREMENT:")]
+        if len(pending) != len(self._pending):
+            self._pending = pending
+            heapq.heapify(self._pending)
+            if self._enrolling is not None:
+                self.enrolled.discard(self._enrolling)
+            self._emit("ENREGISTREMENT: ABANDONNE")
+        self._enrolling = None
+        self._mode = None
+
+    # ---------------------- serial.Serial interface ----------------------
+    def write(self, data: bytes) -> int:
+        if not self.is_open:
+            raise OSError("simulated port is closed")
+        with self._cond:
+            for command in data.decode("utf-8", errors="ignore").splitlines():
+                command = command.strip()
+                self.written.append(command)
+                if command == "C":
+                    self._emit("ACK:C")
+                    if self._mode == "E":
+                        self._abandon_enrollment()
+                elif command == "V":
+                    self._mode = "V"
+                    self._scan_due = None
+                    self._emit("ACK:V")
+                elif command == "E":
+                    self._mode = "E"
+                    self._emit("ACK:E")
+                elif command.startswith("I:") and self._mode == "E":
+                    self._emit(f"ACK:{command}")
+                    try:
+                        self._enroll(int(command[2:]))
+                    except ValueError:
+                        self._emit("ERR: ID invalide")
+                elif command:
+                    self._emit(f"ERR: commande inconnue {command}")
+            self._cond.notify_all()
+        return len(data)
+
+    def readline(self) -> bytes:
+        if not self.is_open:
+            raise OSError("simulated port is closed")
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._mode == "V" and not self._pending and (self._scan_due is None or now >= self._scan_due):
+                    self._scan()
+                if self._pending and self._pending[0][0] <= now:
+                    return (heapq.heappop(self._pending)[2] + "\n").encode("utf-8")
+                wake = self._pending[0][0] if self._pending else self._scan_due
+                if deadline is not None:
+                    if now >= deadline:
+                        return b""
+                    wake = deadline if wake is None else min(wake, deadline)
+                self._cond.wait(None if wake is None else max(wake - now, 0.0))
+
+    def reset_input_buffer(self) -> None:
+        with self._cond:
+            now = time.monotonic()
+            self._pending = [p for p in self._pending if p[0] > now]
+            heapq.heapify(self._pending)
+
+    def close(self) -> None:
+        self.is_open = False
+        with self._cond:
+            self._cond.notify_all()
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence, Union
+
+from flask import Response, current_app, request
+from sqlalchemy import String, type_coerce
+
+JSON = "application/json"
+COLUMNAR_JSON = "application/vnd.fac.columnar+json"
+MSGPACK = "application/x-msgpack"
+
+# ?format= shortcuts for clients that cannot set Accept (EventSource, <a href>, curl one-liners)
+FORMATS = {"json": JSON, "columnar": COLUMNAR_JSON, "msgpack": MSGPACK}
+
+
+def _msgpack():
+    try:
+        import msgpack
+    except ImportError:
+        return None
+    return msgpack
+
+
+def negotiate() -> str:
+    """Pick the list format: ?format=json|columnar|msgpack, else the Accept header, else row JSON.
+
+    MessagePack is only offered when the optional `msgpack` package is installed.
+    """
+    offered = [JSON, COLUMNAR_JSON] + ([MSGPACK, "application/msgpack"] if _msgpack() else [])
+    wanted = FORMATS.get((request.args.get("format") or "").lower())
+    if wanted in offered:
+        return wanted
+    best = request.accept_mimetypes.best_match(offered, default=JSON)
+    return MSGPACK if best == "application/msgpack" else best
+
+
+def raw_datetime(column):
+    """Select a DateTime column without driver-side parsing; pair with iso_column()."""
+    return type_coerce(column, String)
+
+
+def iso_column(values: Iterable[Union[datetime, str, None]]) -> List[Optional[str]]:
+    """datetime.isoformat() for each value. SQLite hands raw_datetime() columns back as
+    'YYYY-MM-DD HH:MM:SS.ffffff' text, which is rewritten instead of parsed and re-formatted."""
+    out: List[Optional[str]] = []
+    for v in values:
+        if v is None or isinstance(v, datetime):
+            out.append(v.isoformat() if v is not None else None)
+        else:
+            v = v.replace(" ", "T", 1)
+            # isoformat() drops an all-zero fraction
+            out.append(v[:-7] if v.endswith(".000000") else v)
+    return out
+
+
+def rows_to_columns(items: Sequence[Dict], fields: Sequence[str]) -> List[list]:
+    """Transpose already-built dicts (for small pages such as enriched logs)."""
+    return [[item.get(field) for item in items] for field in fields]
+
+
+def columnar_response(fields: Sequence[str], columns: List[list], fmt: str, headers: Optional[dict] = None) -> Response:
+    """`{"fields": [...], "columns": [[...] per field], "count": n}` as compact JSON or MessagePack.
+
+    Each key appears once per response instead of once per row; row i is
+    `{f: columns[k][i] for k, f in enumerate(fields)}`.
+    """
+    body = {"fields": list(fields), "columns": columns, "count": len(columns[0]) if columns else 0}
+    if fmt == MSGPACK:
+        data = _msgpack().packb(body, use_bin_type=True)
+    else:
+        data = current_app.json.dumps(body, separators=(",", ":")).encode("utf-8")
+    response = Response(data, mimetype=fmt, headers=headers)
+    response.vary.add("Accept")
+    return response
@@ -5,16 +5,46 @@ import queue
 import threading
 from typing import Generator, Optional
 
+from utils.event_bus import LocalBackend, backend_from_url
+from utils.metrics import metrics
+
+dropped_subscribers = metrics.counter(
+    "sse_dropped_subscribers_total", "SSE subscribers dropped because their queue was full."
+)
+
 
 class SSEBroker:
     """A minimal Server-Sent Events broker.
 
-    Each subscriber receives events pushed after subscription time.
+    Each subscriber receives events pushed after subscription time. Events travel
+    through a pluggable bus backend (see utils/event_bus.py) so subscribers in other
+    worker processes receive them too; the default backend is in-process only.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, backend=None) -> None:
         self._lock = threading.Lock()
         self._subscribers: list[queue.Queue[str]] = []
+        self._backend = backend or LocalBackend()
+        self._backend_url: Optional[str] = None
+        self._backend_started = False
+
+    def configure(self, url: Optional[str]) -> None:
+        """Select the bus backend from a URL ('local', 'unix:///path', 'redis://...')."""
+        with self._lock:
+            if url == self._backend_url:
+                return
+            self._backend = backend_from_url(url)
+            self._backend_url = url
+            self._backend_started = False
+
+    def _ensure_backend(self):
+        with self._lock:
+            backend = self._backend
+            if self._backend_started:
+                return backend
+            self._backend_started = True
+        backend.start(self._deliver)
+        return backend
 
     def subscribe(self) -> queue.Queue[str]:
         q: queue.Queue[str] = queue.Queue(maxsize=100)
@@ -31,6 +61,19 @@ class SSEBroker:
 
     def publish(self, event: str, data: dict) -> None:
         payload = f"event: {event}\n" f"data: {json.dumps(data)}\n\n"
+        self._ensure_backend().publish(payload)
+
+    def publish_local(self, event: str, data: dict) -> None:
+        """Send to this process's subscribers only, bypassing the bus."""
+        self._deliver(f"event: {event}\n" f"data: {json.dumps(data)}\n\n")
+
+    def is_shared(self) -> bool:
+        """True when events travel between processes (a non-local bus is configured)."""
+        with self._lock:
+            return not isinstance(self._backend, LocalBackend)
+
+    def _deliver(self, payload: str) -> None:
+        """Fan a payload received from the bus out to this process's subscribers."""
         with self._lock:
             for q in list(self._subscribers):
                 try:
@@ -38,8 +81,14 @@ class SSEBroker:
                 except queue.Full:
                     # Drop slow subscribers
                     self._subscribers.remove(q)
+                    dropped_subscribers.inc()
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
 
     def stream(self) -> Generator[str, None, None]:
+        self._ensure_backend()
         q = self.subscribe()
         try:
             # Initial ping to open stream on client
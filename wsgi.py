@@ -0,0 +1,7 @@
+# WSGI entry point, e.g. `gunicorn wsgi:app`. Run `flask --app app init-db` once before serving.
+from app import create_app
+from utils.live_stats import live_stats
+
+app = create_app()
+with app.app_context():
+    live_stats.seed()